@@ -0,0 +1,151 @@
+"""
+Детерминированный генератор синтетических NGINX-логов (combined format).
+
+Запуск из корня репозитория:
+    python -m scripts.bench.loggen -o /tmp/access.log --lines 1000000 --seed 42
+
+Один и тот же seed и параметры дают побайтово одинаковый файл.
+"""
+
+import argparse
+import bisect
+import datetime as dt
+import itertools
+import random
+import sys
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+DEFAULT_STATUS_MIX = {200: 0.70, 304: 0.15, 404: 0.10, 500: 0.04, 301: 0.01}
+DEFAULT_START = dt.datetime(2015, 5, 17, tzinfo=dt.timezone.utc)
+
+_METHODS = ("GET", "GET", "GET", "GET", "POST", "HEAD", "PUT", "DELETE")
+_PROTOCOLS = ("HTTP/1.1", "HTTP/1.1", "HTTP/1.1", "HTTP/1.0", "HTTP/2.0")
+_AGENTS = (
+    "Debian APT-HTTP/1.3 (0.8.16~exp12ubuntu10.21)",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+    "curl/7.68.0",
+    "Wget/1.20.3 (linux-gnu)",
+)
+_MALFORMED = (
+    "this is not nginx line",
+    '127.0.0.1 - - [broken timestamp] "GET / HTTP/1.1" 200 1 "-" "-"',
+    '10.0.0.1 - - [17/May/2015:08:05:32 +0000] "GET"',
+)
+
+
+def parse_status_mix(raw: str) -> Dict[int, float]:
+    """'200=0.8,404=0.2' -> {200: 0.8, 404: 0.2}."""
+    mix: Dict[int, float] = {}
+    for part in raw.split(","):
+        code, _, weight = part.partition("=")
+        mix[int(code)] = float(weight)
+    return mix
+
+
+def generate_lines(
+    lines: int,
+    seed: int = 42,
+    resources: int = 1000,
+    skew: float = 1.1,
+    status_mix: Optional[Dict[int, float]] = None,
+    malformed_rate: float = 0.0,
+    start: dt.datetime = DEFAULT_START,
+    span_days: float = 1.0,
+) -> Iterator[str]:
+    """
+    Порождает строки лога.
+
+    - resources/skew: популярность ресурсов по Ципфу (вес k-го ~ 1 / k**skew);
+    - status_mix: доли кодов ответа;
+    - malformed_rate: доля строк, не соответствующих формату;
+    - start/span_days: время равномерно растёт от start на span_days (с джиттером).
+    """
+    rnd = random.Random(seed)
+    status_mix = status_mix or DEFAULT_STATUS_MIX
+    codes = list(status_mix)
+    code_cum = list(itertools.accumulate(status_mix[c] for c in codes))
+    res_cum = list(
+        itertools.accumulate(1.0 / (k**skew) for k in range(1, resources + 1))
+    )
+    ips = [
+        f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}"
+        for _ in range(max(1, resources // 4))
+    ]
+    span = span_days * 86400.0
+    step = span / max(1, lines)
+    base = start.timestamp()
+
+    for i in range(lines):
+        if malformed_rate and rnd.random() < malformed_rate:
+            yield rnd.choice(_MALFORMED)
+            continue
+        epoch = base + i * step + rnd.random() * step
+        ts = dt.datetime.fromtimestamp(epoch, tz=dt.timezone.utc)
+        res_idx = bisect.bisect_left(res_cum, rnd.random() * res_cum[-1])
+        code = codes[bisect.bisect_left(code_cum, rnd.random() * code_cum[-1])]
+        size = 0 if code == 304 else int(rnd.lognormvariate(6.0, 1.5))
+        resource = f"/downloads/product_{res_idx + 1}"
+        if rnd.random() < 0.2:
+            resource += f"?id={rnd.randint(1, 10_000)}"
+        yield (
+            f"{rnd.choice(ips)} - - [{ts.strftime('%d/%b/%Y:%H:%M:%S %z')}] "
+            f'"{rnd.choice(_METHODS)} {resource} {rnd.choice(_PROTOCOLS)}" '
+            f'{code} {size} "-" "{rnd.choice(_AGENTS)}"'
+        )
+
+
+def write_log(path: str, **kwargs) -> int:
+    """Пишет сгенерированный лог в файл; возвращает размер в байтах."""
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        buf: List[str] = []
+        for line in generate_lines(**kwargs):
+            buf.append(line)
+            if len(buf) >= 10_000:
+                chunk = "\n".join(buf) + "\n"
+                written += len(chunk.encode("utf-8"))
+                f.write(chunk)
+                buf = []
+        if buf:
+            chunk = "\n".join(buf) + "\n"
+            written += len(chunk.encode("utf-8"))
+            f.write(chunk)
+    return written
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Генератор синтетических NGINX-логов")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--lines", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--resources", type=int, default=1000)
+    p.add_argument("--skew", type=float, default=1.1)
+    p.add_argument("--status-mix", type=parse_status_mix, default=None)
+    p.add_argument("--malformed-rate", type=float, default=0.0)
+    p.add_argument("--start", type=dt.datetime.fromisoformat, default=DEFAULT_START)
+    p.add_argument("--span-days", type=float, default=1.0)
+    args = p.parse_args(argv)
+
+    start = args.start
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=dt.timezone.utc)
+    size = write_log(
+        args.output,
+        lines=args.lines,
+        seed=args.seed,
+        resources=args.resources,
+        skew=args.skew,
+        status_mix=args.status_mix,
+        malformed_rate=args.malformed_rate,
+        start=start,
+        span_days=args.span_days,
+    )
+    print(f"{args.output}: {args.lines} строк, {size / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
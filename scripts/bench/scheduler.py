@@ -0,0 +1,199 @@
+"""
+Бенчмарк планировщика задач (--workers) на неоднородных наборах файлов.
+
+Запуск из корня репозитория:
+    python -m scripts.bench.scheduler [--workers 8] [--scale-mb 64] [--measure]
+
+Для каждого распределения размеров (равные файлы, один огромный и много
+мелких, Ципф) строятся два плана: наивный — по файлу на задачу в порядке
+шаблона, и адаптивный — plan_tasks (крупные первыми, нарезка по строкам,
+склейка мелких). Время плана моделируется раздачей задач свободным процессам
+с накладными расходами на задачу и сравнивается с идеалом: сумма / процессы.
+Размеры задач масштабируются вместе с набором, поэтому модель не зависит
+от --scale-mb; крупный набор нужен только для --measure.
+С --measure весь execute_pipeline запускается на 1 и на N процессах,
+и замер сравнивается с идеалом T1 / N (имеет смысл на машине с N ядрами).
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from scripts.bench.loggen import generate_lines
+from src.cli.args import parse_args
+from src.config import build_app_config
+from src.pipeline.executor import execute_pipeline
+from src.pipeline.scheduler import Task
+from src.pipeline.scheduler import ByteRange
+from src.pipeline.scheduler import makespan
+from src.pipeline.scheduler import plan_tasks
+from src.sources import Source
+from src.validator import Validator
+
+# Накладные расходы на задачу (pickle, слияние состояния) — доля минимальной задачи:
+# в CLI задача не меньше 8 МиБ, а её слияние стоит порядка сотни КиБ разбора
+DEFAULT_TASK_OVERHEAD = 0.03
+
+
+def _uniform(scale: int) -> List[int]:
+    return [scale // 16] * 16
+
+
+def _one_huge(scale: int) -> List[int]:
+    # текущий лог и тысяча ротированных обрывков
+    return [scale * 3 // 4] + [max(1, scale // 4 // 1000)] * 1000
+
+
+def _zipf(scale: int) -> List[int]:
+    weights = [1.0 / k for k in range(1, 201)]
+    total = sum(weights)
+    return [max(1, int(scale * w / total)) for w in weights]
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int], List[int]]] = {
+    "uniform": _uniform,
+    "one_huge": _one_huge,
+    "zipf": _zipf,
+}
+
+
+@dataclass
+class SchedulerResult:
+    distribution: str
+    files: int
+    tasks: int
+    naive_efficiency: float  # идеал / время наивного плана
+    adaptive_efficiency: float  # идеал / время адаптивного плана
+    measured_efficiency: Optional[float] = None  # (T1 / N) / TN по замеру
+
+
+def _write_files(workdir: str, sizes: List[int], seed: int) -> List[Source]:
+    """Файлы заданных размеров из повторяющегося блока синтетических строк."""
+    block = ("\n".join(generate_lines(2000, seed=seed)) + "\n").encode("utf-8")
+    sources = []
+    for idx, size in enumerate(sizes):
+        path = os.path.join(workdir, f"part-{idx:05d}.log")
+        reps, rest = divmod(size, len(block))
+        data = block * reps + block[:rest]
+        # последняя строка — целиком
+        data = data[: data.rfind(b"\n") + 1] or block[: block.find(b"\n") + 1]
+        with open(path, "wb") as f:
+            f.write(data)
+        sources.append(Source(path, len(data)))
+    return sources
+
+
+def _plan_time(tasks: List[Task], workers: int, overhead: float) -> float:
+    return makespan([t.cost + overhead for t in tasks], workers)
+
+
+def _measure(workdir: str, workers: int) -> float:
+    def run(n: int) -> float:
+        out = os.path.join(workdir, f"report-{n}-{time.monotonic_ns()}.json")
+        argv = ["-p", os.path.join(workdir, "*.log"), "-f", "json", "-o", out]
+        config = build_app_config(parse_args(argv + ["--workers", str(n)]), Validator())
+        start = time.perf_counter()
+        execute_pipeline(config)
+        return time.perf_counter() - start
+
+    single = run(1)
+    parallel = run(workers)
+    return round(single / workers / parallel, 3)
+
+
+def run_suite(
+    workers: int,
+    scale: int,
+    seed: int,
+    workdir: str,
+    overhead: float = DEFAULT_TASK_OVERHEAD,
+    measure: bool = False,
+) -> List[SchedulerResult]:
+    results = []
+    for name, make_sizes in DISTRIBUTIONS.items():
+        directory = os.path.join(workdir, name)
+        os.makedirs(directory)
+        sources = _write_files(directory, make_sizes(scale), seed)
+        total = sum(s.size for s in sources)
+        # нижний предел задачи масштабируется вместе с набором (в CLI — 8 МиБ)
+        min_cost = total / (workers * 16)
+        task_overhead = overhead * min_cost
+        ideal = total / workers + task_overhead
+
+        naive = [Task([ByteRange(s.location)], float(s.size)) for s in sources]
+        adaptive, _ = plan_tasks(sources, workers, min_cost=min_cost)
+
+        results.append(
+            SchedulerResult(
+                distribution=name,
+                files=len(sources),
+                tasks=len(adaptive),
+                naive_efficiency=round(
+                    ideal / _plan_time(naive, workers, task_overhead), 3
+                ),
+                adaptive_efficiency=round(
+                    ideal / _plan_time(adaptive, workers, task_overhead), 3
+                ),
+                measured_efficiency=(_measure(directory, workers) if measure else None),
+            )
+        )
+    return results
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Бенчмарк планировщика задач")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--scale-mb", type=int, default=64, help="суммарный размер набора")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument(
+        "--task-overhead",
+        type=float,
+        default=DEFAULT_TASK_OVERHEAD,
+        help="накладные расходы на задачу, доля минимальной задачи",
+    )
+    p.add_argument("--measure", action="store_true")
+    p.add_argument("--json", dest="as_json", action="store_true")
+    args = p.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_suite(
+            args.workers,
+            args.scale_mb << 20,
+            args.seed,
+            workdir,
+            overhead=args.task_overhead,
+            measure=args.measure,
+        )
+
+    if args.as_json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+        return 0
+    print(
+        f"{'распределение':<14}{'файлов':>8}{'задач':>7}"
+        f"{'наивный':>10}{'адаптивный':>12}{'замер':>8}"
+    )
+    for r in results:
+        measured = (
+            "-" if r.measured_efficiency is None else f"{r.measured_efficiency:.2f}"
+        )
+        print(
+            f"{r.distribution:<14}{r.files:>8}{r.tasks:>7}"
+            f"{r.naive_efficiency:>10.2f}{r.adaptive_efficiency:>12.2f}{measured:>8}"
+        )
+    print("эффективность = идеальное время (сумма / процессы) / время плана")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Бенчмарк старта CLI на основе `python -X importtime`.
+
+Запуск из корня репозитория:
+    python -m scripts.bench.startup [--runs N]
+
+Печатает медиану кумулятивного времени импорта src.main и самые дорогие
+модули; код возврата 1, если превышен бюджет или загружен «тяжёлый» модуль.
+Бюджет зависит от машины, поэтому в pytest он только предупреждает,
+а список LAZY_MODULES проверяется всегда.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Бюджет на кумулятивный импорт src.main (мс, медиана по запускам):
+# около 110 мс на эталонной машине плюс ~10% запаса на шум
+STARTUP_BUDGET_MS = 120.0
+
+# Модули, которые не должны грузиться при старте (только по требованию)
+LAZY_MODULES = (
+    "requests",
+    "numpy",
+    "src.formatters.json_formatter",
+    "src.formatters.markdown_formatter",
+    "src.formatters.adoc_formatter",
+    "src.reader.reader_url",
+    "src.time_histogram",
+    "src.sampling",
+    "src.pipeline.scheduler",
+    "src.reader.http_cache",
+    "src.row_filter",
+    "src.external_counter",
+)
+
+
+def import_profile(module: str = "src.main") -> Dict[str, int]:
+    """Один запуск `-X importtime`: {модуль: кумулятивное время, мкс}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue  # строка заголовка
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def measure(runs: int = 5, module: str = "src.main") -> Tuple[float, Dict[str, int]]:
+    """Медиана времени импорта модуля (мс) и профиль последнего запуска."""
+    timings: List[float] = []
+    profile: Dict[str, int] = {}
+    for _ in range(runs):
+        profile = import_profile(module)
+        timings.append(profile[module] / 1000.0)
+    return statistics.median(timings), profile
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Бенчмарк старта log-analyzer")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = p.parse_args(argv)
+
+    median_ms, profile = measure(args.runs)
+    print(
+        f"src.main: {median_ms:.1f} мс (медиана из {args.runs}, бюджет {args.budget_ms} мс)"
+    )
+    for name, us in sorted(profile.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {us / 1000.0:8.1f} мс  {name}")
+
+    eager = [m for m in LAZY_MODULES if m in profile]
+    if eager:
+        print(f"Загружены при старте: {', '.join(eager)}")
+    return 1 if eager or median_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
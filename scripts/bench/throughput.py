@@ -0,0 +1,277 @@
+"""
+Сквозной бенчмарк пропускной способности на синтетических логах.
+
+Запуск из корня репозитория:
+    python -m scripts.bench.throughput [--lines N] [--update-baseline]
+
+Покрывает parse_line, ReaderFile, StatsCollector.update, build_result,
+каждый форматтер и весь execute_pipeline. Для каждого этапа печатает
+строки/с, MB/с и пиковый RSS процесса. Этапы разбора сравниваются
+с baseline по входным строкам/с, форматтеры — по MB/с вывода: они рендерят
+отчёт с минутными интервалами за сутки и всеми ресурсами (CSV), и каждый
+повторяется, пока замер не наберёт MIN_STAGE_SECONDS.
+
+baseline зависит от машины: его пересоздают на каждом хосте через
+--update-baseline (в файл пишется и описание хоста). По умолчанию падение
+больше допуска только печатается как предупреждение; с --strict — код 1.
+"""
+
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from scripts.bench.loggen import write_log
+from src.cli.args import parse_args
+from src.config import build_app_config
+from src.formatters.registry import get_formatter
+from src.formatters.registry import get_spec
+from src.parser import parse_line
+from src.pipeline.executor import execute_pipeline
+from src.reader.reader_file import ReaderFile
+from src.stats_collector import StatsCollector
+from src.validator import Validator
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+# Допустимое падение пропускной способности относительно baseline
+DEFAULT_TOLERANCE = 0.25
+# Форматтер повторяется, пока суммарное время не достигнет этого порога
+MIN_STAGE_SECONDS = 0.2
+# Интервал --bucket отчёта для форматтеров: 1440 строк за сутки лога
+FORMAT_BUCKET_SECONDS = 60
+FORMATS = ("json", "markdown", "adoc", "csv", "binary")
+# Ключ описания хоста в baseline
+HOST_KEY = "_host"
+
+
+@dataclass
+class BenchResult:
+    name: str
+    seconds: float
+    lines_per_sec: float
+    mb_per_sec: float
+    peak_rss_mb: float
+    # по какому полю сравнивать с baseline
+    metric: str = "lines_per_sec"
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss: КБ на Linux, байты на macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+
+def _timed(
+    name: str, lines: int, size: int, fn: Callable[[], object], repeat: int = 1
+) -> BenchResult:
+    # короткие этапы повторяем и берём лучший замер — иначе шум больше сигнала
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        seconds = min(seconds, time.perf_counter() - start)
+    seconds = max(seconds, 1e-9)
+    return BenchResult(
+        name=name,
+        seconds=round(seconds, 4),
+        lines_per_sec=round(lines / seconds, 1),
+        mb_per_sec=round(size / 1e6 / seconds, 2),
+        peak_rss_mb=round(_peak_rss_mb(), 1),
+    )
+
+
+def _timed_format(name: str, render: Callable[[], object]) -> BenchResult:
+    """Рендер отчёта: строки/с и MB/с — по выводу, лучший из повторов."""
+    seconds = float("inf")
+    spent = 0.0
+    output = render()
+    # как timeit: паузы сборщика мусора по всей куче этапов — не время рендера
+    gc.disable()
+    try:
+        while spent < MIN_STAGE_SECONDS:
+            start = time.perf_counter()
+            output = render()
+            elapsed = time.perf_counter() - start
+            seconds = min(seconds, elapsed)
+            spent += elapsed
+    finally:
+        gc.enable()
+    seconds = max(seconds, 1e-9)
+    if isinstance(output, str):
+        size, lines = len(output.encode("utf-8")), output.count("\n")
+    else:
+        size, lines = len(output), 0
+    return BenchResult(
+        name=name,
+        seconds=round(seconds, 6),
+        lines_per_sec=round(lines / seconds, 1),
+        mb_per_sec=round(size / 1e6 / seconds, 2),
+        peak_rss_mb=round(_peak_rss_mb(), 1),
+        metric="mb_per_sec",
+    )
+
+
+def host_info() -> Dict[str, object]:
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_suite(lines: int, seed: int, workdir: str) -> List[BenchResult]:
+    log_path = os.path.join(workdir, "bench.log")
+    size = write_log(
+        log_path, lines=lines, seed=seed, resources=5000, malformed_rate=0.001
+    )
+    raw_lines = list(ReaderFile(log_path).iter_lines())
+    results: List[BenchResult] = []
+
+    results.append(
+        _timed(
+            "reader_file",
+            lines,
+            size,
+            lambda: sum(1 for _ in ReaderFile(log_path).iter_lines()),
+        )
+    )
+
+    entries = []
+    results.append(
+        _timed(
+            "parse_line",
+            lines,
+            size,
+            lambda: entries.extend(e for e in map(parse_line, raw_lines) if e),
+        )
+    )
+
+    collector = StatsCollector([log_path])
+
+    def update_all():
+        for e in entries:
+            collector.update(e)
+
+    results.append(_timed("stats_update", len(entries), size, update_all))
+
+    built = []
+    results.append(
+        _timed(
+            "build_result",
+            len(entries),
+            size,
+            lambda: built.append(collector.build_result()),
+            repeat=5,
+        )
+    )
+
+    # отчёт для форматтеров — с минутными интервалами, как у дашборда
+    report_collector = StatsCollector([log_path], bucket_seconds=FORMAT_BUCKET_SECONDS)
+    for e in entries:
+        report_collector.update(e)
+    report = report_collector.build_result()
+    for fmt in FORMATS:
+        formatter = get_formatter(fmt)
+        sink = io.BytesIO if get_spec(fmt).binary else io.StringIO
+
+        def render(f=formatter, sink=sink):
+            buf = sink()
+            f.write(report, buf)
+            return buf.getvalue()
+
+        results.append(_timed_format(f"format_{fmt}", render))
+
+    out = os.path.join(workdir, "report.json")
+    config = build_app_config(
+        parse_args(["-p", log_path, "-f", "json", "-o", out]), Validator()
+    )
+    results.append(
+        _timed("execute_pipeline", lines, size, lambda: execute_pipeline(config))
+    )
+    return results
+
+
+def compare(
+    results: List[BenchResult], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """Этапы, где метрика этапа упала ниже baseline * (1 - tolerance)."""
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base or r.metric not in base:
+            continue
+        value = getattr(r, r.metric)
+        floor = base[r.metric] * (1 - tolerance)
+        if value < floor:
+            regressions.append(
+                f"{r.name}: {r.metric} {value:.1f} < {floor:.1f} (baseline {base[r.metric]:.1f})"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Бенчмарк пропускной способности")
+    p.add_argument("--lines", type=int, default=200_000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--baseline", default=BASELINE_PATH)
+    p.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    p.add_argument("--update-baseline", action="store_true")
+    p.add_argument("--strict", action="store_true", help="регрессия — код возврата 1")
+    p.add_argument("--json", dest="as_json", action="store_true")
+    args = p.parse_args(argv)
+
+    logging.disable(logging.WARNING)  # битые строки не должны шуметь в замерах
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_suite(args.lines, args.seed, workdir)
+
+    if args.as_json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(f"{'этап':<18}{'сек':>9}{'строк/с':>13}{'MB/с':>9}{'RSS, MB':>10}")
+        for r in results:
+            lines = f"{r.lines_per_sec:.0f}" if r.lines_per_sec else "-"
+            print(
+                f"{r.name:<18}{r.seconds:>9.4f}{lines:>13}"
+                f"{r.mb_per_sec:>9.1f}{r.peak_rss_mb:>10.1f}"
+            )
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            data = {HOST_KEY: host_info()}
+            data.update({r.name: asdict(r) for r in results})
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"baseline обновлён: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("baseline не найден — сравнение пропущено")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get(HOST_KEY) != host_info():
+        print("baseline снят на другом хосте — пересоздайте его: --update-baseline")
+    regressions = compare(results, baseline, args.tolerance)
+    label = "РЕГРЕССИЯ" if args.strict else "ПРЕДУПРЕЖДЕНИЕ"
+    for line in regressions:
+        print(f"{label} {line}")
+    return 1 if regressions and args.strict else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,100 @@ def parse_args(argv=None):
     p = argparse.ArgumentParser(
         prog="log-analyzer", description="Анализатор NGINX логов"
     )
-    p.add_argument("-p", "--path", required=True, type=str)
+    source = p.add_mutually_exclusive_group(required=True)
+    # -p повторяется: несколько шаблонов и URL (URL проверяются параллельно)
+    source.add_argument("-p", "--path", action="append", type=str)
+    source.add_argument("--store", dest="store", type=str, metavar="DIR")
+    p.add_argument(
+        "--exclude", dest="excludes", action="append", default=[], metavar="PATTERN"
+    )
+    p.add_argument("--dedup-content", dest="dedup_content", action="store_true")
     p.add_argument("-o", "--output", required=True, type=str)
     p.add_argument("-f", "--format", dest="out_format", required=True, type=str)
     p.add_argument("--from", dest="date_from", default=None, type=str)
     p.add_argument("--to", dest="date_to", default=None, type=str)
+    p.add_argument(
+        "--window", dest="windows", action="append", default=[], metavar="FROM..TO"
+    )
+    p.add_argument("--bucket", dest="bucket", default=None, type=str)
+    p.add_argument(
+        "--status", dest="statuses", action="append", default=[], metavar="CODE|Nxx"
+    )
+    p.add_argument(
+        "--method", dest="methods", action="append", default=[], metavar="METHOD"
+    )
+    p.add_argument("--ip", dest="ips", action="append", default=[], metavar="CIDR")
+    p.add_argument(
+        "--resource-prefix",
+        dest="resource_prefixes",
+        action="append",
+        default=[],
+        metavar="PREFIX",
+    )
+    p.add_argument("--sample", dest="sample", default=None, type=str, metavar="RATE")
+    p.add_argument("--sample-seed", dest="sample_seed", default="0", type=str)
+    _add_normalizer_args(p)
+    p.add_argument("--memory-limit", dest="memory_limit", default=None, type=str)
+    _add_cache_args(p)
+    p.add_argument(
+        "--partial-cache", dest="partial_cache", default=None, type=str, metavar="DIR"
+    )
+    p.add_argument("--trace", dest="trace", default=None, type=str, metavar="FILE")
+    p.add_argument("--workers", dest="workers", default="1", type=str, metavar="N")
     return p.parse_args(argv)
+
+
+def parse_serve_args(argv=None):
+    """Аргументы режима `serve`: источники те же, вместо -o/-f — адрес HTTP API."""
+    p = argparse.ArgumentParser(
+        prog="log-analyzer serve",
+        description="Сервер отчётов по NGINX логам с тёплым состоянием в памяти",
+    )
+    p.add_argument("-p", "--path", required=True, type=str)
+    p.add_argument(
+        "--exclude", dest="excludes", action="append", default=[], metavar="PATTERN"
+    )
+    p.add_argument("--host", dest="host", default="127.0.0.1", type=str)
+    p.add_argument("--port", dest="port", default="8080", type=str)
+    p.add_argument("--poll-interval", dest="poll_interval", default="1", type=str)
+    p.add_argument("--bucket", dest="bucket", default=None, type=str)
+    _add_normalizer_args(p)
+    _add_cache_args(p)
+    return p.parse_args(argv)
+
+
+def parse_ingest_args(argv=None):
+    """Аргументы режима `ingest`: разобрать логи один раз в колоночное хранилище."""
+    p = argparse.ArgumentParser(
+        prog="log-analyzer ingest",
+        description="Загрузка NGINX логов в колоночное хранилище",
+    )
+    p.add_argument("-p", "--path", required=True, action="append", type=str)
+    p.add_argument(
+        "--exclude", dest="excludes", action="append", default=[], metavar="PATTERN"
+    )
+    p.add_argument("--dedup-content", dest="dedup_content", action="store_true")
+    p.add_argument("--store", dest="store", required=True, type=str, metavar="DIR")
+    p.add_argument("--segment-rows", dest="segment_rows", default="1M", type=str)
+    _add_cache_args(p)
+    p.add_argument("--trace", dest="trace", default=None, type=str, metavar="FILE")
+    return p.parse_args(argv)
+
+
+def _add_normalizer_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--strip-query", dest="strip_query", action="store_true")
+    p.add_argument("--collapse-ids", dest="collapse_ids", action="store_true")
+    p.add_argument(
+        "--rewrite",
+        dest="rewrites",
+        nargs=2,
+        action="append",
+        default=[],
+        metavar=("PATTERN", "REPLACEMENT"),
+    )
+
+
+def _add_cache_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--cache-dir", dest="cache_dir", default=None, type=str)
+    p.add_argument("--cache-max-size", dest="cache_max_size", default="1G", type=str)
+    p.add_argument("--cache-max-age", dest="cache_max_age", default=None, type=str)
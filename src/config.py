@@ -1,43 +1,346 @@
+from __future__ import annotations
+
 import datetime as dt
+import os
+import re
 from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
 from typing import List
 from typing import Optional
 
+from src.errors import BadUsageError
+from src.formatters.registry import get_spec
+from src.formatters.registry import known_extensions
+from src.resource_normalizer import ResourceNormalizer
+from src.sources import DuplicateSource
+from src.sources import Source
+from src.sources import deduplicate_sources
 from src.validator import Validator
 
+# кэши и фильтры строк подгружаются, только когда их опции заданы
+if TYPE_CHECKING:
+    from src.pipeline.partial_cache import PartialCache
+    from src.reader.http_cache import HttpCache
+    from src.row_filter import RowFilter
+
+
+@dataclass
+class DateWindow:
+    date_from: Optional[dt.datetime]
+    date_to: Optional[dt.datetime]
+    label: Optional[str] = None  # суффикс имени отчёта (для --window)
+
+    def contains(self, ts: dt.datetime) -> bool:
+        if self.date_from and ts < self.date_from:
+            return False
+        if self.date_to and ts > self.date_to:
+            return False
+        return True
+
+
+@dataclass
+class ReportTarget:
+    path: str
+    output_format: str
+    window_index: int  # индекс в AppConfig.windows
+
 
 @dataclass
 class AppConfig:
     input_path: str
-    resolved_sources: List[str]
+    resolved_sources: List[Source]
     output_path: str
-    output_format: str
-    date_from: Optional[dt.datetime]
-    date_to: Optional[dt.datetime]
+    output_formats: List[str]
+    windows: List[DateWindow]
+    targets: List[ReportTarget]
+    bucket_seconds: Optional[int] = None
+    resource_normalizer: Optional[ResourceNormalizer] = None
+    memory_limit: Optional[int] = None
+    http_cache: Optional[HttpCache] = None
+    store_path: Optional[str] = None  # --store: отчёт по колоночному хранилищу
+    row_filter: Optional[RowFilter] = None
+    sample_rate: Optional[float] = None  # --sample: доля читаемых блоков
+    sample_seed: int = 0
+    partial_cache: Optional[PartialCache] = None  # --partial-cache
+    skipped_duplicates: List[DuplicateSource] = field(default_factory=list)
+    trace_path: Optional[str] = None  # --trace: интервалы в формате Trace Event
+    workers: int = 1  # --workers: процессы для разбора локальных файлов
 
 
 def build_app_config(args, validator: Validator) -> AppConfig:
     """
     Строит и валидирует конфигурацию приложения на основе CLI-аргументов.
-    - проверяет формат вывода и корректность выходного файла
-    - парсит --from/--to (UTC-aware; для date-only расширяет до начала/конца дня)
-    - валидирует диапазон дат
-    - разворачивает источник(и): локальный путь/шаблон или URL
+    - проверяет формат(ы) вывода (-f json,markdown,...)
+    - парсит --from/--to или повторяемые --window FROM..TO
+      (UTC-aware; для date-only расширяет до начала/конца дня), валидирует диапазоны
+    - раскладывает отчёты по файлам (формат × окно) и проверяет каждый выходной файл
+      (и файл трассировки --trace)
+    - парсит --bucket (1m|5m|1h)
+    - компилирует фильтры строк (--status/--method/--ip/--resource-prefix)
+    - парсит долю выборки --sample (не сочетается с --store)
+    - настраивает кэш частичных результатов по файлам (--partial-cache;
+      не сочетается с --sample, --store и --memory-limit)
+    - парсит число процессов --workers (больше одного — без --store, --sample,
+      --partial-cache и --memory-limit)
+    - собирает правила нормализации ресурсов (--strip-query/--collapse-ids/--rewrite)
+    - парсит --memory-limit
+    - настраивает кэш удалённых логов (--cache-dir/--cache-max-size/--cache-max-age)
+    - разворачивает источник(и) всех -p: локальный путь/шаблон (с учётом --exclude)
+      или URL (проверяются параллельно), либо проверяет колоночное хранилище (--store)
+    - отбрасывает повторы одного файла (симлинки, хардлинки) и, при --dedup-content,
+      копии с тем же содержимым
     """
-    output_format = validator.validate_output_format(args.out_format)
-    validator.validate_output_path(args.output, output_format)
+    output_formats = validator.validate_output_formats(args.out_format)
+    windows = _build_windows(args, validator)
+    targets = _plan_targets(args.output, output_formats, windows)
+    for target in targets:
+        validator.validate_output_path(target.path, target.output_format)
+    if args.trace is not None:
+        # трасса — JSON-файл с теми же правилами, что и отчёт, и не поверх отчёта
+        validator.validate_trace_path(args.trace, [t.path for t in targets])
 
-    date_from = validator.parse_from(args.date_from)
-    date_to = validator.parse_to(args.date_to)
-    validator.validate_date_range(date_from, date_to)
+    bucket_seconds = validator.parse_bucket(args.bucket)
+    row_filter = _build_row_filter(args, validator)
+    sample_rate = validator.parse_sample_rate(args.sample)
+    if sample_rate is not None and args.store is not None:
+        raise BadUsageError("--sample нельзя сочетать с --store")
+    normalizer = _build_normalizer(args, validator)
+    memory_limit = validator.parse_size(args.memory_limit, "--memory-limit")
+    http_cache = _build_http_cache(args, validator)
+    partial_cache = _build_partial_cache(args, validator, sample_rate, memory_limit)
+    workers = _build_workers(args, validator, sample_rate, partial_cache, memory_limit)
 
-    resolved_sources = validator.resolve_sources(args.path)
+    store_path = None
+    duplicates: List[DuplicateSource] = []
+    if args.store is not None:
+        store_path = validator.validate_store_dir(args.store)
+        resolved_sources = []
+    else:
+        resolved_sources, duplicates = deduplicate_sources(
+            validator.resolve_many(args.path, args.excludes, http_cache),
+            args.dedup_content,
+        )
 
     return AppConfig(
-        input_path=args.path,
+        input_path=", ".join(args.path) if args.path else args.store,
         resolved_sources=resolved_sources,
         output_path=args.output,
-        output_format=output_format,
-        date_from=date_from,
-        date_to=date_to,
+        output_formats=output_formats,
+        windows=windows,
+        targets=targets,
+        bucket_seconds=bucket_seconds,
+        resource_normalizer=normalizer,
+        memory_limit=memory_limit,
+        http_cache=http_cache,
+        store_path=store_path,
+        row_filter=row_filter,
+        sample_rate=sample_rate,
+        sample_seed=validator.parse_seed(args.sample_seed),
+        partial_cache=partial_cache,
+        skipped_duplicates=duplicates,
+        trace_path=args.trace,
+        workers=workers,
+    )
+
+
+@dataclass
+class IngestConfig:
+    input_path: str
+    resolved_sources: List[Source]
+    store_path: str
+    segment_rows: int
+    http_cache: Optional[HttpCache] = None
+    trace_path: Optional[str] = None
+
+
+def build_ingest_config(args, validator: Validator) -> IngestConfig:
+    """
+    Конфигурация ingest: источники как у отчёта (без повторов одного файла),
+    каталог хранилища и размер сегмента.
+    """
+    segment_rows = validator.parse_size(args.segment_rows, "--segment-rows")
+    store_path = validator.validate_store_dir(args.store, for_write=True)
+    http_cache = _build_http_cache(args, validator)
+    if args.trace is not None:
+        validator.validate_trace_path(args.trace)
+
+    resolved_sources, _ = deduplicate_sources(
+        validator.resolve_many(args.path, args.excludes, http_cache),
+        args.dedup_content,
     )
+
+    return IngestConfig(
+        input_path=", ".join(args.path),
+        resolved_sources=resolved_sources,
+        store_path=store_path,
+        segment_rows=segment_rows,
+        http_cache=http_cache,
+        trace_path=args.trace,
+    )
+
+
+@dataclass
+class ServeConfig:
+    input_path: str
+    excludes: List[str]
+    resolved_sources: List[Source]
+    host: str
+    port: int
+    poll_interval: int  # секунды между опросами файлов
+    bucket_seconds: Optional[int] = None
+    resource_normalizer: Optional[ResourceNormalizer] = None
+    http_cache: Optional[HttpCache] = None
+
+
+def build_serve_config(args, validator: Validator) -> ServeConfig:
+    """
+    Конфигурация режима serve: источники и нормализация — как у разового отчёта,
+    плюс адрес HTTP API (--host/--port) и период опроса файлов (--poll-interval).
+    """
+    port = validator.parse_port(args.port)
+    poll_interval = validator.parse_seconds(args.poll_interval, "--poll-interval")
+    if not poll_interval:
+        raise BadUsageError("--poll-interval должен быть больше нуля")
+    bucket_seconds = validator.parse_bucket(args.bucket)
+    normalizer = _build_normalizer(args, validator)
+    http_cache = _build_http_cache(args, validator)
+
+    resolved_sources, _ = deduplicate_sources(
+        validator.resolve_sources(args.path, args.excludes, http_cache)
+    )
+
+    return ServeConfig(
+        input_path=args.path,
+        excludes=list(args.excludes),
+        resolved_sources=resolved_sources,
+        host=args.host,
+        port=port,
+        poll_interval=poll_interval,
+        bucket_seconds=bucket_seconds,
+        resource_normalizer=normalizer,
+        http_cache=http_cache,
+    )
+
+
+def _build_row_filter(args, validator: Validator) -> Optional[RowFilter]:
+    if not (args.statuses or args.methods or args.ips or args.resource_prefixes):
+        return None
+    from src.row_filter import RowFilter
+
+    row_filter = RowFilter(
+        statuses=validator.parse_status_filters(args.statuses),
+        methods=validator.parse_methods(args.methods),
+        networks=validator.parse_networks(args.ips),
+        resource_prefixes=args.resource_prefixes,
+    )
+    return None if row_filter.is_identity else row_filter
+
+
+def _build_normalizer(args, validator: Validator) -> Optional[ResourceNormalizer]:
+    normalizer = ResourceNormalizer(
+        strip_query=args.strip_query,
+        collapse_ids=args.collapse_ids,
+        rewrites=validator.compile_rewrite_rules(args.rewrites),
+    )
+    return None if normalizer.is_identity else normalizer
+
+
+def _build_http_cache(args, validator: Validator) -> Optional[HttpCache]:
+    if args.cache_dir is None:
+        return None
+    from src.reader.http_cache import HttpCache
+
+    return HttpCache(
+        validator.validate_cache_dir(args.cache_dir),
+        max_bytes=validator.parse_size(args.cache_max_size, "--cache-max-size"),
+        max_age=validator.parse_seconds(args.cache_max_age, "--cache-max-age"),
+    )
+
+
+def _build_partial_cache(
+    args,
+    validator: Validator,
+    sample_rate: Optional[float],
+    memory_limit: Optional[int],
+) -> Optional[PartialCache]:
+    if args.partial_cache is None:
+        return None
+    if sample_rate is not None:
+        raise BadUsageError("--partial-cache нельзя сочетать с --sample")
+    if args.store is not None:
+        raise BadUsageError("--partial-cache нельзя сочетать с --store")
+    # запись кэша держит все ресурсы файла в памяти — лимит бы не соблюдался
+    if memory_limit is not None:
+        raise BadUsageError("--partial-cache нельзя сочетать с --memory-limit")
+    from src.pipeline.partial_cache import PartialCache
+
+    return PartialCache(validator.validate_cache_dir(args.partial_cache))
+
+
+def _build_workers(
+    args,
+    validator: Validator,
+    sample_rate: Optional[float],
+    partial_cache: Optional[PartialCache],
+    memory_limit: Optional[int],
+) -> int:
+    workers = validator.parse_workers(args.workers)
+    if workers == 1:
+        return workers
+    if args.store is not None:
+        raise BadUsageError("--workers нельзя сочетать с --store")
+    if sample_rate is not None:
+        raise BadUsageError("--workers нельзя сочетать с --sample")
+    if partial_cache is not None:
+        raise BadUsageError("--workers нельзя сочетать с --partial-cache")
+    # состояние задачи возвращается словарём всех её ресурсов — лимит бы не соблюдался
+    if memory_limit is not None:
+        raise BadUsageError("--workers нельзя сочетать с --memory-limit")
+    return workers
+
+
+def _build_windows(args, validator: Validator) -> List[DateWindow]:
+    if not args.windows:
+        date_from = validator.parse_from(args.date_from)
+        date_to = validator.parse_to(args.date_to)
+        validator.validate_date_range(date_from, date_to)
+        return [DateWindow(date_from, date_to)]
+
+    if args.date_from is not None or args.date_to is not None:
+        raise BadUsageError("--window нельзя сочетать с --from/--to")
+    windows: List[DateWindow] = []
+    for raw in args.windows:
+        raw_from, raw_to = validator.split_window(raw)
+        date_from = validator.parse_from(raw_from)
+        date_to = validator.parse_to(raw_to)
+        validator.validate_date_range(date_from, date_to)
+        label = f"{raw_from or 'start'}..{raw_to or 'end'}"
+        windows.append(DateWindow(date_from, date_to, re.sub(r"[^\w.-]", "_", label)))
+    return windows
+
+
+def _plan_targets(
+    output: str, formats: List[str], windows: List[DateWindow]
+) -> List[ReportTarget]:
+    """
+    Один формат и одно окно — отчёт пишется ровно в -o (как раньше).
+    Иначе -o задаёт общий префикс: <префикс>[.<окно>]<расширение формата>.
+    """
+    if len(formats) == 1 and len(windows) == 1 and windows[0].label is None:
+        return [ReportTarget(output, formats[0], 0)]
+
+    stem, ext = os.path.splitext(output)
+    if ext not in known_extensions():
+        stem = output
+    targets: List[ReportTarget] = []
+    seen = set()
+    for idx, window in enumerate(windows):
+        infix = f".{window.label}" if window.label else ""
+        for fmt in formats:
+            path = f"{stem}{infix}{get_spec(fmt).extension}"
+            if path in seen:
+                raise BadUsageError(f"Окна дают одинаковое имя отчёта '{path}'")
+            seen.add(path)
+            targets.append(ReportTarget(path, fmt, idx))
+    return targets
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict
+from typing import List
+
+
+class Dictionary:
+    """
+    Словарное кодирование низкокардинальных значений (даты, протоколы и т.п.).
+
+    Каждой метке назначается небольшой целочисленный код в порядке появления,
+    поэтому счётчики можно держать в плоских массивах, индексируемых кодом,
+    и декодировать обратно в метки только при построении результата.
+    """
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self._labels: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_labels(cls, labels: List[str]) -> Dictionary:
+        """Восстанавливает словарь с теми же кодами (например, из файла)."""
+        d = cls()
+        for label in labels:
+            d.encode(label)
+        return d
+
+    @property
+    def labels(self) -> List[str]:
+        """Метки в порядке кодов."""
+        return list(self._labels)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def encode(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self._codes.get(label)
+            if code is None:
+                code = len(self._labels)
+                self._labels.append(label)
+                self._codes[label] = code
+            return code
+
+    def decode(self, code: int) -> str:
+        return self._labels[code]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import sys
+import tempfile
+from typing import IO
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from src.errors import UnexpectedRuntimeError
+from src.tracing import span
+
+logger = logging.getLogger("log-analyzer.external-counter")
+
+# Грубая оценка накладных расходов dict на одну запись (хэш, указатели, int)
+_ENTRY_OVERHEAD = 100
+# Сколько run'ов держать открытыми до их промежуточного слияния в один
+_MAX_RUNS = 64
+
+
+class ExternalCounter:
+    """
+    Счётчик строковых ключей с ограничением по памяти.
+
+    Пока оценка занятой памяти не превышает memory_limit, счётчики живут в dict.
+    При превышении текущие счётчики сортируются по ключу и сбрасываются
+    во временный файл (run), после чего dict очищается. Итоговые точные значения
+    получаются k-way слиянием всех run'ов и остатка в памяти.
+    """
+
+    def __init__(self, memory_limit: int, tmp_dir: Optional[str] = None) -> None:
+        self._limit = memory_limit
+        self._tmp_dir = tmp_dir
+        self._counts: Dict[str, int] = {}
+        self._bytes = 0
+        self._runs: List[IO[str]] = []
+
+    @property
+    def spilled_runs(self) -> int:
+        return len(self._runs)
+
+    def add(self, key: str, count: int = 1) -> None:
+        counts = self._counts
+        current = counts.get(key)
+        if current is not None:
+            counts[key] = current + count
+            return
+        counts[key] = count
+        self._bytes += sys.getsizeof(key) + _ENTRY_OVERHEAD
+        if self._bytes > self._limit:
+            self._spill()
+
+    def _write_run(self, items: Iterable[Tuple[str, int]]) -> IO[str]:
+        try:
+            run = tempfile.TemporaryFile(
+                mode="w+", encoding="utf-8", dir=self._tmp_dir, prefix="log-run-"
+            )
+            for key, count in items:
+                run.write(f"{key}\t{count}\n")
+            run.flush()
+        except OSError as e:
+            raise UnexpectedRuntimeError(f"Не удалось сбросить счётчики на диск: {e}")
+        return run
+
+    def _spill(self) -> None:
+        with span("spill", cat="aggregate", keys=len(self._counts)):
+            run = self._write_run(
+                (key, self._counts[key]) for key in sorted(self._counts)
+            )
+        logger.info(
+            "Лимит памяти достигнут: %s ключей сброшено на диск (run #%s)",
+            len(self._counts),
+            len(self._runs) + 1,
+        )
+        self._runs.append(run)
+        self._counts = {}
+        self._bytes = 0
+        if len(self._runs) >= _MAX_RUNS:
+            # сливаем run'ы в один, чтобы не упереться в лимит дескрипторов
+            merged = self._write_run(self._merge(self._runs))
+            self.close()
+            self._runs = [merged]
+
+    @staticmethod
+    def _read_run(run: IO[str]) -> Iterator[Tuple[str, int]]:
+        run.seek(0)
+        for line in run:
+            key, count = line.rstrip("\n").rsplit("\t", 1)
+            yield key, int(count)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """Все (ключ, количество) в порядке ключей; одинаковые ключи суммируются."""
+        return self._merge(self._runs, sorted(self._counts.items()))
+
+    def _merge(
+        self, runs: List[IO[str]], in_memory: Iterable[Tuple[str, int]] = ()
+    ) -> Iterator[Tuple[str, int]]:
+        streams = [self._read_run(run) for run in runs]
+        streams.append(iter(in_memory))
+        merged = heapq.merge(*streams, key=lambda kv: kv[0])
+
+        current_key: Optional[str] = None
+        current_count = 0
+        for key, count in merged:
+            if key == current_key:
+                current_count += count
+                continue
+            if current_key is not None:
+                yield current_key, current_count
+            current_key, current_count = key, count
+        if current_key is not None:
+            yield current_key, current_count
+
+    def close(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs = []
@@ -1,3 +1,9 @@
+from functools import partial
+from typing import TextIO
+
+from src.formatters.sink import LineWriter
+from src.formatters.sink import sampling_rows
+from src.formatters.sink import render_to_string
 from src.stats_collector import StatsResult
 
 
@@ -8,7 +14,10 @@ class AdocFormatter:
     """
 
     def format(self, result: StatsResult) -> str:
-        lines = []
+        return render_to_string(partial(self.write, result))
+
+    def write(self, result: StatsResult, sink: TextIO) -> None:
+        lines = LineWriter(sink)
 
         # Заголовок
         lines.append("= Отчёт по логам NGINX")
@@ -28,6 +37,57 @@ class AdocFormatter:
         lines.append("|===")
         lines.append("")
 
+        # Оценки по выборке (--sample)
+        if result.sampling:
+            smp = result.sampling
+            lines.append("==== Оценка по выборке")
+            lines.append(
+                f"Доля выборки: {smp.rate:.4%}, блоков: {smp.sampledBlocks}, "
+                f"строк в выборке: {smp.sampledRequestsCount}. Интервалы — 95%."
+            )
+            lines.append("")
+            lines.append('[cols="2,1,1", options="header"]')
+            lines.append("|===")
+            lines.append("| Показатель | Оценка | 95% ДИ")
+            for name, value, ci, unit in sampling_rows(result):
+                lines.append(f"| {name} | {value}{unit} | {ci.low}–{ci.high}{unit}")
+            lines.append("|===")
+            lines.append("")
+
+        # Пропущенные повторы источников (симлинки, хардлинки, копии)
+        if result.skippedDuplicates:
+            lines.append("==== Пропущенные повторы источников")
+            lines.append('[cols="2,2,1", options="header"]')
+            lines.append("|===")
+            lines.append("| Файл | Повтор файла | Признак")
+            for d in result.skippedDuplicates:
+                lines.append(f"| `{d.file}` | `{d.duplicateOf}` | {d.reason}")
+            lines.append("|===")
+            lines.append("")
+
+        # Перцентили и распределение размеров ответа
+        if result.responseSizePercentiles:
+            pct = result.responseSizePercentiles
+            lines.append("==== Перцентили размера ответа")
+            lines.append('[cols="1,1,1,1", options="header"]')
+            lines.append("|===")
+            lines.append("| p50 | p90 | p99 | p99.9")
+            lines.append(f"| {pct.p50}b | {pct.p90}b | {pct.p99}b | {pct.p999}b")
+            lines.append("|===")
+            lines.append("")
+
+        if result.responseSizeDistribution:
+            lines.append("==== Распределение размеров ответа")
+            lines.append('[cols="2,1,1", options="header"]')
+            lines.append("|===")
+            lines.append("| Размер, байт | Кол-во | % от общего")
+            for b in result.responseSizeDistribution:
+                lines.append(
+                    f"| {b.fromBytes}–{b.toBytes} | {b.totalResponsesCount} | {b.totalResponsesPercentage}%"
+                )
+            lines.append("|===")
+            lines.append("")
+
         # Ресурсы
         lines.append("==== Запрашиваемые ресурсы")
         lines.append('[cols="2,1", options="header"]')
@@ -67,10 +127,24 @@ class AdocFormatter:
             lines.append("|===")
             lines.append("")
 
+        # Запросы по интервалам (если задан --bucket)
+        if result.requestsPerBucket:
+            lines.append("==== Запросы по интервалам")
+            lines.append('[cols="2,1,1,1,1,1,1,1", options="header"]')
+            lines.append("|===")
+            lines.append(
+                "| Начало интервала | Кол-во | Байт | 1xx | 2xx | 3xx | 4xx | 5xx"
+            )
+            for b in result.requestsPerBucket:
+                classes = " | ".join(str(c) for c in b.statusClasses.values())
+                lines.append(
+                    f"| {b.start} | {b.totalRequestsCount} | {b.totalBytes} | {classes}"
+                )
+            lines.append("|===")
+            lines.append("")
+
         # Уникальные протоколы
         if result.uniqueProtocols:
             lines.append("==== Уникальные протоколы")
             lines.append(", ".join(f"`{p}`" for p in result.uniqueProtocols))
             lines.append("")
-
-        return "\n".join(lines)
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import datetime as dt
+import io
+import struct
+from typing import BinaryIO
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from src.errors import UnexpectedRuntimeError
+from src.stats_collector import ConfidenceInterval
+from src.stats_collector import RequestPerBucketStat
+from src.stats_collector import RequestPerDateStat
+from src.stats_collector import ResourceStat
+from src.stats_collector import ResponseCodeStat
+from src.stats_collector import ResponseSizeBucketStat
+from src.stats_collector import ResponseSizeInBytes
+from src.stats_collector import ResponseSizePercentiles
+from src.stats_collector import SamplingStat
+from src.stats_collector import SkippedDuplicateStat
+from src.stats_collector import StatsResult
+from src.tracing import span
+
+MAGIC = b"LOGS"
+FORMAT_VERSION = 1
+
+# Теги секций. Секция: тег и длина (varint), затем содержимое.
+# Неизвестные теги при чтении пропускаются — новые секции не ломают старых читателей.
+TAG_FILES = 1
+TAG_TOTALS = 2
+TAG_RESOURCES = 3
+TAG_CODES = 4
+TAG_DATES = 5
+TAG_PROTOCOLS = 6
+TAG_BUCKETS = 7
+TAG_PERCENTILES = 8
+TAG_DISTRIBUTION = 9
+TAG_SAMPLING = 10
+TAG_DUPLICATES = 11
+
+_DOUBLE = struct.Struct("<d")
+
+
+class _Encoder:
+    """Целые — varint (LEB128, со знаком — zigzag), дробные — double, строки — длина + UTF-8."""
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+
+    def uint(self, value: int) -> None:
+        value = int(value)
+        while value > 0x7F:
+            self.buf.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.buf.append(value)
+
+    def sint(self, value: int) -> None:
+        value = int(value)
+        self.uint(value * 2 if value >= 0 else -value * 2 - 1)
+
+    def double(self, value: float) -> None:
+        self.buf += _DOUBLE.pack(float(value))
+
+    def string(self, value: str) -> None:
+        data = value.encode("utf-8")
+        self.uint(len(data))
+        self.buf += data
+
+
+class _Decoder:
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self.pos = 0
+
+    @property
+    def done(self) -> bool:
+        return self.pos >= len(self._data)
+
+    def uint(self) -> int:
+        value = shift = 0
+        while True:
+            if self.pos >= len(self._data):
+                raise UnexpectedRuntimeError("Двоичный отчёт обрезан")
+            byte = self._data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def sint(self) -> int:
+        value = self.uint()
+        return value >> 1 if value % 2 == 0 else -(value >> 1) - 1
+
+    def double(self) -> float:
+        (value,) = _DOUBLE.unpack_from(self.take(_DOUBLE.size))
+        return value
+
+    def take(self, size: int) -> memoryview:
+        if self.pos + size > len(self._data):
+            raise UnexpectedRuntimeError("Двоичный отчёт обрезан")
+        chunk = self._data[self.pos : self.pos + size]
+        self.pos += size
+        return chunk
+
+    def string(self) -> str:
+        return str(self.take(self.uint()), "utf-8")
+
+    def items(self, read: Callable[[], object]) -> list:
+        return [read() for _ in range(self.uint())]
+
+
+def _bucket_ts(start: str) -> int:
+    return int(dt.datetime.fromisoformat(start).timestamp())
+
+
+def _sections(result: StatsResult):
+    """(тег, имя, функция записи содержимого) для непустых частей отчёта."""
+
+    def files(e: _Encoder) -> None:
+        e.uint(len(result.files))
+        for f in result.files:
+            e.string(f)
+
+    def totals(e: _Encoder) -> None:
+        sizes = result.responseSizeInBytes
+        e.uint(result.totalRequestsCount)
+        e.double(sizes.average)
+        e.double(sizes.max)
+        e.double(sizes.p95)
+
+    def resources(e: _Encoder) -> None:
+        e.uint(len(result.resources))
+        for r in result.resources:
+            e.string(r.resource)
+            e.uint(r.totalRequestsCount)
+
+    def codes(e: _Encoder) -> None:
+        e.uint(len(result.responseCodes))
+        for rc in result.responseCodes:
+            e.uint(rc.code)
+            e.uint(rc.totalResponsesCount)
+
+    def dates(e: _Encoder) -> None:
+        # день недели не хранится — восстанавливается по дате
+        e.uint(len(result.requestsPerDate))
+        for d in result.requestsPerDate:
+            e.string(d.date)
+            e.uint(d.totalRequestsCount)
+            e.double(d.totalRequestsPercentage)
+
+    def protocols(e: _Encoder) -> None:
+        e.uint(len(result.uniqueProtocols))
+        for p in result.uniqueProtocols:
+            e.string(p)
+
+    def buckets(e: _Encoder) -> None:
+        # имена классов статусов — один раз; начало интервала — разностью с предыдущим
+        classes = list(result.requestsPerBucket[0].statusClasses)
+        e.uint(len(classes))
+        for name in classes:
+            e.string(name)
+        e.uint(len(result.requestsPerBucket))
+        prev = 0
+        for b in result.requestsPerBucket:
+            ts = _bucket_ts(b.start)
+            e.sint(ts - prev)
+            prev = ts
+            e.uint(b.totalRequestsCount)
+            e.uint(b.totalBytes)
+            for name in classes:
+                e.uint(b.statusClasses[name])
+
+    def percentiles(e: _Encoder) -> None:
+        pct = result.responseSizePercentiles
+        for value in (pct.p50, pct.p90, pct.p99, pct.p999):
+            e.double(value)
+
+    def distribution(e: _Encoder) -> None:
+        e.uint(len(result.responseSizeDistribution))
+        for b in result.responseSizeDistribution:
+            e.uint(b.fromBytes)
+            e.uint(b.toBytes)
+            e.uint(b.totalResponsesCount)
+            e.double(b.totalResponsesPercentage)
+
+    def sampling(e: _Encoder) -> None:
+        # интервалы счётчиков — целые, интервалы p95 и долей — дробные
+        smp = result.sampling
+        e.double(smp.rate)
+        e.uint(smp.sampledRequestsCount)
+        e.uint(smp.sampledBlocks)
+        e.uint(smp.totalRequestsCount.low)
+        e.uint(smp.totalRequestsCount.high)
+        e.double(smp.responseSizeP95.low)
+        e.double(smp.responseSizeP95.high)
+        e.uint(len(smp.responseCodes))
+        for code, ci in smp.responseCodes.items():
+            e.uint(code)
+            e.uint(ci.low)
+            e.uint(ci.high)
+        e.uint(len(smp.requestsPerDatePercentage))
+        for date, ci in smp.requestsPerDatePercentage.items():
+            e.string(date)
+            e.double(ci.low)
+            e.double(ci.high)
+
+    def duplicates(e: _Encoder) -> None:
+        e.uint(len(result.skippedDuplicates))
+        for d in result.skippedDuplicates:
+            e.string(d.file)
+            e.string(d.duplicateOf)
+            e.string(d.reason)
+
+    yield TAG_FILES, "files", files
+    yield TAG_TOTALS, "totals", totals
+    yield TAG_RESOURCES, "resources", resources
+    yield TAG_CODES, "codes", codes
+    if result.requestsPerDate:
+        yield TAG_DATES, "dates", dates
+    if result.uniqueProtocols:
+        yield TAG_PROTOCOLS, "protocols", protocols
+    if result.requestsPerBucket:
+        yield TAG_BUCKETS, "buckets", buckets
+    if result.responseSizePercentiles:
+        yield TAG_PERCENTILES, "percentiles", percentiles
+    if result.responseSizeDistribution:
+        yield TAG_DISTRIBUTION, "distribution", distribution
+    if result.sampling:
+        yield TAG_SAMPLING, "sampling", sampling
+    if result.skippedDuplicates:
+        yield TAG_DUPLICATES, "duplicates", duplicates
+
+
+class BinaryFormatter:
+    """
+    Компактное двоичное представление StatsResult (.bin): MAGIC, версия формата
+    и секции с длиной. Читается обратно через read_result() без разбора JSON.
+    """
+
+    def format(self, result: StatsResult) -> bytes:
+        buf = io.BytesIO()
+        self.write(result, buf)
+        return buf.getvalue()
+
+    def write(self, result: StatsResult, sink: BinaryIO) -> None:
+        header = _Encoder()
+        header.buf += MAGIC
+        header.uint(FORMAT_VERSION)
+        sink.write(header.buf)
+        for tag, name, encode in _sections(result):
+            with span(name, cat="format"):
+                body = _Encoder()
+                encode(body)
+                frame = _Encoder()
+                frame.uint(tag)
+                frame.uint(len(body.buf))
+                sink.write(frame.buf)
+                sink.write(body.buf)
+
+
+def _read_buckets(d: _Decoder) -> List[RequestPerBucketStat]:
+    classes = d.items(d.string)
+    buckets: List[RequestPerBucketStat] = []
+    ts = 0
+    for _ in range(d.uint()):
+        ts += d.sint()
+        start = dt.datetime.fromtimestamp(ts, tz=dt.timezone.utc).isoformat()
+        count, size = d.uint(), d.uint()
+        statuses = {name: d.uint() for name in classes}
+        buckets.append(RequestPerBucketStat(start, count, size, statuses))
+    return buckets
+
+
+def _read_sampling(d: _Decoder) -> SamplingStat:
+    rate = d.double()
+    sampled, blocks = d.uint(), d.uint()
+    total = ConfidenceInterval(d.uint(), d.uint())
+    p95 = ConfidenceInterval(d.double(), d.double())
+    codes: Dict[int, ConfidenceInterval] = {}
+    for _ in range(d.uint()):
+        code = d.uint()
+        codes[code] = ConfidenceInterval(d.uint(), d.uint())
+    dates: Dict[str, ConfidenceInterval] = {}
+    for _ in range(d.uint()):
+        date = d.string()
+        dates[date] = ConfidenceInterval(d.double(), d.double())
+    return SamplingStat(rate, sampled, blocks, total, p95, codes, dates)
+
+
+def read_result(data: bytes) -> StatsResult:
+    """Восстанавливает StatsResult из двоичного отчёта (без allResources)."""
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise UnexpectedRuntimeError("Это не двоичный отчёт log-analyzer")
+    d = _Decoder(data)
+    d.pos = len(MAGIC)
+    version = d.uint()
+    if version != FORMAT_VERSION:
+        raise UnexpectedRuntimeError(
+            f"Неподдерживаемая версия двоичного отчёта: {version}"
+        )
+
+    result = StatsResult(
+        files=[],
+        totalRequestsCount=0,
+        responseSizeInBytes=ResponseSizeInBytes(0.0, 0.0, 0.0),
+        resources=[],
+        responseCodes=[],
+    )
+    while not d.done:
+        tag = d.uint()
+        section = _Decoder(d.take(d.uint()))
+        if tag == TAG_FILES:
+            result.files = section.items(section.string)
+        elif tag == TAG_TOTALS:
+            result.totalRequestsCount = section.uint()
+            result.responseSizeInBytes = ResponseSizeInBytes(
+                section.double(), section.double(), section.double()
+            )
+        elif tag == TAG_RESOURCES:
+            result.resources = section.items(
+                lambda: ResourceStat(section.string(), section.uint())
+            )
+        elif tag == TAG_CODES:
+            result.responseCodes = section.items(
+                lambda: ResponseCodeStat(section.uint(), section.uint())
+            )
+        elif tag == TAG_DATES:
+            result.requestsPerDate = []
+            for _ in range(section.uint()):
+                date = section.string()
+                weekday = dt.date.fromisoformat(date).strftime("%A")
+                count, pct = section.uint(), section.double()
+                result.requestsPerDate.append(
+                    RequestPerDateStat(date, weekday, count, pct)
+                )
+        elif tag == TAG_PROTOCOLS:
+            result.uniqueProtocols = section.items(section.string)
+        elif tag == TAG_BUCKETS:
+            result.requestsPerBucket = _read_buckets(section)
+        elif tag == TAG_PERCENTILES:
+            result.responseSizePercentiles = ResponseSizePercentiles(
+                section.double(), section.double(), section.double(), section.double()
+            )
+        elif tag == TAG_DISTRIBUTION:
+            result.responseSizeDistribution = section.items(
+                lambda: ResponseSizeBucketStat(
+                    section.uint(), section.uint(), section.uint(), section.double()
+                )
+            )
+        elif tag == TAG_SAMPLING:
+            result.sampling = _read_sampling(section)
+        elif tag == TAG_DUPLICATES:
+            result.skippedDuplicates = section.items(
+                lambda: SkippedDuplicateStat(
+                    section.string(), section.string(), section.string()
+                )
+            )
+    return result
@@ -0,0 +1,132 @@
+import csv
+from functools import partial
+from typing import Iterator
+from typing import TextIO
+from typing import Tuple
+
+from src.formatters.sink import render_to_string
+from src.stats_collector import StatsResult
+from src.tracing import span
+
+HEADER = ("table", "key", "metric", "value")
+
+Row = Tuple[str, object, str, object]
+
+
+def _summary(result: StatsResult) -> Iterator[Row]:
+    sizes = result.responseSizeInBytes
+    yield "summary", "requests", "totalRequestsCount", result.totalRequestsCount
+    yield "summary", "responseSizeInBytes", "average", sizes.average
+    yield "summary", "responseSizeInBytes", "max", sizes.max
+    yield "summary", "responseSizeInBytes", "p95", sizes.p95
+    if result.responseSizePercentiles:
+        pct = result.responseSizePercentiles
+        yield "summary", "responseSizeInBytes", "p50", pct.p50
+        yield "summary", "responseSizeInBytes", "p90", pct.p90
+        yield "summary", "responseSizeInBytes", "p99", pct.p99
+        yield "summary", "responseSizeInBytes", "p99.9", pct.p999
+
+
+def _resources(result: StatsResult) -> Iterator[Row]:
+    # все ресурсы (в порядке ресурса), а не топ-10 из отчёта
+    resources = result.allResources
+    if resources is None:
+        resources = result.resources
+    for r in resources:
+        yield "resources", r.resource, "totalRequestsCount", r.totalRequestsCount
+
+
+def _codes(result: StatsResult) -> Iterator[Row]:
+    for rc in result.responseCodes:
+        yield "responseCodes", rc.code, "totalResponsesCount", rc.totalResponsesCount
+
+
+def _dates(result: StatsResult) -> Iterator[Row]:
+    for d in result.requestsPerDate:
+        yield "requestsPerDate", d.date, "totalRequestsCount", d.totalRequestsCount
+        yield (
+            "requestsPerDate",
+            d.date,
+            "totalRequestsPercentage",
+            d.totalRequestsPercentage,
+        )
+
+
+def _buckets(result: StatsResult) -> Iterator[Row]:
+    for b in result.requestsPerBucket:
+        yield "requestsPerBucket", b.start, "totalRequestsCount", b.totalRequestsCount
+        yield "requestsPerBucket", b.start, "totalBytes", b.totalBytes
+        for name, count in b.statusClasses.items():
+            yield "requestsPerBucket", b.start, name, count
+
+
+def _distribution(result: StatsResult) -> Iterator[Row]:
+    for b in result.responseSizeDistribution:
+        key = f"{b.fromBytes}-{b.toBytes}"
+        yield (
+            "responseSizeDistribution",
+            key,
+            "totalResponsesCount",
+            b.totalResponsesCount,
+        )
+        yield (
+            "responseSizeDistribution",
+            key,
+            "totalResponsesPercentage",
+            b.totalResponsesPercentage,
+        )
+
+
+def _sampling(result: StatsResult) -> Iterator[Row]:
+    """Доверительные интервалы — метрики <метрика>.low/.high тех же строк."""
+    smp = result.sampling
+    if smp is None:
+        return
+    yield "sampling", "", "rate", smp.rate
+    yield "sampling", "", "sampledRequestsCount", smp.sampledRequestsCount
+    yield "sampling", "", "sampledBlocks", smp.sampledBlocks
+    intervals = [
+        ("summary", "requests", "totalRequestsCount", smp.totalRequestsCount),
+        ("summary", "responseSizeInBytes", "p95", smp.responseSizeP95),
+    ]
+    intervals += [
+        ("responseCodes", code, "totalResponsesCount", ci)
+        for code, ci in smp.responseCodes.items()
+    ]
+    intervals += [
+        ("requestsPerDate", date, "totalRequestsPercentage", ci)
+        for date, ci in smp.requestsPerDatePercentage.items()
+    ]
+    for table, key, metric, ci in intervals:
+        yield table, key, f"{metric}.low", ci.low
+        yield table, key, f"{metric}.high", ci.high
+
+
+_TABLES = {
+    "summary": _summary,
+    "resources": _resources,
+    "responseCodes": _codes,
+    "requestsPerDate": _dates,
+    "requestsPerBucket": _buckets,
+    "responseSizeDistribution": _distribution,
+    "sampling": _sampling,
+}
+
+
+class CsvFormatter:
+    """
+    Таблицы отчёта одной «длинной» таблицей table,key,metric,value — для загрузки
+    в pandas/SQL без разбора JSON. Пишется потоково, по строке; ресурсы выгружаются
+    полностью. Списки файлов, протоколов и пропущенных повторов — только в других
+    форматах.
+    """
+
+    def format(self, result: StatsResult) -> str:
+        return render_to_string(partial(self.write, result))
+
+    def write(self, result: StatsResult, sink: TextIO) -> None:
+        writer = csv.writer(sink, lineterminator="\n")
+        writer.writerow(HEADER)
+        for name, rows in _TABLES.items():
+            with span(name, cat="format"):
+                writer.writerows(rows(result))
@@ -1,12 +1,55 @@
 import json
+from collections.abc import Iterator
+from functools import partial
 from typing import Any
 from typing import Dict
+from typing import TextIO
 
+from src.formatters.sink import render_to_string
 from src.stats_collector import StatsResult
+from src.tracing import span
+
+_INDENT = "  "
+
+
+def _dumps(value: Any, level: int) -> str:
+    text = json.dumps(value, ensure_ascii=False, indent=len(_INDENT))
+    return text.replace("\n", "\n" + _INDENT * level)
+
+
+def _write_items(sink: TextIO, items: Iterator[Any], level: int) -> None:
+    """Пишет массив поэлементно — вывод совпадает с json.dumps(indent=2)."""
+    pad = "\n" + _INDENT * (level + 1)
+    first = True
+    for item in items:
+        sink.write("[" + pad if first else "," + pad)
+        sink.write(_dumps(item, level + 1))
+        first = False
+    sink.write("[]" if first else "\n" + _INDENT * level + "]")
+
+
+def _write_payload(sink: TextIO, payload: Dict[str, Any]) -> None:
+    pad = "\n" + _INDENT
+    first = True
+    for key, value in payload.items():
+        sink.write("{" + pad if first else "," + pad)
+        sink.write(json.dumps(key, ensure_ascii=False) + ": ")
+        # секции — генераторы, так что интервал охватывает и их вычисление
+        with span(key, cat="format"):
+            if isinstance(value, (list, Iterator)):
+                _write_items(sink, iter(value), 1)
+            else:
+                sink.write(_dumps(value, 1))
+        first = False
+    sink.write("{}" if first else "\n}")
 
 
 class JsonFormatter:
     def format(self, result: StatsResult) -> str:
+        return render_to_string(partial(self.write, result))
+
+    def write(self, result: StatsResult, sink: TextIO) -> None:
+        # таблицы — генераторы: секции сериализуются и пишутся по одной записи
         payload: Dict[str, Any] = {
             "files": list(result.files),
             "totalRequestsCount": int(result.totalRequestsCount),
@@ -15,24 +58,44 @@ class JsonFormatter:
                 "max": float(result.responseSizeInBytes.max),
                 "p95": float(result.responseSizeInBytes.p95),
             },
-            "resources": [
+            "resources": (
                 {
                     "resource": r.resource,
                     "totalRequestsCount": int(r.totalRequestsCount),
                 }
                 for r in result.resources
-            ],
-            "responseCodes": [
+            ),
+            "responseCodes": (
                 {
                     "code": int(rc.code),
                     "totalResponsesCount": int(rc.totalResponsesCount),
                 }
                 for rc in result.responseCodes
-            ],
+            ),
         }
 
+        if result.responseSizePercentiles:
+            pct = result.responseSizePercentiles
+            payload["responseSizePercentiles"] = {
+                "p50": float(pct.p50),
+                "p90": float(pct.p90),
+                "p99": float(pct.p99),
+                "p99.9": float(pct.p999),
+            }
+
+        if result.responseSizeDistribution:
+            payload["responseSizeDistribution"] = (
+                {
+                    "fromBytes": int(b.fromBytes),
+                    "toBytes": int(b.toBytes),
+                    "totalResponsesCount": int(b.totalResponsesCount),
+                    "totalResponsesPercentage": float(b.totalResponsesPercentage),
+                }
+                for b in result.responseSizeDistribution
+            )
+
         if result.requestsPerDate:
-            payload["requestsPerDate"] = [
+            payload["requestsPerDate"] = (
                 {
                     "date": d.date,
                     "weekday": d.weekday,
@@ -40,9 +103,49 @@ class JsonFormatter:
                     "totalRequestsPercentage": float(d.totalRequestsPercentage),
                 }
                 for d in result.requestsPerDate
-            ]
+            )
+
+        if result.requestsPerBucket:
+            payload["requestsPerBucket"] = (
+                {
+                    "start": b.start,
+                    "totalRequestsCount": int(b.totalRequestsCount),
+                    "totalBytes": int(b.totalBytes),
+                    "statusClasses": {k: int(v) for k, v in b.statusClasses.items()},
+                }
+                for b in result.requestsPerBucket
+            )
 
         if result.uniqueProtocols:
             payload["uniqueProtocols"] = list(result.uniqueProtocols)
 
-        return json.dumps(payload, ensure_ascii=False, indent=2)
+        if result.sampling:
+            smp = result.sampling
+
+            def interval(ci):
+                return {"low": ci.low, "high": ci.high}
+
+            payload["sampling"] = {
+                "rate": float(smp.rate),
+                "sampledRequestsCount": int(smp.sampledRequestsCount),
+                "sampledBlocks": int(smp.sampledBlocks),
+                "confidenceLevel": 0.95,
+                "totalRequestsCount": interval(smp.totalRequestsCount),
+                "responseSizeP95": interval(smp.responseSizeP95),
+                "responseCodes": [
+                    {"code": int(code), **interval(ci)}
+                    for code, ci in smp.responseCodes.items()
+                ],
+                "requestsPerDatePercentage": [
+                    {"date": date, **interval(ci)}
+                    for date, ci in smp.requestsPerDatePercentage.items()
+                ],
+            }
+
+        if result.skippedDuplicates:
+            payload["skippedDuplicates"] = [
+                {"file": d.file, "duplicateOf": d.duplicateOf, "reason": d.reason}
+                for d in result.skippedDuplicates
+            ]
+
+        _write_payload(sink, payload)
@@ -1,9 +1,18 @@
+from functools import partial
+from typing import TextIO
+
+from src.formatters.sink import LineWriter
+from src.formatters.sink import sampling_rows
+from src.formatters.sink import render_to_string
 from src.stats_collector import StatsResult
 
 
 class MarkdownFormatter:
     def format(self, result: StatsResult) -> str:
-        lines = []
+        return render_to_string(partial(self.write, result))
+
+    def write(self, result: StatsResult, sink: TextIO) -> None:
+        lines = LineWriter(sink)
         lines.append("#### Общая информация\n")
         lines.append("|        Метрика        |     Значение |")
         lines.append("|:---------------------:|-------------:|")
@@ -16,6 +25,41 @@ class MarkdownFormatter:
         lines.append(f"| Максимальный ответ    | {result.responseSizeInBytes.max}b |")
         lines.append(f"|   95p размера ответа  | {result.responseSizeInBytes.p95}b |")
         lines.append("")
+        if result.sampling:
+            smp = result.sampling
+            lines.append("#### Оценка по выборке\n")
+            lines.append(
+                f"Доля выборки: {smp.rate:.4%}, блоков: {smp.sampledBlocks}, "
+                f"строк в выборке: {smp.sampledRequestsCount}. Интервалы — 95%.\n"
+            )
+            lines.append("|       Показатель       |   Оценка |       95% ДИ |")
+            lines.append("|:----------------------:|---------:|-------------:|")
+            for name, value, ci, unit in sampling_rows(result):
+                lines.append(f"| {name} | {value}{unit} | {ci.low}–{ci.high}{unit} |")
+            lines.append("")
+        if result.skippedDuplicates:
+            lines.append("#### Пропущенные повторы источников\n")
+            lines.append("|     Файл      |    Повтор файла    | Признак |")
+            lines.append("|:-------------:|:------------------:|:-------:|")
+            for d in result.skippedDuplicates:
+                lines.append(f"| `{d.file}` | `{d.duplicateOf}` | {d.reason} |")
+            lines.append("")
+        if result.responseSizePercentiles:
+            pct = result.responseSizePercentiles
+            lines.append("#### Перцентили размера ответа\n")
+            lines.append("|  p50  |  p90  |  p99  | p99.9 |")
+            lines.append("|------:|------:|------:|------:|")
+            lines.append(f"| {pct.p50}b | {pct.p90}b | {pct.p99}b | {pct.p999}b |")
+            lines.append("")
+        if result.responseSizeDistribution:
+            lines.append("#### Распределение размеров ответа\n")
+            lines.append("|   Размер, байт   | Кол-во |  % от общего |")
+            lines.append("|:----------------:|-------:|-------------:|")
+            for b in result.responseSizeDistribution:
+                lines.append(
+                    f"| {b.fromBytes}–{b.toBytes} | {b.totalResponsesCount} | {b.totalResponsesPercentage}% |"
+                )
+            lines.append("")
         lines.append("#### Запрашиваемые ресурсы\n")
         lines.append("|     Ресурс      | Количество |")
         lines.append("|:---------------:|-----------:|")
@@ -43,8 +87,21 @@ class MarkdownFormatter:
                     f"| {d.date} | {d.weekday} | {d.totalRequestsCount} | {d.totalRequestsPercentage}% |"
                 )
             lines.append("")
+        if result.requestsPerBucket:
+            lines.append("#### Запросы по интервалам\n")
+            lines.append(
+                "|      Начало интервала      | Кол-во |  Байт | 1xx | 2xx | 3xx | 4xx | 5xx |"
+            )
+            lines.append(
+                "|:--------------------------:|-------:|------:|----:|----:|----:|----:|----:|"
+            )
+            for b in result.requestsPerBucket:
+                classes = " | ".join(str(c) for c in b.statusClasses.values())
+                lines.append(
+                    f"| {b.start} | {b.totalRequestsCount} | {b.totalBytes} | {classes} |"
+                )
+            lines.append("")
         if result.uniqueProtocols:
             lines.append("#### Уникальные протоколы\n")
             lines.append(", ".join(f"`{p}`" for p in result.uniqueProtocols))
             lines.append("")
-        return "\n".join(lines)
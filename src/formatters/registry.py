@@ -1,16 +1,141 @@
+import importlib
+import logging
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+
 from src.errors import BadUsageError
 
-from src.formatters.adoc_formatter import AdocFormatter
-from src.formatters.json_formatter import JsonFormatter
-from src.formatters.markdown_formatter import MarkdownFormatter
+# Группа entry points, через которую сторонние пакеты добавляют форматы
+ENTRY_POINT_GROUP = "log_analyzer.formatters"
 
+logger = logging.getLogger("log-analyzer.formatters")
 
-def get_formatter(name: str):
+
+@dataclass(frozen=True)
+class FormatterSpec:
+    """
+    Описание формата отчёта. Класс форматтера задаётся строкой "модуль:Класс"
+    и импортируется лениво: загружается только выбранный формат.
+    """
+
+    name: str
+    target: str
+    extension: str
+    binary: bool = False  # write() получает байтовый приёмник
+    content_type: str = "application/octet-stream"
+
+    def load(self):
+        module_name, _, class_name = self.target.partition(":")
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            raise BadUsageError(f"Не удалось загрузить формат '{self.name}': {e}")
+        return cls()
+
+
+_FORMATTERS: Dict[str, FormatterSpec] = {}
+_entry_points_loaded = False
+
+
+def register_formatter(
+    name: str,
+    target: str,
+    extension: str,
+    binary: bool = False,
+    content_type: str = "application/octet-stream",
+) -> FormatterSpec:
+    key = name.strip().lower()
+    if key in _FORMATTERS:
+        raise ValueError(f"Формат '{key}' уже зарегистрирован")
+    spec = FormatterSpec(key, target, extension, binary, content_type)
+    _FORMATTERS[key] = spec
+    return spec
+
+
+def _load_entry_points() -> None:
+    """
+    Форматы из установленных пакетов. Entry point указывает на класс
+    ("пакет.модуль:Класс"), расширение и тип содержимого — его атрибуты
+    extension/binary/content_type; класс импортируется здесь один раз.
+    Сломанный плагин пропускается с предупреждением.
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name.strip().lower() in _FORMATTERS:
+            continue
+        try:
+            cls = ep.load()
+            register_formatter(
+                ep.name,
+                ep.value,
+                cls.extension,
+                getattr(cls, "binary", False),
+                getattr(cls, "content_type", "application/octet-stream"),
+            )
+        except Exception as e:
+            logger.warning("Формат '%s' из %s пропущен: %s", ep.name, ep.value, e)
+
+
+def get_spec(name: str) -> FormatterSpec:
     key = (name or "").strip().lower()
-    if key == "json":
-        return JsonFormatter()
-    if key == "markdown":
-        return MarkdownFormatter()
-    if key == "adoc":
-        return AdocFormatter()
-    raise BadUsageError(f"Неподдерживаемый формат: {name}")
+    if key not in _FORMATTERS:
+        # сторонние форматы ищутся только для незнакомого имени
+        _load_entry_points()
+    if key not in _FORMATTERS:
+        raise BadUsageError(
+            f"Неподдерживаемый формат '{name}'. "
+            f"Допустимо: {', '.join(available_formats())}"
+        )
+    return _FORMATTERS[key]
+
+
+def available_formats() -> List[str]:
+    _load_entry_points()
+    return sorted(_FORMATTERS)
+
+
+def known_extensions() -> List[str]:
+    """Расширения встроенных и уже загруженных форматов."""
+    return [spec.extension for spec in _FORMATTERS.values()]
+
+
+def get_formatter(name: str):
+    return get_spec(name).load()
+
+
+register_formatter(
+    "json",
+    "src.formatters.json_formatter:JsonFormatter",
+    ".json",
+    content_type="application/json; charset=utf-8",
+)
+register_formatter(
+    "markdown",
+    "src.formatters.markdown_formatter:MarkdownFormatter",
+    ".md",
+    content_type="text/markdown; charset=utf-8",
+)
+register_formatter(
+    "adoc",
+    "src.formatters.adoc_formatter:AdocFormatter",
+    ".ad",
+    content_type="text/asciidoc; charset=utf-8",
+)
+register_formatter(
+    "csv",
+    "src.formatters.csv_formatter:CsvFormatter",
+    ".csv",
+    content_type="text/csv; charset=utf-8",
+)
+register_formatter(
+    "binary",
+    "src.formatters.binary_formatter:BinaryFormatter",
+    ".bin",
+    binary=True,
+)
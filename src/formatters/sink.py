@@ -0,0 +1,49 @@
+import io
+from typing import Callable
+from typing import Iterator
+from typing import TextIO
+from typing import Tuple
+
+from src.stats_collector import ConfidenceInterval
+from src.stats_collector import StatsResult
+
+
+class LineWriter:
+    """
+    Построчная запись отчёта в файловый приёмник.
+
+    Строки разделяются переводом строки (как "\\n".join), но сразу уходят
+    в приёмник, а не копятся в памяти.
+    """
+
+    def __init__(self, sink: TextIO) -> None:
+        self._sink = sink
+        self._first = True
+
+    def append(self, text: str) -> None:
+        if self._first:
+            self._first = False
+        else:
+            self._sink.write("\n")
+        self._sink.write(text)
+
+
+def render_to_string(write: Callable[[TextIO], None]) -> str:
+    """Собирает потоковый вывод в строку (для небольших отчётов и тестов)."""
+    buf = io.StringIO()
+    write(buf)
+    return buf.getvalue()
+
+
+def sampling_rows(
+    result: StatsResult,
+) -> Iterator[Tuple[str, object, ConfidenceInterval, str]]:
+    """Строки таблицы оценок по выборке: (показатель, оценка, интервал, единица)."""
+    smp = result.sampling
+    yield "Количество запросов", result.totalRequestsCount, smp.totalRequestsCount, ""
+    yield "95p размера ответа", result.responseSizeInBytes.p95, smp.responseSizeP95, "b"
+    for rc in result.responseCodes:
+        yield f"Код {rc.code}", rc.totalResponsesCount, smp.responseCodes[rc.code], ""
+    for d in result.requestsPerDate:
+        ci = smp.requestsPerDatePercentage[d.date]
+        yield f"% запросов за {d.date}", d.totalRequestsPercentage, ci, "%"
@@ -1,16 +1,25 @@
 import sys
 
 import logging
+from functools import partial
 
 from src.cli.args import parse_args
+from src.cli.args import parse_ingest_args
+from src.cli.args import parse_serve_args
 from src.config import build_app_config
+from src.config import build_ingest_config
+from src.config import build_serve_config
 from src.errors import BadUsageError
 from src.errors import UnexpectedRuntimeError
 from src.exit_codes import ExitCode
-from src.formatters.registry import get_formatter
+from src.formatters.registry import get_spec
 from src.logging_setup import setup_logging
 from src.pipeline.executor import execute_pipeline
 from src.report_writer import write_report
+from src.tracing import disable_tracing
+from src.tracing import enable_tracing
+from src.tracing import span
+from src.tracing import tracer
 from src.validator import Validator
 
 logger = logging.getLogger("log-analyzer")
@@ -18,24 +27,44 @@ logger = logging.getLogger("log-analyzer")
 
 def run(argv=None) -> int:
     setup_logging()
+    argv = sys.argv[1:] if argv is None else list(argv)
     try:
+        if argv and argv[0] == "serve":
+            return _serve(argv[1:])
+        if argv and argv[0] == "ingest":
+            return _ingest(argv[1:])
+
         args = parse_args(argv)
         validator = Validator()
         config = build_app_config(args, validator)
 
         logger.info("Параметры успешно проверены.")
-        logger.info("Формат отчета: %s", config.output_format)
-        logger.info("Выходной файл: %s", config.output_path)
+        logger.info("Формат отчета: %s", ", ".join(config.output_formats))
         logger.info("Источник логов: %s", config.input_path)
-        if config.date_from:
-            logger.info("--from: %s", config.date_from.isoformat())
-        if config.date_to:
-            logger.info("--to: %s", config.date_to.isoformat())
-
-        result = execute_pipeline(config)
-        formatter = get_formatter(config.output_format)
-        report = formatter.format(result)
-        write_report(config.output_path, report)
+        for window in config.windows:
+            if window.date_from:
+                logger.info("--from: %s", window.date_from.isoformat())
+            if window.date_to:
+                logger.info("--to: %s", window.date_to.isoformat())
+        if config.bucket_seconds:
+            logger.info("--bucket: %s с", config.bucket_seconds)
+
+        if config.trace_path:
+            enable_tracing()
+        try:
+            results = execute_pipeline(config)
+            for target in config.targets:
+                logger.info("Выходной файл: %s", target.path)
+                spec = get_spec(target.output_format)
+                formatter = spec.load()
+                result = results[target.window_index]
+                with span("report", cat="format", path=target.path):
+                    write_report(
+                        target.path, partial(formatter.write, result), spec.binary
+                    )
+        finally:
+            if config.trace_path:
+                _write_trace(config.trace_path)
         return ExitCode.OK
 
     except SystemExit as e:
@@ -52,5 +81,41 @@ def run(argv=None) -> int:
         return ExitCode.UNEXPECTED_ERROR
 
 
+def _write_trace(path: str) -> None:
+    trace = tracer()
+    disable_tracing()
+    write_report(path, trace.write)
+    logger.info("Трасса записана: %s", path)
+
+
+def _ingest(argv) -> int:
+    from src.pipeline.ingest import execute_ingest
+
+    config = build_ingest_config(parse_ingest_args(argv), Validator())
+    logger.info("Источник логов: %s", config.input_path)
+    if config.trace_path:
+        enable_tracing()
+    try:
+        added = execute_ingest(config)
+    finally:
+        if config.trace_path:
+            _write_trace(config.trace_path)
+    logger.info("В хранилище %s добавлено записей: %s", config.store_path, added)
+    return ExitCode.OK
+
+
+def _serve(argv) -> int:
+    # http.server и состояние демона нужны только в режиме serve
+    from src.serve.daemon import Daemon
+
+    validator = Validator()
+    config = build_serve_config(parse_serve_args(argv), validator)
+    logger.info("Источник логов: %s", config.input_path)
+    daemon = Daemon(config, validator)
+    daemon.load()
+    daemon.serve_forever()
+    return ExitCode.OK
+
+
 if __name__ == "__main__":
     sys.exit(run(sys.argv[1:]))
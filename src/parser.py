@@ -2,7 +2,11 @@ import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Dict
 from typing import Optional
+from typing import Tuple
+
+from src.dictionary import Dictionary
 
 logger = logging.getLogger("log-analyzer.parser")
 
@@ -18,7 +22,12 @@ class LogEntry:
     response_size: int
     date_str: str
     weekday: str
+    date_code: int  # код date_str в DATES
+    protocol_code: int  # код protocol в PROTOCOLS
+
 
+# Меняется при любом изменении разбора строк: входит в ключ кэша частичных результатов
+PARSER_VERSION = 1
 
 _LOG_PATTERN = re.compile(
     r"^(?P<ip>\S+)\s+-\s+(?P<remote_user>\S+)\s+\[(?P<time_local>[^\]]+)\]\s+"
@@ -27,6 +36,24 @@ _LOG_PATTERN = re.compile(
 )
 
 
+# Словари низкокардинальных измерений: коды назначаются при парсинге
+DATES = Dictionary()
+PROTOCOLS = Dictionary()
+
+# "17/May/2015" -> (код даты, ISO-дата, день недели); считается один раз на дату
+_DATE_CACHE: Dict[str, Tuple[int, str, str]] = {}
+
+
+def _date_info(raw_time: str, ts: datetime) -> Tuple[int, str, str]:
+    key = raw_time[:11]
+    info = _DATE_CACHE.get(key)
+    if info is None:
+        date_str = ts.date().isoformat()
+        info = (DATES.encode(date_str), date_str, ts.strftime("%A"))
+        _DATE_CACHE[key] = info
+    return info
+
+
 def _parse_timestamp(raw_time: str) -> datetime:
     dt = datetime.strptime(raw_time, "%d/%b/%Y:%H:%M:%S %z")
     return dt
@@ -40,11 +67,13 @@ def parse_line(raw_line: str) -> Optional[LogEntry]:
         )
         return None
     try:
-        ts = _parse_timestamp(m.group("time_local"))
+        raw_time = m.group("time_local")
+        ts = _parse_timestamp(raw_time)
         size_str = m.group("size")
         response_size = 0 if size_str == "-" else int(size_str)
         status = int(m.group("status"))
         protocol = m.group("protocol").strip()
+        date_code, date_str, weekday = _date_info(raw_time, ts)
         entry = LogEntry(
             ip=m.group("ip"),
             timestamp=ts,
@@ -53,8 +82,10 @@ def parse_line(raw_line: str) -> Optional[LogEntry]:
             protocol=protocol,
             status_code=status,
             response_size=response_size,
-            date_str=ts.date().isoformat(),
-            weekday=ts.strftime("%A"),
+            date_str=date_str,
+            weekday=weekday,
+            date_code=date_code,
+            protocol_code=PROTOCOLS.encode(protocol),
         )
         return entry
     except Exception as e:
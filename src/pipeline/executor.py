@@ -1,31 +1,307 @@
+import itertools
 import logging
+from array import array
+from typing import TYPE_CHECKING
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+from src.config import DateWindow
 from src.errors import UnexpectedRuntimeError
 from src.parser import parse_line
 from src.reader import make_reader_for
+from src.sources import STDIN_SOURCE
+from src.stats_collector import SkippedDuplicateStat
 from src.stats_collector import StatsCollector
+from src.stats_collector import StatsResult
+from src.tracing import disable_tracing
+from src.tracing import enable_tracing
+from src.tracing import span
+from src.tracing import tracer
+
+if TYPE_CHECKING:
+    from src.row_filter import RowFilter
+    from src.pipeline.scheduler import Task
 
 logger = logging.getLogger("log-analyzer.pipeline")
 
+# Строк в пачке при трассировке (--trace): интервал на пачку, а не на строку
+TRACE_BATCH_LINES = 50_000
+
+
+def _make_collectors(config, files: List[str]) -> List[StatsCollector]:
+    # бюджет памяти делится между окнами: счётчики живут одновременно
+    memory_limit = config.memory_limit
+    if memory_limit is not None:
+        memory_limit = max(1, memory_limit // len(config.windows))
+    return [
+        StatsCollector(
+            files,
+            bucket_seconds=config.bucket_seconds,
+            date_from=window.date_from,
+            date_to=window.date_to,
+            normalizer=config.resource_normalizer,
+            memory_limit=memory_limit,
+            sample_rate=config.sample_rate,
+        )
+        for window in config.windows
+    ]
+
+
+def execute_pipeline(config) -> List[StatsResult]:
+    """
+    Один проход по источникам: каждая запись попадает в StatsCollector
+    каждого окна, в которое входит. Возвращает результаты в порядке config.windows.
+    """
+    if config.store_path is not None:
+        return _execute_store(config)
+    collectors = _make_collectors(
+        config, [source.location for source in config.resolved_sources]
+    )
+    routes = list(zip(config.windows, collectors))
+    for duplicate in config.skipped_duplicates:
+        logger.info(
+            "Пропускаю повтор (%s): %s = %s",
+            duplicate.reason,
+            duplicate.location,
+            duplicate.original,
+        )
+    if config.workers > 1:
+        # планировщик грузится только для --workers
+        from src.pipeline.scheduler import plan_tasks
+
+        tasks, in_main = plan_tasks(config.resolved_sources, config.workers)
+        run_tasks(config, tasks, collectors, in_main)
+    else:
+        # крупные файлы — первыми (размер известен после обхода каталогов)
+        sources = sorted(config.resolved_sources, key=lambda s: -(s.size or 0))
+        for source in sources:
+            _read_logged(config, source.location, collectors, routes)
+    results = []
+    for idx, collector in enumerate(collectors):
+        with span("build_result", cat="aggregate", window=idx):
+            results.append(collector.build_result())
+    for result in results:
+        result.skippedDuplicates = [
+            SkippedDuplicateStat(d.location, d.original, d.reason)
+            for d in config.skipped_duplicates
+        ]
+    return results
+
+
+def _read_logged(
+    config,
+    location: str,
+    collectors: List[StatsCollector],
+    routes: List[Tuple[DateWindow, StatsCollector]],
+) -> None:
+    try:
+        with span("source", location=location):
+            _read_source(config, location, collectors, routes)
+    except UnexpectedRuntimeError as e:
+        logger.error("Сбой при чтении источника %s: %s", location, e)
+        raise
+
+
+def run_tasks(
+    config,
+    tasks: List["Task"],
+    collectors: List[StatsCollector],
+    in_main: Iterable = (),
+) -> None:
+    """
+    Выполняет задачи планировщика в config.workers процессах. Задачи уходят
+    в пул в порядке списка — свободный процесс берёт следующую. Пока процессы
+    работают, основной читает источники in_main (URL, стандартный ввод), затем
+    сливает состояния сборщиков рабочих в collectors по мере готовности.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures import as_completed
+
+    routes = list(zip(config.windows, collectors))
+    logger.info("Задач: %s на %s процессов", len(tasks), config.workers)
+    pool = ProcessPoolExecutor(
+        config.workers,
+        initializer=_init_worker,
+        initargs=(config, tracer().enabled),
+    )
+    try:
+        futures = [pool.submit(_run_task, task) for task in tasks]
+        for source in in_main:
+            _read_logged(config, source.location, collectors, routes)
+        for future in as_completed(futures):
+            states, events = future.result()
+            tracer().extend(events)
+            with span("merge", cat="aggregate"):
+                partials = _make_collectors(config, [])
+                for collector, partial, (state, sizes) in zip(
+                    collectors, partials, states
+                ):
+                    values = array("q")
+                    values.frombytes(sizes)
+                    partial.load_state(state, values)
+                    collector.merge(partial)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+# конфигурация рабочего процесса (задаётся инициализатором пула)
+_worker_config = None
+
+
+def _init_worker(config, trace: bool) -> None:
+    global _worker_config
+    _worker_config = config
+    # события родителя (при fork) не повторяем: у рабочего своя трасса
+    disable_tracing()
+    if trace:
+        enable_tracing()
+
 
-def execute_pipeline(config):
-    collector = StatsCollector(config.resolved_sources)
-    for source in config.resolved_sources:
-        logger.info("Читаю источник: %s", source)
-        reader = make_reader_for(source)
-        try:
-            for line in reader.iter_lines():
-                if not line or not line.strip():
-                    continue
-                entry = parse_line(line)
-                if entry is None:
-                    continue
-                if config.date_from and entry.timestamp < config.date_from:
-                    continue
-                if config.date_to and entry.timestamp > config.date_to:
-                    continue
+def _run_task(task: "Task"):
+    """
+    Разбор диапазонов задачи в отдельные сборщики. Возвращает состояния окон
+    (export_state и размеры ответов в байтах) и события трассировки процесса.
+    """
+    from src.reader.reader_file import ReaderFile
+
+    config = _worker_config
+    collectors = _make_collectors(config, [])
+    routes = list(zip(config.windows, collectors))
+    with span("task", ranges=len(task.ranges), cost=int(task.cost)):
+        for r in task.ranges:
+            try:
+                with span("source", location=r.location, start=r.start, end=r.end):
+                    lines = ReaderFile(r.location).iter_range(r.start, r.end)
+                    _consume(lines, routes, config.row_filter)
+            except UnexpectedRuntimeError as e:
+                logger.error("Сбой при чтении источника %s: %s", r.location, e)
+                raise
+    states = [
+        (collector.export_state(), array("q", collector.sizes).tobytes())
+        for collector in collectors
+    ]
+    return states, tracer().drain()
+
+
+def _read_source(
+    config,
+    location: str,
+    collectors: List[StatsCollector],
+    routes: List[Tuple[DateWindow, StatsCollector]],
+) -> None:
+    if config.partial_cache is not None and _consume_cached(
+        config, location, collectors
+    ):
+        return
+    logger.info("Читаю источник: %s", location)
+    reader = make_reader_for(location, http_cache=config.http_cache)
+    if config.sample_rate is None:
+        if tracer().enabled:
+            for batch in _traced_batches(reader.iter_lines()):
+                with span("parse", rows=len(batch)):
+                    _consume(batch, routes, config.row_filter)
+        else:
+            _consume(reader.iter_lines(), routes, config.row_filter)
+        return
+    from src.sampling import source_rng
+
+    rng = source_rng(config.sample_seed, location)
+    for block in reader.iter_sample_blocks(config.sample_rate, rng):
+        before = [collector.total_requests for collector in collectors]
+        with span("parse", rows=len(block), sampled=True):
+            _consume(block, routes, config.row_filter)
+        for collector, count in zip(collectors, before):
+            collector.add_sample_block(collector.total_requests - count)
+
+
+def _traced_batches(lines: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Пачки строк для трассировки: чтение и разбор пачки — отдельные интервалы,
+    так что медленное чтение посреди файла видно на шкале времени.
+    """
+    it = iter(lines)
+    while True:
+        with span("read", cat="io"):
+            batch = list(itertools.islice(it, TRACE_BATCH_LINES))
+        if not batch:
+            return
+        yield batch
+
+
+def _consume_cached(config, location: str, collectors: List[StatsCollector]) -> bool:
+    """
+    Источник через кэш частичных результатов (--partial-cache): для неизменённого
+    файла состояния окон берутся из кэша, иначе файл разбирается в отдельные
+    сборщики, которые сохраняются в кэш и сливаются с общими.
+    False — источник не локальный файл, кэш к нему не применяется.
+    """
+    from src.pipeline.partial_cache import FileIdentity
+    from src.pipeline.partial_cache import settings_key
+
+    if location == STDIN_SOURCE:
+        return False
+    cache = config.partial_cache
+    identity = FileIdentity.of(location)
+    if identity is None:
+        return False
+    keys = [settings_key(config, window) for window in config.windows]
+
+    partials = _make_collectors(config, [location])
+    if all(cache.load(identity, key, partial) for key, partial in zip(keys, partials)):
+        logger.info("Источник взят из кэша: %s", location)
+    else:
+        logger.info("Читаю источник: %s", location)
+        partials = _make_collectors(config, [location])
+        reader = make_reader_for(location)
+        _consume(
+            reader.iter_lines(), list(zip(config.windows, partials)), config.row_filter
+        )
+        # файл, изменившийся во время чтения, в кэш не попадает
+        if FileIdentity.of(location) == identity:
+            with span("cache.store", cat="cache", location=location):
+                for key, partial in zip(keys, partials):
+                    cache.store(identity, key, partial)
+    with span("merge", cat="aggregate", location=location):
+        for collector, partial in zip(collectors, partials):
+            collector.merge(partial)
+    return True
+
+
+def _consume(
+    lines: Iterable[str],
+    routes: List[Tuple[DateWindow, StatsCollector]],
+    row_filter: Optional["RowFilter"],
+) -> None:
+    for line in lines:
+        if not line or not line.strip():
+            continue
+        # дешёвые проверки по сырой строке — до регулярного выражения
+        if row_filter is not None and not row_filter.matches_raw(line):
+            continue
+        entry = parse_line(line)
+        if entry is None:
+            continue
+        if row_filter is not None and not row_filter.matches(entry):
+            continue
+        for window, collector in routes:
+            if window.contains(entry.timestamp):
                 collector.update(entry)
-        except UnexpectedRuntimeError as e:
-            logger.error("Сбой при чтении источника %s: %s", source, e)
-            raise
-    return collector.build_result()
+
+
+def _execute_store(config) -> List[StatsResult]:
+    """Отчёт по колоночному хранилищу: колонки через mmap, счётчики векторно."""
+    # NumPy подгружается только для работы с хранилищем
+    from src.store.reader import ColumnStore
+
+    store = ColumnStore(config.store_path)
+    collectors = _make_collectors(config, store.sources)
+    for window, collector in zip(config.windows, collectors):
+        for batch in store.iter_batches(
+            window.date_from, window.date_to, config.row_filter
+        ):
+            with span("store.batch", cat="aggregate", rows=len(batch)):
+                collector.update_columns(batch)
+    return [collector.build_result() for collector in collectors]
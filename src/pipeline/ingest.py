@@ -0,0 +1,70 @@
+import logging
+
+from src.parser import parse_line
+from src.reader import make_reader_for
+from src.reader.follower import FileFollower
+from src.sources import STDIN_SOURCE
+from src.tracing import span
+from src.validator import Validator
+
+logger = logging.getLogger("log-analyzer.pipeline.ingest")
+
+
+def execute_ingest(config) -> int:
+    """
+    Разбирает источники и дописывает записи в колоночное хранилище.
+
+    Для локального файла запоминаются (устройство, inode) и сколько байт
+    загружено — до последнего перевода строки: повторный ingest дочитывает
+    только дописанные строки, а недописанная строка загружается, когда
+    появится её конец. Усечённый или подменённый ротацией файл читается
+    сначала. URL загружается один раз, стандартный ввод — при каждом запуске.
+    Возвращает число добавленных записей.
+    """
+    # NumPy подгружается только для работы с хранилищем
+    from src.store.writer import StoreWriter
+
+    writer = StoreWriter(config.store_path, config.segment_rows)
+    added = 0
+    for source in config.resolved_sources:
+        location = source.location
+        offset = writer.source_offset(location)
+        if location == STDIN_SOURCE:
+            # каждый ingest из стандартного ввода — новые строки
+            follower = None
+            lines = make_reader_for(location).iter_lines()
+        elif Validator.is_url(location):
+            if offset is not None:
+                logger.info("Уже в хранилище, пропускаю: %s", location)
+                continue
+            follower = None
+            lines = make_reader_for(location, http_cache=config.http_cache).iter_lines()
+        else:
+            follower = FileFollower(
+                location, offset or 0, writer.source_identity(location)
+            )
+            lines = follower.read_new()
+
+        logger.info("Загружаю в хранилище: %s", location)
+        with span("source", location=location):
+            rows = _append_lines(writer, lines)
+        if follower is None:
+            writer.record_source(location, 0, rows)
+        else:
+            writer.record_source(location, follower.offset, rows, follower.identity)
+        added += rows
+    writer.commit()
+    return added
+
+
+def _append_lines(writer, lines) -> int:
+    rows = 0
+    for line in lines:
+        if not line or not line.strip():
+            continue
+        entry = parse_line(line)
+        if entry is None:
+            continue
+        writer.append(entry)
+        rows += 1
+    return rows
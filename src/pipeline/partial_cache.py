@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from array import array
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Optional
+
+from src.parser import PARSER_VERSION
+from src.stats_collector import StatsCollector
+
+logger = logging.getLogger("log-analyzer.pipeline.cache")
+
+# Меняется при изменении формата состояния StatsCollector.export_state()
+PARTIAL_CACHE_VERSION = 1
+
+# Сколько байт с начала и с конца файла входит в отпечаток
+FINGERPRINT_BYTES = 4096
+
+_META_SUFFIX = ".meta.json"
+_SIZES_SUFFIX = ".sizes"
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    """Чем файл опознаётся в кэше: изменение любого поля — промах."""
+
+    path: str  # realpath
+    inode: int
+    size: int
+    mtime_ns: int
+    fingerprint: str  # хэш первых и последних FINGERPRINT_BYTES байт
+
+    @classmethod
+    def of(cls, location: str) -> Optional[FileIdentity]:
+        path = os.path.realpath(location)
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                digest = hashlib.blake2b(digest_size=16)
+                digest.update(f.read(FINGERPRINT_BYTES))
+                if st.st_size > FINGERPRINT_BYTES:
+                    f.seek(max(FINGERPRINT_BYTES, st.st_size - FINGERPRINT_BYTES))
+                    digest.update(f.read(FINGERPRINT_BYTES))
+        except OSError:
+            return None
+        return cls(path, st.st_ino, st.st_size, st.st_mtime_ns, digest.hexdigest())
+
+
+def settings_key(config, window) -> str:
+    """
+    Хэш всего, что влияет на частичный результат, кроме самого файла:
+    версии формата кэша и разбора строк, окно дат, --bucket,
+    нормализация ресурсов и фильтры строк.
+    """
+    normalizer = config.resource_normalizer
+    row_filter = config.row_filter
+    settings = [
+        PARTIAL_CACHE_VERSION,
+        sys.byteorder,
+        PARSER_VERSION,
+        window.date_from.isoformat() if window.date_from else None,
+        window.date_to.isoformat() if window.date_to else None,
+        config.bucket_seconds,
+        normalizer.cache_key if normalizer is not None else None,
+        row_filter.cache_key if row_filter is not None else None,
+    ]
+    raw = json.dumps(settings, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PartialCache:
+    """
+    Кэш частичных результатов по файлам (--partial-cache DIR).
+
+    Запись — состояние StatsCollector одного файла для одного окна:
+      <ключ>.meta.json — опознание файла, ключ настроек и export_state();
+      <ключ>.sizes     — размеры ответов (int64) для точного p95.
+    Имя записи зависит от пути и настроек, поэтому новая версия файла
+    перезаписывает старую. Метаданные пишутся последними и атомарно.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _base(self, identity: FileIdentity, settings: str) -> str:
+        key = hashlib.sha256(f"{identity.path}\0{settings}".encode("utf-8"))
+        return os.path.join(self.directory, key.hexdigest())
+
+    def load(
+        self, identity: FileIdentity, settings: str, collector: StatsCollector
+    ) -> bool:
+        """
+        Заполняет пустой collector из кэша; False — записи нет или она устарела
+        (тогда collector мог заполниться частично и не должен использоваться).
+        """
+        base = self._base(identity, settings)
+        try:
+            with open(base + _META_SUFFIX, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("identity") != asdict(identity):
+                return False
+            if meta.get("settings") != settings:
+                return False
+            sizes = array("q")
+            with open(base + _SIZES_SUFFIX, "rb") as f:
+                sizes.frombytes(f.read())
+            state = meta["state"]
+            if len(sizes) != state["totalRequests"]:
+                return False
+            collector.load_state(state, sizes)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Повреждённая запись кэша '%s': %s", base, e)
+            return False
+        return True
+
+    def store(
+        self, identity: FileIdentity, settings: str, collector: StatsCollector
+    ) -> None:
+        base = self._base(identity, settings)
+        meta = {
+            "identity": asdict(identity),
+            "settings": settings,
+            "state": collector.export_state(),
+        }
+        try:
+            self._write_atomic(base + _SIZES_SUFFIX, array("q", collector.sizes))
+            self._write_atomic(
+                base + _META_SUFFIX,
+                json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+            )
+        except OSError as e:
+            logger.warning("Не удалось сохранить '%s' в кэш: %s", identity.path, e)
+
+    def _write_atomic(self, path: str, data) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
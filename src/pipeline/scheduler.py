@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import heapq
+import os
+from dataclasses import dataclass
+from dataclasses import field
+from typing import BinaryIO
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from src.sources import STDIN_SOURCE
+from src.sources import Source
+from src.validator import Validator
+
+# Задач на рабочий процесс: запас, чтобы выровнять нагрузку к концу прохода
+TASKS_PER_WORKER = 4
+# Меньше этого задачу не дробим: накладные расходы на задачу (pickle, слияние)
+MIN_TASK_BYTES = 8 << 20
+
+
+@dataclass(frozen=True)
+class ByteRange:
+    """Диапазон файла [start, end): строка относится к диапазону, где начинается."""
+
+    location: str
+    start: int = 0
+    end: Optional[int] = None  # None — до конца файла
+
+
+@dataclass
+class Task:
+    """Единица работы рабочего процесса: один или несколько диапазонов."""
+
+    ranges: List[ByteRange] = field(default_factory=list)
+    cost: float = 0.0
+
+    def add(self, byte_range: ByteRange, cost: float) -> None:
+        self.ranges.append(byte_range)
+        self.cost += cost
+
+
+def estimate_cost(source: Source) -> Optional[float]:
+    """
+    Оценка стоимости разбора источника в байтах несжатого текста.
+    Принимаются только несжатые .log/.txt, так что стоимость — размер файла.
+    None — источник нельзя отдать рабочему процессу (URL, стандартный ввод):
+    его читает основной процесс.
+    """
+    if source.location == STDIN_SOURCE or Validator.is_url(source.location):
+        return None
+    if source.size is not None:
+        return float(source.size)
+    try:
+        return float(os.path.getsize(source.location))
+    except OSError:
+        return None
+
+
+def _line_start(f: BinaryIO, offset: int) -> int:
+    """Начало первой строки, начинающейся не раньше offset."""
+    if offset <= 0:
+        return 0
+    f.seek(offset - 1)
+    return offset - 1 + len(f.readline())
+
+
+def plan_tasks(
+    sources: Sequence[Source], workers: int, min_cost: float = MIN_TASK_BYTES
+) -> Tuple[List[Task], List[Source]]:
+    """
+    План для workers процессов: (задачи по убыванию стоимости, источники
+    для основного процесса).
+
+    Источники идут от крупных к мелким, из них нарезаются задачи с убывающим
+    пределом стоимости: сначала суммарная / (workers · TASKS_PER_WORKER), затем
+    остаток / (2 · workers), но не меньше min_cost. Файл крупнее предела режется
+    на диапазоны по границам строк, мелкие файлы собираются в общую задачу.
+    Задачи раздаются по убыванию стоимости (LPT) первому свободному процессу:
+    долгие стартуют первыми, а мелкие в конце выравнивают время завершения.
+    """
+    local: List[Tuple[Source, float]] = []
+    in_main: List[Source] = []
+    for source in sources:
+        cost = estimate_cost(source)
+        if cost is None:
+            in_main.append(source)
+        else:
+            local.append((source, cost))
+    local.sort(key=lambda sc: -sc[1])
+
+    remaining = sum(cost for _, cost in local)
+    target = max(min_cost, remaining / (workers * TASKS_PER_WORKER))
+
+    def limit() -> float:
+        return min(target, max(min_cost, remaining / (2 * workers)))
+
+    tasks: List[Task] = []
+    batch = Task()
+    for source, cost in local:
+        if cost <= limit():
+            if batch.ranges and batch.cost + cost > limit():
+                tasks.append(batch)
+                batch = Task()
+            batch.add(ByteRange(source.location), cost)
+            remaining -= cost
+            continue
+        size = int(cost)
+        with open(source.location, "rb") as f:
+            start = 0
+            while start < size:
+                end = _line_start(f, start + int(limit()))
+                if end >= size or size - end < min_cost / 2:
+                    end = size
+                task = Task()
+                task.add(ByteRange(source.location, start, end), float(end - start))
+                tasks.append(task)
+                remaining -= end - start
+                start = end
+    if batch.ranges:
+        tasks.append(batch)
+
+    tasks.sort(key=lambda t: -t.cost)
+    return tasks, in_main
+
+
+def makespan(costs: Sequence[float], workers: int) -> float:
+    """Время завершения при раздаче задач по порядку первому освободившемуся процессу."""
+    finish = [0.0] * workers
+    for cost in costs:
+        heapq.heapreplace(finish, finish[0] + cost)
+    return max(finish)
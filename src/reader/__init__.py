@@ -1,11 +1,23 @@
+from typing import TYPE_CHECKING
+from typing import Optional
 from urllib.parse import urlparse
 
 from src.reader.base import Reader
 from src.reader.reader_file import ReaderFile
-from src.reader.reader_url import ReaderURL
+from src.sources import STDIN_SOURCE
 
+if TYPE_CHECKING:
+    from src.reader.http_cache import HttpCache
 
-def make_reader_for(source: str) -> Reader:
+
+def make_reader_for(source: str, http_cache: Optional["HttpCache"] = None) -> Reader:
     if urlparse(source).scheme in ("http", "https"):
-        return ReaderURL(source)
+        # requests грузится только для удалённых источников
+        from src.reader.reader_url import ReaderURL
+
+        return ReaderURL(source, cache=http_cache)
+    if source == STDIN_SOURCE:
+        from src.reader.reader_stdin import ReaderStdin
+
+        return ReaderStdin()
     return ReaderFile(source)
@@ -1,9 +1,34 @@
+from __future__ import annotations
+
 from abc import ABC
 from abc import abstractmethod
+from typing import TYPE_CHECKING
 from typing import Iterator
+from typing import List
+
+if TYPE_CHECKING:
+    import random
 
 
 class Reader(ABC):
     @abstractmethod
     def iter_lines(self) -> Iterator[str]:
         raise NotImplementedError
+
+    def iter_sample_blocks(
+        self, rate: float, rng: random.Random
+    ) -> Iterator[List[str]]:
+        """
+        Выборка для --sample: блоки строк, каждый выбран с вероятностью rate.
+        По умолчанию (поток без произвольного доступа) блок — одна строка.
+        """
+        from src.sampling import sample_gaps
+
+        gaps = sample_gaps(rate, rng)
+        skip = next(gaps)
+        for line in self.iter_lines():
+            if skip:
+                skip -= 1
+                continue
+            yield [line]
+            skip = next(gaps)
@@ -0,0 +1,66 @@
+import logging
+import os
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+logger = logging.getLogger("log-analyzer.reader.follower")
+
+_CHUNK_SIZE = 1 << 20
+
+
+class FileFollower:
+    """
+    Дочитывает растущий лог-файл с запомненного смещения (как tail -F).
+
+    Отдаются только завершённые строки: хвост без перевода строки
+    дочитывается при следующем опросе. Если файл стал короче смещения
+    (truncate) или подменён другим (ротация — сменились устройство или inode),
+    чтение начинается с начала. identity — (st_dev, st_ino) файла, к которому
+    относится offset; его сохраняют вместе со смещением между запусками.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        offset: int = 0,
+        identity: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        self.path = path
+        self.offset = offset
+        self.identity = identity
+
+    def read_new(self) -> Iterator[str]:
+        """Новые завершённые строки с запомненного смещения."""
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            logger.warning("Файл недоступен '%s': %s", self.path, e)
+            return
+        identity = (st.st_dev, st.st_ino)
+        if self.identity is not None and identity != self.identity:
+            logger.info("Файл заменён (ротация), читаю сначала: %s", self.path)
+            self.offset = 0
+        elif st.st_size < self.offset:
+            logger.info("Файл усечён, читаю сначала: %s", self.path)
+            self.offset = 0
+        self.identity = identity
+        if st.st_size == self.offset:
+            return
+
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                tail = b""
+                while True:
+                    chunk = f.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    head, sep, tail = (tail + chunk).rpartition(b"\n")
+                    if not sep:
+                        continue
+                    self.offset += len(head) + 1
+                    for raw in head.decode("utf-8", errors="replace").split("\n"):
+                        yield raw.rstrip("\r")
+        except OSError as e:
+            logger.warning("Ошибка чтения '%s': %s", self.path, e)
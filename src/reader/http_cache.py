@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict
+from typing import Optional
+
+from src.errors import UnexpectedRuntimeError
+
+logger = logging.getLogger("log-analyzer.reader.cache")
+
+_BODY_SUFFIX = ".body"
+_META_SUFFIX = ".meta.json"
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body_path: str
+    meta_path: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float  # время последней (ре)валидации, epoch
+
+
+class CacheWriter:
+    """Пишет тело ответа во временный файл; в кэш попадает только после commit()."""
+
+    def __init__(self, cache: HttpCache, url: str, headers: Dict[str, str]) -> None:
+        self._cache = cache
+        self._url = url
+        self._etag = headers.get("ETag")
+        self._last_modified = headers.get("Last-Modified")
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def commit(self) -> None:
+        self._file.close()
+        self._cache.commit(self._url, self._tmp_path, self._etag, self._last_modified)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class HttpCache:
+    """
+    Дисковый кэш удалённых логов с условной ревалидацией.
+
+    Ключ — URL; рядом с телом хранятся ETag и Last-Modified, по которым
+    следующий запуск отправляет условный GET и на 304 читает тело из кэша.
+    Размер кэша ограничен max_bytes (вытеснение LRU по времени последнего
+    обращения), max_age позволяет не ходить в сеть для свежих записей.
+    """
+
+    def __init__(
+        self, directory: str, max_bytes: int, max_age: Optional[int] = None
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + _BODY_SUFFIX, base + _META_SUFFIX
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not os.path.exists(body_path):
+            return None
+        return CacheEntry(
+            url=url,
+            body_path=body_path,
+            meta_path=meta_path,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            stored_at=float(meta.get("stored_at", 0)),
+        )
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        if self.max_age is None:
+            return False
+        return time.time() - entry.stored_at <= self.max_age
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def touch(self, entry: CacheEntry, revalidated: bool = False) -> None:
+        """Отмечает обращение (для LRU); после 304 обновляет время валидации."""
+        try:
+            if revalidated:
+                entry.stored_at = time.time()
+                self._write_meta(entry.url, entry.etag, entry.last_modified)
+            else:
+                os.utime(entry.meta_path)
+        except OSError as e:
+            logger.warning("Не удалось обновить запись кэша '%s': %s", entry.url, e)
+
+    def open_writer(self, url: str, headers: Dict[str, str]) -> CacheWriter:
+        try:
+            return CacheWriter(self, url, headers)
+        except OSError as e:
+            raise UnexpectedRuntimeError(f"Не удалось записать кэш '{url}': {e}")
+
+    def commit(
+        self,
+        url: str,
+        tmp_body: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        body_path, _ = self._paths(url)
+        try:
+            os.replace(tmp_body, body_path)
+            self._write_meta(url, etag, last_modified)
+        except OSError as e:
+            logger.warning("Не удалось сохранить '%s' в кэш: %s", url, e)
+            return
+        self.evict()
+
+    def _write_meta(
+        self, url: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> None:
+        _, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def evict(self) -> None:
+        """Удаляет давно не использованные записи, пока кэш не уложится в max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if not e.name.endswith(_META_SUFFIX):
+                    continue
+                body = e.path[: -len(_META_SUFFIX)] + _BODY_SUFFIX
+                try:
+                    size = os.path.getsize(body)
+                    accessed = e.stat().st_mtime
+                except OSError:
+                    continue
+                entries.append((accessed, e.path, body, size))
+                total += size
+        entries.sort()
+        for _, meta_path, body_path, size in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            logger.info("Запись вытеснена из кэша: %s", body_path)
@@ -0,0 +1,41 @@
+import threading
+from typing import Dict
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Потоков проверки удалённых источников и соединений в пуле на хост
+REMOTE_WORKERS = 16
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+
+def session() -> requests.Session:
+    """Общая сессия процесса: соединения (и TLS) переиспользуются между запросами."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=REMOTE_WORKERS, pool_maxsize=REMOTE_WORKERS
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def head(url: str, timeout: float = 5.0) -> requests.Response:
+    """
+    HEAD через общую сессию: тела нет, соединение сразу возвращается в пул,
+    и GET при чтении источника переиспользует его без нового рукопожатия.
+    """
+    return session().head(url, timeout=timeout)
+
+
+def open_stream(
+    url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None
+) -> requests.Response:
+    """Потоковый GET: возвращается после заголовков, тело читает вызывающий."""
+    return session().get(url, stream=True, timeout=timeout, headers=headers)
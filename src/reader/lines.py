@@ -0,0 +1,22 @@
+from typing import Iterable
+from typing import Iterator
+
+
+def split_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Режет поток байтов на строки (UTF-8), не держа в памяти весь поток:
+    блок делится по последнему переводу строки, и целая часть декодируется разом.
+    """
+    tail = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data = tail + chunk
+        head, sep, tail = data.rpartition(b"\n")
+        if not sep:
+            tail = data
+            continue
+        for raw in head.decode("utf-8", errors="replace").split("\n"):
+            yield raw.rstrip("\r")
+    if tail:
+        yield tail.decode("utf-8", errors="replace").rstrip("\r")
@@ -1,10 +1,19 @@
+from __future__ import annotations
+
 import logging
+import os
+from typing import TYPE_CHECKING
 from typing import Iterator
+from typing import List
+from typing import Optional
 
 from src.errors import UnexpectedRuntimeError
 
 from src.reader.base import Reader
 
+if TYPE_CHECKING:
+    import random
+
 logger = logging.getLogger("log-analyzer.reader.file")
 
 
@@ -22,3 +31,64 @@ class ReaderFile(Reader):
         except OSError as e:
             logger.error("Ошибка чтения '%s': %s", self._path, e)
             raise UnexpectedRuntimeError(f"Не удалось прочитать '{self._path}': {e}")
+
+    def iter_range(self, start: int, end: Optional[int] = None) -> Iterator[str]:
+        """
+        Строки, начинающиеся в [start, end) (end=None — до конца файла).
+        start должен быть началом строки — так режет файл планировщик.
+        """
+        try:
+            with open(self._path, "rb") as f:
+                f.seek(start)
+                pos = start
+                while end is None or pos < end:
+                    raw = f.readline()
+                    if not raw:
+                        break
+                    pos += len(raw)
+                    yield raw.decode(self._encoding).rstrip("\r\n")
+        except OSError as e:
+            logger.error("Ошибка чтения '%s': %s", self._path, e)
+            raise UnexpectedRuntimeError(f"Не удалось прочитать '{self._path}': {e}")
+
+    def iter_sample_blocks(
+        self, rate: float, rng: random.Random, block_size: Optional[int] = None
+    ) -> Iterator[List[str]]:
+        """
+        Выборка блоков по байтам через seek: файл делится на блоки block_size,
+        строка относится к блоку, в котором начинается. Невыбранные блоки не читаются.
+        """
+        from src.sampling import SAMPLE_BLOCK_SIZE
+        from src.sampling import sample_gaps
+
+        block_size = block_size or SAMPLE_BLOCK_SIZE
+        logger.info("Выборочное чтение (доля %s) файла: %s", rate, self._path)
+        try:
+            size = os.path.getsize(self._path)
+            with open(self._path, "rb") as f:
+                gaps = sample_gaps(rate, rng)
+                block = next(gaps)
+                while block * block_size < size:
+                    start = block * block_size
+                    end = min(start + block_size, size)
+                    pos = start
+                    if start > 0:
+                        # дочитываем строку, начатую в предыдущем блоке
+                        f.seek(start - 1)
+                        pos = start - 1 + len(f.readline())
+                    else:
+                        f.seek(0)
+                    lines: List[str] = []
+                    while pos < end:
+                        raw = f.readline()
+                        if not raw:
+                            break
+                        pos += len(raw)
+                        lines.append(
+                            raw.decode(self._encoding, errors="replace").rstrip("\r\n")
+                        )
+                    yield lines
+                    block += 1 + next(gaps)
+        except OSError as e:
+            logger.error("Ошибка чтения '%s': %s", self._path, e)
+            raise UnexpectedRuntimeError(f"Не удалось прочитать '{self._path}': {e}")
@@ -0,0 +1,43 @@
+import logging
+import sys
+from typing import BinaryIO
+from typing import Iterator
+from typing import Optional
+
+from src.errors import UnexpectedRuntimeError
+from src.reader.base import Reader
+from src.reader.lines import split_lines
+
+logger = logging.getLogger("log-analyzer.reader.stdin")
+
+# Крупные блоки: на конвейере (zcat | ...) меньше системных вызовов на строку
+STDIN_CHUNK_SIZE = 1 << 20
+
+
+class ReaderStdin(Reader):
+    """
+    Поток строк из стандартного ввода (-p -): читается блоками байт
+    и режется на строки без промежуточного файла; в памяти — один блок.
+    """
+
+    def __init__(
+        self, stream: Optional[BinaryIO] = None, chunk_size: int = STDIN_CHUNK_SIZE
+    ) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        stream = self._stream if self._stream is not None else sys.stdin.buffer
+        while True:
+            chunk = stream.read(self._chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_lines(self) -> Iterator[str]:
+        logger.info("Чтение стандартного ввода")
+        try:
+            yield from split_lines(self._iter_chunks())
+        except OSError as e:
+            logger.error("Ошибка чтения стандартного ввода: %s", e)
+            raise UnexpectedRuntimeError(f"Не удалось прочитать стандартный ввод: {e}")
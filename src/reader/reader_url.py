@@ -1,23 +1,50 @@
 import logging
+from typing import Iterable
 from typing import Iterator
+from typing import Optional
 
 import requests
 from src.errors import UnexpectedRuntimeError
 
+from src.reader import http_session
 from src.reader.base import Reader
+from src.reader.lines import split_lines
+from src.reader.http_cache import CacheWriter
+from src.reader.http_cache import HttpCache
 
 logger = logging.getLogger("log-analyzer.reader.url")
 
+_CHUNK_SIZE = 1 << 16
+
+
+def _iter_file(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
 
 class ReaderURL(Reader):
-    def __init__(self, url: str, timeout: float = 5.0) -> None:
+    def __init__(
+        self, url: str, timeout: float = 5.0, cache: Optional[HttpCache] = None
+    ) -> None:
         self._url = url
         self._timeout = timeout
+        self._cache = cache
+
+    def _open(self, headers: Optional[dict] = None) -> requests.Response:
+        """Потоковый GET через общую сессию — по соединению, открытому при проверке."""
+        return http_session.open_stream(self._url, self._timeout, headers)
 
     def iter_lines(self) -> Iterator[str]:
         logger.info("Чтение удалённого лога: %s", self._url)
+        if self._cache is not None:
+            yield from self._iter_lines_cached(self._cache)
+            return
         try:
-            with requests.get(self._url, stream=True, timeout=self._timeout) as resp:
+            with self._open() as resp:
                 if resp.status_code >= 400:
                     logger.error(
                         "Статус %s при чтении '%s'", resp.status_code, self._url
@@ -25,10 +52,57 @@ class ReaderURL(Reader):
                     raise UnexpectedRuntimeError(
                         f"Статус {resp.status_code} при чтении '{self._url}'"
                     )
-                for raw in resp.iter_lines(decode_unicode=True):
-                    if raw is None:
-                        continue
-                    yield str(raw).rstrip("\r\n")
+                # байты режутся и декодируются как UTF-8: iter_lines без charset
+                # в ответе отдал бы bytes
+                yield from split_lines(resp.iter_content(_CHUNK_SIZE))
         except requests.RequestException as e:
             logger.error("Сетевая ошибка '%s': %s", self._url, e)
             raise UnexpectedRuntimeError(f"Сетевая ошибка '{self._url}': {e}")
+
+    def _iter_lines_cached(self, cache: HttpCache) -> Iterator[str]:
+        """Свежая запись — из кэша; иначе условный GET: 304 — из кэша, 200 — в кэш."""
+        entry = cache.lookup(self._url)
+        if entry is not None and cache.is_fresh(entry):
+            logger.info("Ответ взят из кэша без запроса: %s", self._url)
+            cache.touch(entry)
+            yield from split_lines(_iter_file(entry.body_path))
+            return
+        try:
+            with self._open(cache.conditional_headers(entry)) as resp:
+                if resp.status_code == 304 and entry is not None:
+                    logger.info("Не изменился (304), читаю из кэша: %s", self._url)
+                    cache.touch(entry, revalidated=True)
+                    yield from split_lines(_iter_file(entry.body_path))
+                    return
+                if resp.status_code >= 400 or resp.status_code == 304:
+                    logger.error(
+                        "Статус %s при чтении '%s'", resp.status_code, self._url
+                    )
+                    raise UnexpectedRuntimeError(
+                        f"Статус {resp.status_code} при чтении '{self._url}'"
+                    )
+                writer = cache.open_writer(self._url, resp.headers)
+                yield from self._tee(resp.iter_content(_CHUNK_SIZE), writer)
+        except requests.RequestException as e:
+            logger.error("Сетевая ошибка '%s': %s", self._url, e)
+            raise UnexpectedRuntimeError(f"Сетевая ошибка '{self._url}': {e}")
+
+    @staticmethod
+    def _tee(chunks: Iterable[bytes], writer: CacheWriter) -> Iterator[str]:
+        """Отдаёт строки по мере загрузки и параллельно пишет тело в кэш."""
+
+        def copy() -> Iterator[bytes]:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+
+        completed = False
+        try:
+            yield from split_lines(copy())
+            completed = True
+        finally:
+            # недочитанный или оборванный ответ в кэш не попадает
+            if completed:
+                writer.commit()
+            else:
+                writer.abort()
@@ -1,13 +1,59 @@
 import os
+import tempfile
+from typing import IO
+from typing import Callable
 
 from src.errors import UnexpectedRuntimeError
 
+# Буфер записи отчёта: секции пишутся потоково, на диск — крупными блоками
+_WRITE_BUFFER = 1 << 20
 
-def write_report(path: str, content: str) -> None:
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def write_report(path: str, render: Callable[[IO], None], binary: bool = False) -> None:
+    """
+    Потоково пишет отчёт во временный файл рядом с целевым, затем fsync
+    и атомарный rename — читатели никогда не видят частично записанный отчёт.
+    При binary=True render получает байтовый приёмник.
+    """
+    tmp_path = None
     try:
         parent = os.path.dirname(os.path.abspath(path)) or "."
         os.makedirs(parent, exist_ok=True)  # ← ВАЖНО
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=parent, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+        )
+        # mkstemp создаёт файл с правами 0600 — выставляем обычные (с учётом umask)
+        os.chmod(tmp_path, 0o666 & ~_current_umask())
+        mode, encoding = ("wb", None) if binary else ("w", "utf-8")
+        with open(fd, mode, encoding=encoding, buffering=_WRITE_BUFFER) as f:
+            render(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        tmp_path = None
+        _fsync_dir(parent)
     except OSError as e:
         raise UnexpectedRuntimeError(f"Не удалось записать отчёт в '{path}': {e}")
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _fsync_dir(directory: str) -> None:
+    """Фиксирует rename на диске (на платформах, где это поддерживается)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
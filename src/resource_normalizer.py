@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import List
+from typing import Pattern
+from typing import Tuple
+
+# Размер LRU-кэша канонизированных ресурсов (ключ — исходный ресурс)
+DEFAULT_CACHE_SIZE = 65536
+
+NUMERIC_PLACEHOLDER = "{id}"
+UUID_PLACEHOLDER = "{uuid}"
+
+_NUMERIC_SEGMENT = re.compile(r"(?<=/)\d+(?=[/?]|$)")
+_UUID_SEGMENT = re.compile(
+    r"(?<=/)[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+    r"[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=[/?]|$)"
+)
+
+
+class ResourceNormalizer:
+    """
+    Приводит ресурсы к канонической форме, чтобы сократить число ключей.
+
+    Порядок применения правил:
+      1. отбрасывание query-строки (strip_query);
+      2. пользовательские правила (regex -> замена) — в порядке указания;
+      3. свёртка числовых и UUID-сегментов пути в плейсхолдеры (collapse_ids).
+    Результат кэшируется в ограниченном LRU, так что повторяющиеся URI
+    канонизируются один раз. Объект можно передавать между процессами (pickle).
+    """
+
+    def __init__(
+        self,
+        strip_query: bool = False,
+        collapse_ids: bool = False,
+        rewrites: List[Tuple[Pattern[str], str]] | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self._strip_query = strip_query
+        self._collapse_ids = collapse_ids
+        self._rewrites = list(rewrites or [])
+        self._cache_size = cache_size
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def __getstate__(self) -> dict:
+        # LRU-обёртка не сериализуется: в рабочем процессе кэш создаётся заново
+        state = self.__dict__.copy()
+        del state["normalize"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.normalize = lru_cache(maxsize=self._cache_size)(self._normalize)
+
+    @property
+    def is_identity(self) -> bool:
+        return not (self._strip_query or self._collapse_ids or self._rewrites)
+
+    @property
+    def cache_key(self) -> list:
+        """Правила в виде JSON-значения: входят в ключ кэша частичных результатов."""
+        return [
+            self._strip_query,
+            self._collapse_ids,
+            [[p.pattern, p.flags, repl] for p, repl in self._rewrites],
+        ]
+
+    def _normalize(self, resource: str) -> str:
+        if self._strip_query:
+            resource = resource.split("?", 1)[0]
+        for pattern, replacement in self._rewrites:
+            resource = pattern.sub(replacement, resource)
+        if self._collapse_ids:
+            resource = _UUID_SEGMENT.sub(UUID_PLACEHOLDER, resource)
+            resource = _NUMERIC_SEGMENT.sub(NUMERIC_PLACEHOLDER, resource)
+        return resource
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import ipaddress
+from bisect import bisect_right
+from typing import FrozenSet
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# Статус — трёхзначное число: допустимые коды хранятся битовой маской по коду
+_STATUS_CODE_SPACE = 1000
+
+
+def _merge_ranges(ranges: Iterable[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    """Сливает пересекающиеся [first, last] и возвращает (начала, концы) по возрастанию."""
+    starts: List[int] = []
+    ends: List[int] = []
+    for first, last in sorted(ranges):
+        if ends and first <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], last)
+        else:
+            starts.append(first)
+            ends.append(last)
+    return starts, ends
+
+
+def _ipv4_to_int(ip: str) -> Optional[int]:
+    parts = ip.split(".")
+    if len(parts) != 4:
+        return None
+    value = 0
+    for part in parts:
+        if not part.isdigit():
+            return None
+        octet = int(part)
+        if octet > 255:
+            return None
+        value = (value << 8) | octet
+    return value
+
+
+class RowFilter:
+    """
+    Фильтр строк лога (--status, --method, --ip, --resource-prefix).
+
+    Значения одной опции объединяются по ИЛИ, разные опции — по И.
+    Проверка идёт в два шага:
+      - matches_raw(line) — до разбора строки регулярным выражением:
+        IP проверяется точно (это первое поле строки), метод и префикс
+        ресурса — консервативно (поиском подстроки, без ложных отказов);
+      - matches(entry) — точная проверка разобранной записи.
+    Диапазоны CIDR заранее переводятся в отсортированные целочисленные
+    интервалы и проверяются бинарным поиском. Объект можно передавать
+    между процессами (pickle).
+    """
+
+    def __init__(
+        self,
+        statuses: Iterable[int] = (),
+        methods: Iterable[str] = (),
+        networks: Iterable[ipaddress.IPv4Network | ipaddress.IPv6Network] = (),
+        resource_prefixes: Iterable[str] = (),
+    ) -> None:
+        codes = set(statuses)
+        self._status_mask: Optional[bytes] = None
+        if codes:
+            self._status_mask = bytes(
+                1 if code in codes else 0 for code in range(_STATUS_CODE_SPACE)
+            )
+        self._methods: FrozenSet[str] = frozenset(methods)
+        # подстроки, которые обязаны встретиться в подходящей сырой строке
+        self._method_needles = tuple(f'"{m}' for m in self._methods)
+        self._prefixes: Tuple[str, ...] = tuple(resource_prefixes)
+
+        networks = list(networks)
+        self._has_ip = bool(networks)
+        self._v4 = _merge_ranges(
+            (int(n.network_address), int(n.broadcast_address))
+            for n in networks
+            if n.version == 4
+        )
+        self._v6 = _merge_ranges(
+            (int(n.network_address), int(n.broadcast_address))
+            for n in networks
+            if n.version == 6
+        )
+
+    @property
+    def is_identity(self) -> bool:
+        return not (
+            self._status_mask or self._methods or self._prefixes or self._has_ip
+        )
+
+    @property
+    def cache_key(self) -> list:
+        """Условия в виде JSON-значения (без зависимости от порядка множеств)."""
+        statuses = []
+        if self._status_mask is not None:
+            statuses = [c for c, on in enumerate(self._status_mask) if on]
+        return [
+            statuses,
+            sorted(self._methods),
+            [list(r) for r in self._v4],
+            [list(r) for r in self._v6],
+            sorted(self._prefixes),
+        ]
+
+    # --------------------------- отдельные условия ---------------------------
+
+    def status_allowed(self, code: int) -> bool:
+        if self._status_mask is None:
+            return True
+        return 0 <= code < _STATUS_CODE_SPACE and self._status_mask[code] == 1
+
+    def method_allowed(self, method: str) -> bool:
+        return not self._methods or method in self._methods
+
+    def resource_allowed(self, resource: str) -> bool:
+        return not self._prefixes or resource.startswith(self._prefixes)
+
+    def ip_allowed(self, ip: str) -> bool:
+        if not self._has_ip:
+            return True
+        value = _ipv4_to_int(ip)
+        if value is not None:
+            starts, ends = self._v4
+        else:
+            try:
+                addr = ipaddress.ip_address(ip)
+            except ValueError:
+                return False
+            value = int(addr)
+            starts, ends = self._v4 if addr.version == 4 else self._v6
+        idx = bisect_right(starts, value) - 1
+        return idx >= 0 and value <= ends[idx]
+
+    # --------------------------- строка целиком ---------------------------
+
+    def matches_raw(self, line: str) -> bool:
+        """Дешёвая проверка до разбора: False — строка заведомо не подходит."""
+        if self._method_needles and not any(n in line for n in self._method_needles):
+            return False
+        if self._prefixes and not any(p in line for p in self._prefixes):
+            return False
+        if self._has_ip:
+            head = line.split(None, 1)
+            if not head or not self.ip_allowed(head[0]):
+                return False
+        return True
+
+    def matches(self, entry) -> bool:
+        """Точная проверка разобранной записи (IP уже проверен в matches_raw)."""
+        return (
+            self.status_allowed(entry.status_code)
+            and self.method_allowed(entry.method)
+            and self.resource_allowed(entry.resource)
+        )
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+if TYPE_CHECKING:
+    import random
+
+# Блок выборки по байтам: строка принадлежит блоку, в котором начинается
+SAMPLE_BLOCK_SIZE = 64 * 1024
+
+# Квантиль нормального распределения для 95% доверительного интервала
+Z_95 = 1.959964
+
+
+def source_rng(seed: int, location: str) -> random.Random:
+    """Свой генератор на источник: выборка не зависит от порядка чтения файлов."""
+    import random
+
+    return random.Random(f"{seed}:{location}")
+
+
+def sample_gaps(rate: float, rng: random.Random) -> Iterator[int]:
+    """
+    Бернуллиевская выборка с вероятностью rate через геометрические пропуски:
+    очередное значение — сколько элементов пропустить до следующего выбранного.
+    Случайное число тратится на выбранный элемент, а не на каждый.
+    """
+    if rate >= 1.0:
+        while True:
+            yield 0
+    log_q = math.log1p(-rate)
+    while True:
+        yield int(math.log(1.0 - rng.random()) / log_q)
+
+
+@dataclass
+class SamplingState:
+    """
+    Оценки по выборке блоков (кластерная выборка Бернулли, Хорвиц — Томпсон).
+
+    Итог оценивается как n / rate с дисперсией (1 - rate) / rate² · Σ y_b²,
+    где y_b — число учтённых строк в выбранном блоке. Для долей и квантилей
+    используется линеаризация отношения: Var(p) ≈ (1 - rate) · Σ (c_b - p·y_b)² / n²
+    (c_b — строки категории в блоке), так что корреляция строк внутри блока
+    учитывается, а не предполагается.
+    """
+
+    rate: float
+    block_rows: List[int] = field(default_factory=list)  # y_b по порядку чтения
+
+    @property
+    def blocks(self) -> int:
+        return len(self.block_rows)
+
+    def add_block(self, rows: int) -> None:
+        self.block_rows.append(rows)
+
+    def merge(self, other: SamplingState) -> None:
+        self.block_rows.extend(other.block_rows)
+
+    def scale(self, count: int) -> int:
+        return int(round(count / self.rate))
+
+    def _block_spans(self) -> Iterator[Tuple[int, int]]:
+        start = 0
+        for rows in self.block_rows:
+            yield start, start + rows
+            start += rows
+
+    def total_interval(self, n: int) -> Tuple[float, float]:
+        estimate = n / self.rate
+        sum_squares = sum(y * y for y in self.block_rows)
+        half = Z_95 * math.sqrt((1 - self.rate) * sum_squares) / self.rate
+        return max(float(n), estimate - half), estimate + half
+
+    def _category_moments(
+        self, labels: Sequence[int]
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Σ c_b² и Σ c_b·y_b по категориям (labels — метка каждой учтённой строки)."""
+        squares: Dict[int, int] = defaultdict(int)
+        cross: Dict[int, int] = defaultdict(int)
+        for start, end in self._block_spans():
+            if start == end:
+                continue
+            rows = end - start
+            for label, c in Counter(labels[start:end]).items():
+                squares[label] += c * c
+                cross[label] += c * rows
+        return squares, cross
+
+    def count_intervals(self, labels: Sequence[int]) -> Dict[int, Tuple[float, float]]:
+        """Интервалы для оценок числа строк каждой категории."""
+        counts = Counter(labels)
+        squares, _ = self._category_moments(labels)
+        out: Dict[int, Tuple[float, float]] = {}
+        for label, count in counts.items():
+            estimate = count / self.rate
+            half = Z_95 * math.sqrt((1 - self.rate) * squares[label]) / self.rate
+            out[label] = (max(float(count), estimate - half), estimate + half)
+        return out
+
+    def _ratio_se(self, p: float, squares: int, cross: int, n: int) -> float:
+        sum_rows_sq = sum(y * y for y in self.block_rows)
+        resid = max(0.0, squares - 2 * p * cross + p * p * sum_rows_sq)
+        return math.sqrt((1 - self.rate) * resid) / n
+
+    def percentage_intervals(
+        self, labels: Sequence[int]
+    ) -> Dict[int, Tuple[float, float]]:
+        """Интервалы для долей категорий (в процентах)."""
+        n = len(labels)
+        counts = Counter(labels)
+        squares, cross = self._category_moments(labels)
+        out: Dict[int, Tuple[float, float]] = {}
+        for label, count in counts.items():
+            p = count / n
+            se = self._ratio_se(p, squares[label], cross[label], n)
+            out[label] = (
+                max(0.0, (p - Z_95 * se) * 100),
+                min(100.0, (p + Z_95 * se) * 100),
+            )
+        return out
+
+    def quantile_interval(self, values: Sequence[int], q: float) -> Tuple[float, float]:
+        """
+        Интервал квантиля методом Вудраффа: интервал для доли значений
+        не больше оценки квантиля переводится обратно в значения выборки.
+        """
+        n = len(values)
+        if not n:
+            return 0.0, 0.0
+        ordered = sorted(values)
+        estimate = (
+            ordered[min(n - 1, math.ceil(n * q) - 1)] if n * q >= 1 else ordered[0]
+        )
+        indicators = [1 if v <= estimate else 0 for v in values]
+        squares, cross = self._category_moments(indicators)
+        p = sum(indicators) / n
+        se = self._ratio_se(p, squares[1], cross[1], n)
+        lo = max(0, math.floor((q - Z_95 * se) * n))
+        hi = min(n - 1, math.ceil((q + Z_95 * se) * n))
+        return float(ordered[lo]), float(ordered[hi])
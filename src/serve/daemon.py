@@ -0,0 +1,116 @@
+import glob
+import itertools
+import logging
+import threading
+from typing import Dict
+from typing import Iterable
+
+from src.errors import BadUsageError
+from src.errors import UnexpectedRuntimeError
+from src.reader import make_reader_for
+from src.reader.follower import FileFollower
+from src.serve.server import ReportServer
+from src.serve.state import DayPartitionedStats
+from src.sources import STDIN_SOURCE
+from src.sources import deduplicate_sources
+from src.validator import Validator
+
+logger = logging.getLogger("log-analyzer.serve")
+
+# Строк за один захват блокировки: запросы не ждут окончания большого файла
+_INGEST_BATCH = 10_000
+
+
+class Daemon:
+    """
+    Режим serve: загружает источники один раз, держит статистику в памяти,
+    дочитывает новые строки локальных файлов и отвечает на запросы по HTTP.
+
+    Удалённые источники (URL) и стандартный ввод загружаются один раз при старте. Для шаблона
+    путей новые подходящие файлы подхватываются при очередном опросе.
+    """
+
+    def __init__(self, config, validator: Validator) -> None:
+        self._config = config
+        self._validator = validator
+        self.state = DayPartitionedStats(
+            bucket_seconds=config.bucket_seconds,
+            normalizer=config.resource_normalizer,
+        )
+        self._followers: Dict[str, FileFollower] = {}
+        self._stop = threading.Event()
+        try:
+            self.server = ReportServer((config.host, config.port), self.state)
+        except OSError as e:
+            raise UnexpectedRuntimeError(
+                f"Не удалось открыть {config.host}:{config.port}: {e}"
+            )
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _ingest(self, source: str, lines: Iterable[str]) -> None:
+        it = iter(lines)
+        while True:
+            batch = list(itertools.islice(it, _INGEST_BATCH))
+            if not batch:
+                return
+            self.state.ingest(source, batch)
+
+    def load(self) -> None:
+        """Первичная загрузка всех источников."""
+        for source in self._config.resolved_sources:
+            location = source.location
+            if self._validator.is_url(location) or location == STDIN_SOURCE:
+                logger.info("Загружаю источник однократно: %s", location)
+                reader = make_reader_for(location, http_cache=self._config.http_cache)
+                self._ingest(location, reader.iter_lines())
+            else:
+                self._followers[location] = FileFollower(location)
+        self.poll_once()
+        logger.info("Загружено записей: %s", self.state.total_requests)
+
+    def _discover(self) -> None:
+        pattern = self._config.input_path
+        if self._validator.is_url(pattern) or not glob.has_magic(pattern):
+            return
+        try:
+            sources = self._validator.resolve_sources(pattern, self._config.excludes)
+        except BadUsageError:
+            return
+        # тот же порядок, что при старте: из повторов одного файла остаётся тот же путь
+        sources, _ = deduplicate_sources(sources)
+        for source in sources:
+            if source.location not in self._followers:
+                logger.info("Новый файл по шаблону: %s", source.location)
+                self._followers[source.location] = FileFollower(source.location)
+
+    def poll_once(self) -> None:
+        """Дочитывает новые строки всех отслеживаемых файлов."""
+        self._discover()
+        for path, follower in list(self._followers.items()):
+            self._ingest(path, follower.read_new())
+
+    def _follow(self) -> None:
+        while not self._stop.wait(self._config.poll_interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Ошибка при дочитывании источников")
+
+    def serve_forever(self) -> None:
+        follower = threading.Thread(target=self._follow, name="follow", daemon=True)
+        follower.start()
+        logger.info("Сервер отчётов запущен: %s", self.address)
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Остановка по Ctrl+C")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.server.server_close()
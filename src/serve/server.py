@@ -0,0 +1,102 @@
+import datetime as dt
+import io
+import json
+import logging
+import re
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Dict
+from typing import Optional
+from typing import Union
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+from src.errors import BadUsageError
+from src.formatters.registry import get_spec
+from src.serve.state import DayPartitionedStats
+from src.validator import Validator
+
+logger = logging.getLogger("log-analyzer.serve.http")
+
+_DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def parse_day(raw: Optional[str], option: str) -> Optional[dt.date]:
+    """Граница запроса: только дата YYYY-MM-DD — состояние разбито по дням."""
+    if raw is None or raw == "":
+        return None
+    if not _DAY_PATTERN.match(raw):
+        raise BadUsageError(
+            f"Некорректное значение {option} '{raw}'. Ожидается дата YYYY-MM-DD"
+        )
+    try:
+        return dt.date.fromisoformat(raw)
+    except ValueError:
+        raise BadUsageError(f"Некорректная дата {option} '{raw}'")
+
+
+class ReportServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state: DayPartitionedStats) -> None:
+        super().__init__(address, ReportHandler)
+        self.state = state
+        self.validator = Validator()
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """
+    GET /report?from=YYYY-MM-DD&to=YYYY-MM-DD&format=json|markdown|adoc|csv|binary
+    GET /health
+    """
+
+    server: ReportServer
+
+    def log_message(self, fmt, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, JSON_CONTENT_TYPE, json.dumps(self.server.state.summary()))
+        elif url.path == "/report":
+            self._report(parse_qs(url.query))
+        else:
+            self._send_error(404, f"Неизвестный путь '{url.path}'")
+
+    def _report(self, params: Dict[str, list]) -> None:
+        def param(name: str) -> Optional[str]:
+            values = params.get(name)
+            return values[-1] if values else None
+
+        try:
+            fmt = self.server.validator.validate_output_format(
+                param("format") or "json"
+            )
+            date_from = parse_day(param("from"), "from")
+            date_to = parse_day(param("to"), "to")
+            if date_from and date_to and date_from > date_to:
+                raise BadUsageError("Дата from должна быть не позже даты to")
+        except BadUsageError as e:
+            self._send_error(400, str(e))
+            return
+
+        result = self.server.state.query(date_from, date_to)
+        spec = get_spec(fmt)
+        buf = io.BytesIO() if spec.binary else io.StringIO()
+        spec.load().write(result, buf)
+        self._send(200, spec.content_type, buf.getvalue())
+
+    def _send_error(self, status: int, message: str) -> None:
+        body = json.dumps({"error": message}, ensure_ascii=False)
+        self._send(status, JSON_CONTENT_TYPE, body)
+
+    def _send(self, status: int, content_type: str, body: Union[str, bytes]) -> None:
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
@@ -0,0 +1,126 @@
+import datetime as dt
+import logging
+import threading
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from src.parser import parse_line
+from src.resource_normalizer import ResourceNormalizer
+from src.stats_collector import StatsCollector
+from src.stats_collector import StatsResult
+
+logger = logging.getLogger("log-analyzer.serve.state")
+
+
+# Частей статистики на день, после которых они сливаются в одну:
+# запрос сливает не больше стольких сборщиков за каждый день
+_MAX_PARTS_PER_DAY = 4
+
+
+class DayPartitionedStats:
+    """
+    Тёплое состояние демона: сборщики статистики по дням. День — дата записи
+    в часовом поясе лога, как в requestsPerDate и --from/--to отчёта.
+
+    Пачка строк разбирается вне блокировки в новые сборщики по дням; после
+    публикации они не меняются, и под блокировкой только дописываются ссылки.
+    Запрос за диапазон дат берёт под блокировкой снимок частей нужных дней
+    и сливает их без неё, так что загрузка и запросы не ждут друг друга.
+    Когда частей за день больше _MAX_PARTS_PER_DAY, загрузка сливает их в одну.
+    p95 считается по гистограмме размеров: сырые размеры в долгоживущем
+    процессе не копятся, а запрос не сортирует их.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: Optional[int] = None,
+        normalizer: Optional[ResourceNormalizer] = None,
+    ) -> None:
+        self._bucket_seconds = bucket_seconds
+        self._normalizer = normalizer
+        self._days: Dict[dt.date, List[StatsCollector]] = {}
+        self._files: List[str] = []
+        self._lock = threading.Lock()
+        # загрузки идут по очереди: уплотнение заменяет ровно те части, что слило
+        self._ingest_lock = threading.Lock()
+        self.total_requests = 0
+
+    def _new_collector(self, files: List[str]) -> StatsCollector:
+        return StatsCollector(
+            files,
+            bucket_seconds=self._bucket_seconds,
+            normalizer=self._normalizer,
+            exact_p95=False,
+        )
+
+    def _merge(
+        self, parts: Iterable[StatsCollector], files: List[str]
+    ) -> StatsCollector:
+        merged = self._new_collector(files)
+        for part in parts:
+            merged.merge(part)
+        return merged
+
+    def ingest(self, source: str, lines: Iterable[str]) -> int:
+        """Разбирает строки источника и раскладывает записи по дням; возвращает их число."""
+        parts: Dict[dt.date, StatsCollector] = {}
+        count = 0
+        for line in lines:
+            if not line or not line.strip():
+                continue
+            entry = parse_line(line)
+            if entry is None:
+                continue
+            day = entry.timestamp.date()
+            collector = parts.get(day)
+            if collector is None:
+                collector = parts[day] = self._new_collector([])
+            collector.update(entry)
+            count += 1
+
+        with self._ingest_lock:
+            with self._lock:
+                if source not in self._files:
+                    self._files.append(source)
+                for day, part in parts.items():
+                    self._days.setdefault(day, []).append(part)
+                self.total_requests += count
+                crowded = {
+                    day: list(self._days[day])
+                    for day in parts
+                    if len(self._days[day]) > _MAX_PARTS_PER_DAY
+                }
+            for day, day_parts in crowded.items():
+                compacted = self._merge(day_parts, [])
+                with self._lock:
+                    rest = self._days[day][len(day_parts) :]
+                    self._days[day] = [compacted] + rest
+        return count
+
+    def query(
+        self, date_from: Optional[dt.date] = None, date_to: Optional[dt.date] = None
+    ) -> StatsResult:
+        """Статистика за дни [date_from, date_to] (границы включительно, None — без границы)."""
+        with self._lock:
+            files = list(self._files)
+            parts = [
+                part
+                for day, day_parts in self._days.items()
+                if not (date_from and day < date_from)
+                and not (date_to and day > date_to)
+                for part in day_parts
+            ]
+        return self._merge(parts, files).build_result()
+
+    def summary(self) -> dict:
+        with self._lock:
+            days = sorted(self._days)
+            return {
+                "status": "ok",
+                "totalRequestsCount": self.total_requests,
+                "files": list(self._files),
+                "firstDate": days[0].isoformat() if days else None,
+                "lastDate": days[-1].isoformat() if days else None,
+            }
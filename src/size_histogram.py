@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from array import array
+from math import ceil
+from typing import Iterator
+from typing import Tuple
+
+# Точность: значения < 2**PRECISION_BITS хранятся точно, остальные —
+# с относительной погрешностью не больше 2**-(PRECISION_BITS - 1).
+PRECISION_BITS = 8
+# Максимальная битовая длина значения (2**48 байт ≈ 256 TiB), больше — в последний бакет
+MAX_VALUE_BITS = 48
+
+_EXACT = 1 << PRECISION_BITS
+_HALF = _EXACT >> 1
+BUCKET_COUNT = _EXACT + (MAX_VALUE_BITS - PRECISION_BITS) * _HALF
+
+
+def _bucket_index(value: int) -> int:
+    if value < _EXACT:
+        return value if value > 0 else 0
+    shift = value.bit_length() - PRECISION_BITS
+    idx = _EXACT + (shift - 1) * _HALF + ((value >> shift) - _HALF)
+    return idx if idx < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def _bucket_bounds(idx: int) -> Tuple[int, int]:
+    """Границы бакета [low, high] (включительно)."""
+    if idx < _EXACT:
+        return idx, idx
+    shift, offset = divmod(idx - _EXACT, _HALF)
+    shift += 1
+    low = (_HALF + offset) << shift
+    return low, low + (1 << shift) - 1
+
+
+class SizeHistogram:
+    """
+    Лог-линейная гистограмма размеров ответа (в духе HDR Histogram).
+
+    Раскладка бакетов фиксирована, поэтому обновление — O(1), слияние —
+    поэлементное сложение счётчиков, а любой перцентиль читается за O(бакетов).
+    """
+
+    def __init__(self) -> None:
+        self.counts = array("q", bytes(8 * BUCKET_COUNT))
+        self.total = 0
+        # точные границы — чтобы оценка не выходила за наблюдаемый диапазон
+        self.min_value = 0
+        self.max_value = 0
+
+    def add(self, value: int) -> None:
+        self.counts[_bucket_index(value)] += 1
+        if self.total == 0:
+            self.min_value = self.max_value = value
+        elif value < self.min_value:
+            self.min_value = value
+        elif value > self.max_value:
+            self.max_value = value
+        self.total += 1
+
+    def add_many(self, values) -> None:
+        """Пакетное добавление массива NumPy: индексы бакетов считаются векторно."""
+        import numpy as np
+
+        v = np.maximum(np.asarray(values, dtype=np.int64), 0)
+        if not len(v):
+            return
+        # frexp даёт bit_length точно для значений < 2**53
+        shift = np.maximum(np.frexp(v.astype(np.float64))[1] - PRECISION_BITS, 0)
+        idx = np.where(
+            v < _EXACT, v, _EXACT + (shift - 1) * _HALF + ((v >> shift) - _HALF)
+        )
+        per_bucket = np.bincount(np.minimum(idx, BUCKET_COUNT - 1))
+        counts = self.counts
+        for i in np.flatnonzero(per_bucket):
+            counts[int(i)] += int(per_bucket[i])
+
+        lo, hi = int(v.min()), int(v.max())
+        if self.total == 0:
+            self.min_value, self.max_value = lo, hi
+        else:
+            self.min_value = min(self.min_value, lo)
+            self.max_value = max(self.max_value, hi)
+        self.total += len(v)
+
+    def merge(self, other: SizeHistogram) -> None:
+        if other.total == 0:
+            return
+        if self.total == 0:
+            self.min_value, self.max_value = other.min_value, other.max_value
+        else:
+            self.min_value = min(self.min_value, other.min_value)
+            self.max_value = max(self.max_value, other.max_value)
+        counts = self.counts
+        for idx, cnt in enumerate(other.counts):
+            if cnt:
+                counts[idx] += cnt
+        self.total += other.total
+
+    def export_state(self) -> dict:
+        """Состояние для кэша (JSON): только непустые бакеты."""
+        return {
+            "counts": [[idx, cnt] for idx, cnt in enumerate(self.counts) if cnt],
+            "total": self.total,
+            "min": self.min_value,
+            "max": self.max_value,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> SizeHistogram:
+        h = cls()
+        for idx, cnt in state["counts"]:
+            h.counts[idx] = cnt
+        h.total = state["total"]
+        h.min_value = state["min"]
+        h.max_value = state["max"]
+        return h
+
+    def percentile(self, p: float) -> float:
+        """Перцентиль по рангу ceil(p * n): середина бакета, не выходя за min/max."""
+        if self.total == 0:
+            return 0.0
+        rank = max(1, ceil(p * self.total))
+        seen = 0
+        for idx, cnt in enumerate(self.counts):
+            seen += cnt
+            if seen >= rank:
+                low, high = _bucket_bounds(idx)
+                mid = (low + high) / 2
+                return round(min(max(mid, self.min_value), self.max_value), 2)
+        return 0.0
+
+    def distribution(self) -> Iterator[Tuple[int, int, int]]:
+        """Распределение по степеням двойки: (от, до, количество), только непустые."""
+        counts = self.counts
+        if counts[0]:
+            yield 0, 0, counts[0]
+        bits = 1
+        while bits <= MAX_VALUE_BITS:
+            low, high = 1 << (bits - 1), (1 << bits) - 1
+            first = _bucket_index(low)
+            last = _bucket_index(high) if bits < MAX_VALUE_BITS else BUCKET_COUNT - 1
+            cnt = sum(counts[first : last + 1])
+            if cnt:
+                yield low, high, cnt
+            bits += 1
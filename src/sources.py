@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import fnmatch
+import glob
+import os
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Pattern
+from typing import Set
+from typing import Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Допустимые расширения входных файлов
+LOG_EXTENSIONS = (".log", ".txt")
+
+# -p - : строки читаются из стандартного ввода
+STDIN_SOURCE = "-"
+
+# Отпечаток содержимого (--dedup-content): столько блоков по столько байт,
+# равномерно по файлу, плюс размер файла
+CONTENT_SAMPLE_BLOCKS = 8
+CONTENT_SAMPLE_BYTES = 4096
+
+# Потоки для обхода каталогов: на NFS обход упирается в задержки, а не в CPU
+DISCOVERY_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+@dataclass(frozen=True)
+class Source:
+    """Источник логов: локальный путь или URL; размер — если известен заранее."""
+
+    location: str
+    size: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class DuplicateSource:
+    """Источник, пропущенный как копия уже выбранного."""
+
+    location: str
+    original: str
+    reason: str  # "inode" — тот же файл (симлинк, хардлинк); "content" — копия
+
+
+def content_fingerprint(path: str, size: int) -> Optional[str]:
+    """Хэш размера и CONTENT_SAMPLE_BLOCKS блоков, взятых равномерно по файлу."""
+    import hashlib
+
+    digest = hashlib.blake2b(str(size).encode("ascii"), digest_size=16)
+    step = max(CONTENT_SAMPLE_BYTES, size // CONTENT_SAMPLE_BLOCKS)
+    try:
+        with open(path, "rb") as f:
+            for offset in range(0, size, step):
+                f.seek(offset)
+                digest.update(f.read(CONTENT_SAMPLE_BYTES))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def deduplicate_sources(
+    sources: List[Source], by_content: bool = False
+) -> Tuple[List[Source], List[DuplicateSource]]:
+    """
+    Убирает локальные файлы, которые уже есть в списке: по (устройство, inode) —
+    всегда, по отпечатку содержимого — при by_content (отпечаток считается
+    только для файлов с совпадающим размером). Остаётся первый по порядку.
+    URL и стандартный ввод не трогаются.
+    """
+    unique: List[Source] = []
+    duplicates: List[DuplicateSource] = []
+    by_inode: Dict[Tuple[int, int], str] = {}
+    by_size: Dict[int, List[Source]] = {}
+    for source in sources:
+        try:
+            st = os.stat(source.location)
+        except OSError:
+            unique.append(source)
+            continue
+        key = (st.st_dev, st.st_ino)
+        if key in by_inode:
+            duplicates.append(DuplicateSource(source.location, by_inode[key], "inode"))
+            continue
+        by_inode[key] = source.location
+        unique.append(source)
+        by_size.setdefault(st.st_size, []).append(source)
+
+    if by_content:
+        skipped = set()
+        for size, group in by_size.items():
+            if len(group) < 2:
+                continue
+            seen: Dict[str, str] = {}
+            for source in group:
+                fingerprint = content_fingerprint(source.location, size)
+                if fingerprint is None:
+                    continue
+                if fingerprint in seen:
+                    duplicates.append(
+                        DuplicateSource(source.location, seen[fingerprint], "content")
+                    )
+                    skipped.add(source.location)
+                else:
+                    seen[fingerprint] = source.location
+        unique = [s for s in unique if s.location not in skipped]
+    return unique, duplicates
+
+
+def split_pattern(pattern: str) -> Tuple[str, str]:
+    """Делит шаблон на неизменяемый префикс-каталог и относительный шаблон."""
+    parts = pattern.replace(os.sep, "/").split("/")
+    static: List[str] = []
+    for part in parts[:-1]:
+        if glob.has_magic(part):
+            break
+        static.append(part)
+    base = "/".join(static)
+    if not base and pattern.startswith("/"):
+        base = "/"
+    rel = "/".join(parts[len(static) :])
+    return base, rel
+
+
+def compile_glob(pattern: str) -> Pattern[str]:
+    """Переводит glob-шаблон (с поддержкой **) в регулярное выражение по пути с '/'."""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape("["))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class _Walker:
+    def __init__(
+        self,
+        base: str,
+        rel_pattern: str,
+        excludes: Iterable[str],
+        extensions: Tuple[str, ...],
+    ) -> None:
+        self._base = base
+        self._include = compile_glob(rel_pattern)
+        self._excludes = [compile_glob(p) for p in excludes]
+        self._exclude_names = list(excludes)
+        self._extensions = extensions
+        self._max_depth = None if "**" in rel_pattern else rel_pattern.count("/")
+        # как и glob, скрытые файлы/каталоги не обходим, если шаблон их явно не просит
+        self._include_hidden = rel_pattern.startswith(".") or "/." in rel_pattern
+
+    def _excluded(self, rel: str, name: str) -> bool:
+        return any(p.match(rel) for p in self._excludes) or any(
+            fnmatch.fnmatch(name, p) for p in self._exclude_names
+        )
+
+    def scan(
+        self,
+        directory: str,
+        rel_dir: str,
+        depth: int,
+        ancestors: FrozenSet[Tuple[int, int]] = frozenset(),
+    ) -> Tuple[List[Source], List[tuple]]:
+        """
+        Читает один каталог: подходящие файлы (с размером) и подкаталоги для обхода.
+        Симлинки на каталоги обходятся, как в glob; ancestors — (st_dev, st_ino)
+        каталогов на пути от корня: каталог, уже открытый выше, — цикл, он пропускается.
+        """
+        files: List[Source] = []
+        subdirs: List[tuple] = []
+        try:
+            it = os.scandir(directory or ".")
+        except OSError:
+            return files, subdirs
+        with it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(".") and not self._include_hidden:
+                    continue
+                rel = f"{rel_dir}/{name}" if rel_dir else name
+                try:
+                    if entry.is_dir():
+                        if self._max_depth is not None and depth >= self._max_depth:
+                            continue
+                        if self._excluded(rel + "/", name):
+                            continue
+                        st = entry.stat()
+                        key = (st.st_dev, st.st_ino)
+                        if key in ancestors:
+                            continue
+                        subdirs.append((entry.path, rel, depth + 1, ancestors | {key}))
+                        continue
+                    if not name.endswith(self._extensions):
+                        continue
+                    if not self._include.match(rel) or self._excluded(rel, name):
+                        continue
+                    if not entry.is_file():
+                        continue
+                    # тип берётся из DirEntry без stat; stat — только для подошедших
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                location = os.path.join(self._base, rel) if self._base else rel
+                files.append(Source(location, size))
+        return files, subdirs
+
+
+def discover_sources(
+    pattern: str,
+    excludes: Iterable[str] = (),
+    extensions: Tuple[str, ...] = LOG_EXTENSIONS,
+    workers: int = DISCOVERY_WORKERS,
+) -> List[Source]:
+    """
+    Разворачивает glob-шаблон (в т.ч. с **) через os.scandir.
+
+    Каталоги обходятся параллельно пулом потоков; фильтры include/exclude
+    и расширения применяются прямо во время обхода. Симлинки на каталоги
+    обходятся (циклы отсекаются по (st_dev, st_ino) предков). Результат
+    отсортирован по пути.
+    """
+    base, rel_pattern = split_pattern(pattern)
+    walker = _Walker(base, rel_pattern, list(excludes), extensions)
+
+    try:
+        st = os.stat(base or ".")
+        root = frozenset({(st.st_dev, st.st_ino)})
+    except OSError:
+        root = frozenset()
+
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import wait
+
+    found: List[Source] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Set[Future] = {pool.submit(walker.scan, base, "", 0, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                found.extend(files)
+                for args in subdirs:
+                    pending.add(pool.submit(walker.scan, *args))
+    found.sort(key=lambda s: s.location)
+    return found
@@ -1,13 +1,43 @@
 from __future__ import annotations
 
+import datetime as dt
+import heapq
 import os
+from array import array
 from collections import defaultdict
 from dataclasses import dataclass
 from dataclasses import field
 from math import floor
+from typing import TYPE_CHECKING
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
-from typing import Set
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from src.parser import DATES
+from src.parser import PROTOCOLS
+from src.resource_normalizer import ResourceNormalizer
+from src.size_histogram import SizeHistogram
+
+if TYPE_CHECKING:
+    from src.external_counter import ExternalCounter
+    from src.sampling import SamplingState
+    from src.store.columns import ColumnBatch
+    from src.time_histogram import TimeHistogram
+
+
+# Статус — трёхзначное число, поэтому служит индексом без перекодирования
+_STATUS_CODE_SPACE = 1000
+
+
+def _add_count(counts: List[int], code: int, cnt: int) -> None:
+    if code >= len(counts):
+        counts.extend([0] * (code + 1 - len(counts)))
+    counts[code] += cnt
 
 
 @dataclass
@@ -17,6 +47,22 @@ class ResponseSizeInBytes:
     p95: float  # с точностью до 2 знаков
 
 
+@dataclass
+class ResponseSizePercentiles:
+    p50: float
+    p90: float
+    p99: float
+    p999: float
+
+
+@dataclass
+class ResponseSizeBucketStat:
+    fromBytes: int
+    toBytes: int
+    totalResponsesCount: int
+    totalResponsesPercentage: float  # округлено до 2 знаков
+
+
 @dataclass
 class ResourceStat:
     resource: str
@@ -37,6 +83,60 @@ class RequestPerDateStat:
     totalRequestsPercentage: float  # округлено до 2 знаков
 
 
+@dataclass
+class RequestPerBucketStat:
+    start: str  # ISO8601, UTC
+    totalRequestsCount: int
+    totalBytes: int
+    statusClasses: Dict[str, int]  # 1xx..5xx
+
+
+@dataclass
+class ConfidenceInterval:
+    low: Union[int, float]
+    high: Union[int, float]
+
+
+@dataclass
+class SamplingStat:
+    rate: float
+    sampledRequestsCount: int
+    sampledBlocks: int
+    # 95% доверительные интервалы оценок
+    totalRequestsCount: ConfidenceInterval
+    responseSizeP95: ConfidenceInterval
+    responseCodes: Dict[int, ConfidenceInterval]  # код -> число ответов
+    requestsPerDatePercentage: Dict[str, ConfidenceInterval]  # дата -> % от общего
+
+
+@dataclass
+class SkippedDuplicateStat:
+    file: str
+    duplicateOf: str
+    reason: str  # "inode" | "content"
+
+
+class ResourceCounts:
+    """
+    Все ресурсы со счётчиками в порядке ресурса — для выгрузок полной
+    кардинальности (CSV). Читаются лениво при каждом обходе: из dict
+    или слиянием run'ов ExternalCounter, без построения списка в памяти.
+    """
+
+    def __init__(
+        self,
+        items: Callable[[], Iterable[Tuple[str, int]]],
+        scale: Optional[Callable[[int], int]] = None,
+    ) -> None:
+        self._items = items
+        self.scale = scale  # пересчёт по выборке (--sample)
+
+    def __iter__(self) -> Iterator[ResourceStat]:
+        scale = self.scale
+        for resource, count in self._items():
+            yield ResourceStat(resource, scale(count) if scale else count)
+
+
 @dataclass
 class StatsResult:
     files: List[str]
@@ -46,43 +146,259 @@ class StatsResult:
     responseCodes: List[ResponseCodeStat]
     requestsPerDate: List[RequestPerDateStat] = field(default_factory=list)
     uniqueProtocols: List[str] = field(default_factory=list)
+    requestsPerBucket: List[RequestPerBucketStat] = field(default_factory=list)
+    responseSizePercentiles: Optional[ResponseSizePercentiles] = None
+    responseSizeDistribution: List[ResponseSizeBucketStat] = field(default_factory=list)
+    sampling: Optional[SamplingStat] = None  # только при --sample
+    skippedDuplicates: List[SkippedDuplicateStat] = field(default_factory=list)
+    # полный список ресурсов (не часть отчёта: топ-10 — в resources)
+    allResources: Optional[ResourceCounts] = field(
+        default=None, compare=False, repr=False
+    )
 
 
 class StatsCollector:
-    def __init__(self, files: List[str]) -> None:
+    def __init__(
+        self,
+        files: List[str],
+        bucket_seconds: Optional[int] = None,
+        date_from: Optional[dt.datetime] = None,
+        date_to: Optional[dt.datetime] = None,
+        normalizer: Optional[ResourceNormalizer] = None,
+        memory_limit: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+        exact_p95: bool = True,
+    ) -> None:
         self._raw_files: List[str] = list(files)  # исходные пути
         self.total_requests: int = 0
         self.sum_sizes: int = 0
         self.max_size: int = 0
+        # exact_p95=False — p95 по гистограмме, сырые размеры не копятся (serve)
+        self._exact_p95 = exact_p95
         self.sizes: List[int] = []  # для p95
+        self._size_arrays: list = []  # то же для колонок хранилища (массивы NumPy)
+        # остальные перцентили и распределение — по лог-линейной гистограмме
+        self.size_histogram = SizeHistogram()
+
+        # низкокардинальные измерения: плоские массивы, индекс — код значения
+        # (статус — сам трёхзначный код; даты и протоколы — коды из DATES/PROTOCOLS)
+        self.status_counts: List[int] = [0] * _STATUS_CODE_SPACE
+        self.date_counts: List[int] = []
+        self.protocol_counts: List[int] = []
 
-        self.by_status: Dict[int, int] = defaultdict(int)
         self.by_resource: Dict[str, int] = defaultdict(int)
-        self.by_date: Dict[str, int] = defaultdict(int)
-        self.weekday_by_date: Dict[str, str] = {}
-        self.protocols: Set[str] = set()
+        self._resource_key = normalizer.normalize if normalizer else str
+        # при --memory-limit ресурсы считаются с выгрузкой на диск
+        self._external_resources: Optional[ExternalCounter] = None
+        if memory_limit is not None:
+            from src.external_counter import ExternalCounter
+
+            self._external_resources = ExternalCounter(memory_limit)
+
+        # гистограмма по интервалам (--bucket); границы --from/--to — для предвыделения
+        self.time_histogram: Optional[TimeHistogram] = None
+        if bucket_seconds:
+            # NumPy подгружается только при --bucket
+            from src.time_histogram import TimeHistogram
+
+            self.time_histogram = TimeHistogram(bucket_seconds, date_from, date_to)
+
+        # при --sample счётчики — по выборке; масштабируются в build_result
+        # (плюс статус и дата каждой учтённой строки — для интервалов по блокам)
+        self.sampling: Optional[SamplingState] = None
+        self._sampled_statuses = array("h")
+        self._sampled_dates = array("i")
+        if sample_rate is not None:
+            from src.sampling import SamplingState
+
+            self.sampling = SamplingState(sample_rate)
 
     def update(self, entry) -> None:
         self.total_requests += 1
 
-        s = int(entry.response_size)
+        s = entry.response_size
         self.sum_sizes += s
         if s > self.max_size:
             self.max_size = s
-        self.sizes.append(s)
+        if self._exact_p95:
+            self.sizes.append(s)
+        self.size_histogram.add(s)
+
+        self.status_counts[entry.status_code] += 1
+        resource = self._resource_key(entry.resource)
+        if self._external_resources is None:
+            self.by_resource[resource] += 1
+        else:
+            self._external_resources.add(resource)
+
+        date_counts = self.date_counts
+        code = entry.date_code
+        if code >= len(date_counts):
+            date_counts.extend([0] * (code + 1 - len(date_counts)))
+        date_counts[code] += 1
+
+        protocol_counts = self.protocol_counts
+        code = entry.protocol_code
+        if code >= len(protocol_counts):
+            protocol_counts.extend([0] * (code + 1 - len(protocol_counts)))
+        protocol_counts[code] += 1
+
+        if self.time_histogram is not None:
+            self.time_histogram.add(
+                int(entry.timestamp.timestamp()), s, entry.status_code
+            )
+        if self.sampling is not None:
+            self._sampled_statuses.append(entry.status_code)
+            self._sampled_dates.append(entry.date_code)
 
-        self.by_status[int(entry.status_code)] += 1
-        self.by_resource[str(entry.resource)] += 1
-        self.by_date[str(entry.date_str)] += 1
+    def update_columns(self, batch: ColumnBatch) -> None:
+        """Пакетный update() по колонкам хранилища (--store): счётчики через bincount."""
+        import numpy as np
 
-        if entry.date_str not in self.weekday_by_date:
-            self.weekday_by_date[entry.date_str] = entry.weekday
+        n = len(batch.ts)
+        if not n:
+            return
+        self.total_requests += n
+        self.sum_sizes += int(batch.size.sum())
+        self.max_size = max(self.max_size, int(batch.size.max()))
+        self._size_arrays.append(batch.size)
+        self.size_histogram.add_many(batch.size)
 
-        if entry.protocol:
-            self.protocols.add(str(entry.protocol))
+        status = np.bincount(batch.status, minlength=_STATUS_CODE_SPACE)
+        for code in np.flatnonzero(status):
+            self.status_counts[int(code)] += int(status[code])
+
+        # ресурсы, даты и протоколы декодируются по разу на уникальный код
+        labels = batch.dictionaries
+        for code, cnt in batch.code_counts("resource"):
+            resource = self._resource_key(labels["resource"][code])
+            if self._external_resources is None:
+                self.by_resource[resource] += cnt
+            else:
+                self._external_resources.add(resource, cnt)
+        for code, cnt in batch.code_counts("date"):
+            _add_count(self.date_counts, DATES.encode(labels["date"][code]), cnt)
+        for code, cnt in batch.code_counts("protocol"):
+            _add_count(
+                self.protocol_counts, PROTOCOLS.encode(labels["protocol"][code]), cnt
+            )
+
+        if self.time_histogram is not None:
+            self.time_histogram.add_many(batch.ts, batch.size, batch.status)
+
+    def merge(self, other: StatsCollector) -> None:
+        """Добавляет к себе состояние другого сборщика (те же нормализация и --bucket)."""
+        for path in other._raw_files:
+            if path not in self._raw_files:
+                self._raw_files.append(path)
+        self.total_requests += other.total_requests
+        self.sum_sizes += other.sum_sizes
+        self.max_size = max(self.max_size, other.max_size)
+        self.sizes.extend(other.sizes)
+        self._size_arrays.extend(other._size_arrays)
+        self.size_histogram.merge(other.size_histogram)
+
+        for code, cnt in enumerate(other.status_counts):
+            if cnt:
+                self.status_counts[code] += cnt
+        for code, cnt in enumerate(other.date_counts):
+            if cnt:
+                _add_count(self.date_counts, code, cnt)
+        for code, cnt in enumerate(other.protocol_counts):
+            if cnt:
+                _add_count(self.protocol_counts, code, cnt)
+
+        if other._external_resources is None:
+            resource_counts = other.by_resource.items()
+        else:
+            resource_counts = other._external_resources.items()
+        if self._external_resources is None:
+            for resource, cnt in resource_counts:
+                self.by_resource[resource] += cnt
+        else:
+            for resource, cnt in resource_counts:
+                self._external_resources.add(resource, cnt)
+
+        if self.time_histogram is not None and other.time_histogram is not None:
+            self.time_histogram.merge(other.time_histogram)
+        if self.sampling is not None and other.sampling is not None:
+            self.sampling.merge(other.sampling)
+            self._sampled_statuses.extend(other._sampled_statuses)
+            self._sampled_dates.extend(other._sampled_dates)
+
+    def export_state(self) -> dict:
+        """
+        Состояние сборщика для кэша частичных результатов (JSON).
+        Коды словарей заменены метками; список файлов и размеры ответа
+        (для точного p95) в состояние не входят — размеры берут из sizes.
+        """
+        if self._external_resources is None:
+            resources = dict(self.by_resource)
+        else:
+            resources = dict(self._external_resources.items())
+        return {
+            "totalRequests": self.total_requests,
+            "sumSizes": self.sum_sizes,
+            "maxSize": self.max_size,
+            "sizeHistogram": self.size_histogram.export_state(),
+            "statuses": [[c, n] for c, n in enumerate(self.status_counts) if n],
+            "dates": [
+                [DATES.decode(c), n] for c, n in enumerate(self.date_counts) if n
+            ],
+            "protocols": [
+                [PROTOCOLS.decode(c), n]
+                for c, n in enumerate(self.protocol_counts)
+                if n
+            ],
+            "resources": resources,
+            "buckets": (
+                self.time_histogram.export_state()
+                if self.time_histogram is not None
+                else None
+            ),
+        }
+
+    def load_state(self, state: dict, sizes: Iterable[int]) -> None:
+        """Восстанавливает состояние из export_state() в пустой сборщик с теми же настройками."""
+        self.total_requests = state["totalRequests"]
+        self.sum_sizes = state["sumSizes"]
+        self.max_size = state["maxSize"]
+        self.sizes = list(sizes)
+        self.size_histogram = SizeHistogram.from_state(state["sizeHistogram"])
+        for code, cnt in state["statuses"]:
+            self.status_counts[code] = cnt
+        for label, cnt in state["dates"]:
+            _add_count(self.date_counts, DATES.encode(label), cnt)
+        for label, cnt in state["protocols"]:
+            _add_count(self.protocol_counts, PROTOCOLS.encode(label), cnt)
+        for resource, cnt in state["resources"].items():
+            if self._external_resources is None:
+                self.by_resource[resource] += cnt
+            else:
+                self._external_resources.add(resource, cnt)
+        if self.time_histogram is not None:
+            from src.time_histogram import TimeHistogram
+
+            self.time_histogram = TimeHistogram.from_state(
+                self.time_histogram.bucket_seconds, state["buckets"]
+            )
+
+    def add_sample_block(self, rows: int) -> None:
+        """Закрывает прочитанный блок выборки: rows — сколько строк из него учтено."""
+        self.sampling.add_block(rows)
 
     # --- P95: Hyndman & Fan "Type 7" (как в NumPy по умолчанию) ---
     def _p95(self) -> float:
+        if not self._exact_p95:
+            return self.size_histogram.percentile(0.95)
+        if self._size_arrays:
+            import numpy as np
+
+            values = np.concatenate(
+                self._size_arrays + [np.asarray(self.sizes, dtype=np.int64)]
+            )
+            # метод по умолчанию в NumPy ("linear") — тот же Type 7
+            return round(float(np.percentile(values, 95)), 2)
         if not self.sizes:
             return 0.0
         x = sorted(self.sizes)
@@ -100,6 +416,28 @@ class StatsCollector:
             val = x[j0] + g * (x[j0 + 1] - x[j0])
         return round(float(val), 2)
 
+    def _size_percentiles(self) -> Optional[ResponseSizePercentiles]:
+        if self.total_requests == 0:
+            return None
+        h = self.size_histogram
+        return ResponseSizePercentiles(
+            p50=h.percentile(0.5),
+            p90=h.percentile(0.9),
+            p99=h.percentile(0.99),
+            p999=h.percentile(0.999),
+        )
+
+    def _size_distribution(self) -> List[ResponseSizeBucketStat]:
+        return [
+            ResponseSizeBucketStat(
+                fromBytes=low,
+                toBytes=high,
+                totalResponsesCount=cnt,
+                totalResponsesPercentage=round(cnt * 100.0 / self.total_requests, 2),
+            )
+            for low, high, cnt in self.size_histogram.distribution()
+        ]
+
     def _format_files(self) -> List[str]:
         """Только имена файлов + стабильная сортировка лексикографически."""
         names = [os.path.basename(p) for p in self._raw_files]
@@ -130,7 +468,27 @@ class StatsCollector:
                 return (2, major, -minor)
             return (3, p)
 
-        return sorted(self.protocols, key=key)
+        protocols = [
+            PROTOCOLS.decode(code)
+            for code, cnt in enumerate(self.protocol_counts)
+            if cnt and PROTOCOLS.decode(code)
+        ]
+        return sorted(protocols, key=key)
+
+    def _per_bucket(self) -> List[RequestPerBucketStat]:
+        if self.time_histogram is None:
+            return []
+        from src.time_histogram import STATUS_CLASSES
+
+        return [
+            RequestPerBucketStat(
+                start=start.isoformat(),
+                totalRequestsCount=cnt,
+                totalBytes=size,
+                statusClasses=dict(zip(STATUS_CLASSES, classes)),
+            )
+            for start, cnt, size, classes in self.time_histogram.iter_buckets()
+        ]
 
     def build_result(self) -> StatsResult:
         # размеры ответа
@@ -143,35 +501,51 @@ class StatsCollector:
             sizes = ResponseSizeInBytes(average=avg, max=mx, p95=p95)
 
         # топ-10 ресурсов (по убыванию счётчика; при равенстве — по ресурсу)
-        resources_sorted = sorted(
-            self.by_resource.items(), key=lambda kv: (-kv[1], kv[0])
-        )
-        top10 = [ResourceStat(r, c) for r, c in resources_sorted[:10]]
+        if self._external_resources is None:
+            resource_counts = self.by_resource.items()
+            all_resources = ResourceCounts(lambda: sorted(self.by_resource.items()))
+        else:
+            resource_counts = self._external_resources.items()
+            # run'ы на диске остаются открытыми, пока жив результат
+            # (временные файлы закрываются и удаляются вместе со счётчиком)
+            all_resources = ResourceCounts(self._external_resources.items)
+        top10 = [
+            ResourceStat(r, c)
+            for r, c in heapq.nsmallest(
+                10, resource_counts, key=lambda kv: (-kv[1], kv[0])
+            )
+        ]
 
         # коды ответа: по убыванию количества, при равенстве — по коду
         codes = [
             ResponseCodeStat(code, cnt)
             for code, cnt in sorted(
-                self.by_status.items(), key=lambda kv: (-kv[1], kv[0])
+                ((code, cnt) for code, cnt in enumerate(self.status_counts) if cnt),
+                key=lambda kv: (-kv[1], kv[0]),
             )
         ]
 
         # распределение по датам
         per_date: List[RequestPerDateStat] = []
         if self.total_requests > 0:
-            for d in sorted(self.by_date.keys()):
-                cnt = self.by_date[d]
+            by_date = {
+                DATES.decode(code): cnt
+                for code, cnt in enumerate(self.date_counts)
+                if cnt
+            }
+            for d in sorted(by_date):
+                cnt = by_date[d]
                 pct = round(cnt * 100.0 / self.total_requests, 2)
                 per_date.append(
                     RequestPerDateStat(
                         date=d,
-                        weekday=self.weekday_by_date.get(d, ""),
+                        weekday=dt.date.fromisoformat(d).strftime("%A"),
                         totalRequestsCount=cnt,
                         totalRequestsPercentage=pct,
                     )
                 )
 
-        return StatsResult(
+        result = StatsResult(
             files=self._format_files(),
             totalRequestsCount=self.total_requests,
             responseSizeInBytes=sizes,
@@ -179,4 +553,61 @@ class StatsCollector:
             responseCodes=codes,
             requestsPerDate=per_date,
             uniqueProtocols=self._sort_protocols(),
+            requestsPerBucket=self._per_bucket(),
+            responseSizePercentiles=self._size_percentiles(),
+            responseSizeDistribution=self._size_distribution(),
+            allResources=all_resources,
+        )
+        if self.sampling is not None:
+            self._apply_sampling(result, self.sampling)
+        return result
+
+    def _apply_sampling(self, result: StatsResult, sampling: SamplingState) -> None:
+        """
+        Пересчитывает счётчики выборки в оценки для всего входа (делением на долю)
+        и добавляет доверительные интервалы. Доли и средние не масштабируются.
+        """
+        n = self.total_requests
+        scale = sampling.scale
+
+        def interval(bounds, digits=None) -> ConfidenceInterval:
+            low, high = bounds
+            if digits is None:
+                return ConfidenceInterval(round(low), round(high))
+            return ConfidenceInterval(round(low, digits), round(high, digits))
+
+        codes = sampling.count_intervals(self._sampled_statuses)
+        dates = {
+            DATES.decode(code): bounds
+            for code, bounds in sampling.percentage_intervals(
+                self._sampled_dates
+            ).items()
+        }
+        result.sampling = SamplingStat(
+            rate=sampling.rate,
+            sampledRequestsCount=n,
+            sampledBlocks=sampling.blocks,
+            totalRequestsCount=interval(sampling.total_interval(n)),
+            responseSizeP95=interval(sampling.quantile_interval(self.sizes, 0.95), 2),
+            responseCodes={
+                rc.code: interval(codes[rc.code]) for rc in result.responseCodes
+            },
+            requestsPerDatePercentage={
+                d.date: interval(dates[d.date], 2) for d in result.requestsPerDate
+            },
         )
+
+        result.totalRequestsCount = scale(result.totalRequestsCount)
+        for r in result.resources:
+            r.totalRequestsCount = scale(r.totalRequestsCount)
+        result.allResources.scale = scale
+        for rc in result.responseCodes:
+            rc.totalResponsesCount = scale(rc.totalResponsesCount)
+        for d in result.requestsPerDate:
+            d.totalRequestsCount = scale(d.totalRequestsCount)
+        for b in result.responseSizeDistribution:
+            b.totalResponsesCount = scale(b.totalResponsesCount)
+        for b in result.requestsPerBucket:
+            b.totalRequestsCount = scale(b.totalRequestsCount)
+            b.totalBytes = scale(b.totalBytes)
+            b.statusClasses = {k: scale(v) for k, v in b.statusClasses.items()}
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+import numpy as np
+
+# Колонки сегмента и их типы; *_code-колонки — коды в словарях хранилища
+COLUMNS = {
+    "ts": np.int64,  # epoch, секунды
+    "status": np.int16,
+    "size": np.int64,
+    "resource": np.int32,
+    "date": np.int32,  # дата из лога (как LogEntry.date_str)
+    "protocol": np.int32,
+    "method": np.int32,
+    "ip": np.int32,
+}
+
+# Колонки со словарным кодированием строк
+DICTIONARY_COLUMNS = ("resource", "date", "protocol", "method", "ip")
+
+
+@dataclass
+class ColumnBatch:
+    """Набор строк хранилища: колонки NumPy и словари для декодирования кодов."""
+
+    ts: np.ndarray
+    status: np.ndarray
+    size: np.ndarray
+    resource: np.ndarray
+    date: np.ndarray
+    protocol: np.ndarray
+    method: np.ndarray
+    ip: np.ndarray
+    dictionaries: Dict[str, List[str]]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def take(self, mask: np.ndarray) -> ColumnBatch:
+        return ColumnBatch(
+            **{name: getattr(self, name)[mask] for name in COLUMNS},
+            dictionaries=self.dictionaries,
+        )
+
+    def code_counts(self, column: str) -> Iterator[Tuple[int, int]]:
+        """(код, число строк) для встречающихся кодов колонки."""
+        counts = np.bincount(getattr(self, column))
+        for code in np.flatnonzero(counts):
+            yield int(code), int(counts[code])
@@ -0,0 +1,119 @@
+import datetime as dt
+import logging
+import math
+import os
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import numpy as np
+
+from src.errors import UnexpectedRuntimeError
+from src.row_filter import RowFilter
+from src.store.columns import COLUMNS
+from src.store.columns import DICTIONARY_COLUMNS
+from src.store.columns import ColumnBatch
+from src.store.writer import DICTIONARY_DIR
+from src.store.writer import MANIFEST_NAME
+from src.store.writer import SEGMENTS_DIR
+from src.store.writer import STORE_VERSION
+from src.store.writer import read_json
+
+logger = logging.getLogger("log-analyzer.store.reader")
+
+# Статус — трёхзначное число (индекс таблицы фильтра)
+_STATUS_CODE_SPACE = 1000
+
+
+class ColumnStore:
+    """
+    Чтение колоночного хранилища: колонки отображаются в память (mmap),
+    сегменты вне диапазона дат отбрасываются по min/max времени (zone map).
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        manifest = read_json(os.path.join(directory, MANIFEST_NAME))
+        if manifest is None:
+            raise UnexpectedRuntimeError(f"В '{directory}' нет {MANIFEST_NAME}")
+        if manifest.get("version") != STORE_VERSION:
+            raise UnexpectedRuntimeError(
+                f"Неподдерживаемая версия хранилища: {manifest.get('version')}"
+            )
+        self.segments: List[dict] = manifest["segments"]
+        self.sources: List[str] = [s["location"] for s in manifest["sources"]]
+        self.dictionaries: Dict[str, List[str]] = {
+            name: read_json(os.path.join(directory, DICTIONARY_DIR, f"{name}.json"), [])
+            for name in DICTIONARY_COLUMNS
+        }
+
+    def _load(self, segment: dict) -> ColumnBatch:
+        path = os.path.join(self.directory, SEGMENTS_DIR, segment["name"])
+        try:
+            columns = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in COLUMNS
+            }
+        except (OSError, ValueError) as e:
+            raise UnexpectedRuntimeError(f"Не удалось прочитать сегмент '{path}': {e}")
+        return ColumnBatch(**columns, dictionaries=self.dictionaries)
+
+    def _filter_lookups(self, row_filter: RowFilter) -> Dict[str, np.ndarray]:
+        """
+        Фильтр строк как таблицы «код -> подходит»: условие проверяется по разу
+        на метку словаря, а не на строку. Условия без ограничений не попадают.
+        """
+        predicates = {
+            "status": (row_filter.status_allowed, range(_STATUS_CODE_SPACE)),
+            "method": (row_filter.method_allowed, self.dictionaries["method"]),
+            "ip": (row_filter.ip_allowed, self.dictionaries["ip"]),
+            "resource": (row_filter.resource_allowed, self.dictionaries["resource"]),
+        }
+        lookups: Dict[str, np.ndarray] = {}
+        for column, (allowed, values) in predicates.items():
+            lookup = np.fromiter((allowed(v) for v in values), dtype=bool)
+            if not lookup.all():
+                lookups[column] = lookup
+        return lookups
+
+    def iter_batches(
+        self,
+        date_from: Optional[dt.datetime] = None,
+        date_to: Optional[dt.datetime] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[ColumnBatch]:
+        """
+        Строки с date_from <= время <= date_to (как DateWindow.contains),
+        прошедшие row_filter (маска считается векторно по колонкам кодов).
+        """
+        lookups = self._filter_lookups(row_filter) if row_filter else {}
+        # время в хранилище — целые секунды
+        lo = math.ceil(date_from.timestamp()) if date_from else None
+        hi = math.floor(date_to.timestamp()) if date_to else None
+        pruned = 0
+        for segment in self.segments:
+            if (lo is not None and segment["maxTs"] < lo) or (
+                hi is not None and segment["minTs"] > hi
+            ):
+                pruned += 1
+                continue
+            batch = self._load(segment)
+            if (lo is not None and segment["minTs"] < lo) or (
+                hi is not None and segment["maxTs"] > hi
+            ):
+                mask = np.ones(len(batch), dtype=bool)
+                if lo is not None:
+                    mask &= batch.ts >= lo
+                if hi is not None:
+                    mask &= batch.ts <= hi
+                batch = batch.take(mask)
+            if lookups:
+                mask = np.ones(len(batch), dtype=bool)
+                for column, lookup in lookups.items():
+                    mask &= lookup[getattr(batch, column)]
+                batch = batch.take(mask)
+            yield batch
+        logger.info(
+            "Сегментов отброшено по времени: %s из %s", pruned, len(self.segments)
+        )
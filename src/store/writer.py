@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import tempfile
+from array import array
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+from src.dictionary import Dictionary
+from src.errors import UnexpectedRuntimeError
+from src.parser import LogEntry
+from src.store.columns import COLUMNS
+from src.store.columns import DICTIONARY_COLUMNS
+from src.tracing import span
+
+logger = logging.getLogger("log-analyzer.store.writer")
+
+STORE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DICTIONARY_DIR = "dict"
+SEGMENTS_DIR = "segments"
+
+# Строк в сегменте: по min/max времени сегмента запросы отбрасывают лишние
+DEFAULT_SEGMENT_ROWS = 1 << 20
+
+# Буферы колонок до сброса сегмента (коды словарей — int32)
+_BUFFER_TYPECODES = {
+    "ts": "q",
+    "status": "h",
+    "size": "q",
+    "resource": "i",
+    "date": "i",
+    "protocol": "i",
+    "method": "i",
+    "ip": "i",
+}
+
+
+def write_json_atomic(path: str, data) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_json(path: str, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        raise UnexpectedRuntimeError(f"Повреждённый файл хранилища '{path}': {e}")
+
+
+class StoreWriter:
+    """
+    Дописывает разобранные записи в колоночное хранилище.
+
+    Каталог хранилища:
+      manifest.json         — сегменты (число строк, min/max времени) и источники;
+      dict/<колонка>.json   — словари строк (метка по коду), только растут;
+      segments/NNNNNN/*.npy — колонки сегмента (см. COLUMNS).
+
+    Манифест пишется последним и атомарно: сегменты, не попавшие в него
+    (прерванная загрузка), читателю не видны.
+    """
+
+    def __init__(
+        self, directory: str, segment_rows: int = DEFAULT_SEGMENT_ROWS
+    ) -> None:
+        self.directory = directory
+        self._segment_rows = segment_rows
+        manifest = read_json(os.path.join(directory, MANIFEST_NAME), {})
+        self._segments: List[dict] = manifest.get("segments", [])
+        self._sources: List[dict] = manifest.get("sources", [])
+        self._dicts: Dict[str, Dictionary] = {
+            name: Dictionary.from_labels(
+                read_json(os.path.join(directory, DICTIONARY_DIR, f"{name}.json"), [])
+            )
+            for name in DICTIONARY_COLUMNS
+        }
+        self._buffers: Dict[str, array] = {}
+        self._reset_buffers()
+
+    def _reset_buffers(self) -> None:
+        self._buffers = {
+            name: array(typecode) for name, typecode in _BUFFER_TYPECODES.items()
+        }
+
+    def source_offset(self, location: str) -> Optional[int]:
+        """Сколько байт источника уже загружено (None — источник новый)."""
+        for source in self._sources:
+            if source["location"] == location:
+                return source["offset"]
+        return None
+
+    def source_identity(self, location: str) -> Optional[Tuple[int, int]]:
+        """(st_dev, st_ino) файла, к которому относится смещение (None — неизвестно)."""
+        for source in self._sources:
+            if source["location"] == location and "inode" in source:
+                return source["dev"], source["inode"]
+        return None
+
+    def record_source(
+        self,
+        location: str,
+        offset: int,
+        rows: int,
+        identity: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        record = {"location": location, "offset": offset, "rows": rows}
+        if identity is not None:
+            record["dev"], record["inode"] = identity
+        for source in self._sources:
+            if source["location"] == location:
+                record["rows"] += source["rows"]
+                source.clear()
+                source.update(record)
+                return
+        self._sources.append(record)
+
+    def append(self, entry: LogEntry) -> None:
+        b = self._buffers
+        d = self._dicts
+        b["ts"].append(int(entry.timestamp.timestamp()))
+        b["status"].append(entry.status_code)
+        b["size"].append(entry.response_size)
+        b["resource"].append(d["resource"].encode(entry.resource))
+        b["date"].append(d["date"].encode(entry.date_str))
+        b["protocol"].append(d["protocol"].encode(entry.protocol))
+        b["method"].append(d["method"].encode(entry.method))
+        b["ip"].append(d["ip"].encode(entry.ip))
+        if len(b["ts"]) >= self._segment_rows:
+            self._flush_segment()
+
+    def _flush_segment(self) -> None:
+        rows = len(self._buffers["ts"])
+        if not rows:
+            return
+        with span("segment.flush", cat="aggregate", rows=rows):
+            self._write_segment(rows)
+
+    def _write_segment(self, rows: int) -> None:
+        name = f"{len(self._segments):06d}"
+        path = os.path.join(self.directory, SEGMENTS_DIR, name)
+        try:
+            os.makedirs(path, exist_ok=True)
+            for column, dtype in COLUMNS.items():
+                values = np.asarray(self._buffers[column]).astype(dtype, copy=False)
+                np.save(os.path.join(path, f"{column}.npy"), values)
+        except OSError as e:
+            raise UnexpectedRuntimeError(f"Не удалось записать сегмент '{path}': {e}")
+        ts = np.asarray(self._buffers["ts"])
+        self._segments.append(
+            {
+                "name": name,
+                "rows": rows,
+                "minTs": int(ts.min()),
+                "maxTs": int(ts.max()),
+            }
+        )
+        logger.info("Записан сегмент %s: %s строк", name, rows)
+        self._reset_buffers()
+
+    def commit(self) -> None:
+        """Сбрасывает остаток, словари и (последним) манифест."""
+        self._flush_segment()
+        try:
+            dict_dir = os.path.join(self.directory, DICTIONARY_DIR)
+            os.makedirs(dict_dir, exist_ok=True)
+            for name, dictionary in self._dicts.items():
+                write_json_atomic(
+                    os.path.join(dict_dir, f"{name}.json"), dictionary.labels
+                )
+            write_json_atomic(
+                os.path.join(self.directory, MANIFEST_NAME),
+                {
+                    "version": STORE_VERSION,
+                    "segments": self._segments,
+                    "sources": self._sources,
+                },
+            )
+        except OSError as e:
+            raise UnexpectedRuntimeError(
+                f"Не удалось записать хранилище '{self.directory}': {e}"
+            )
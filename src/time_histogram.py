@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+# Классы кодов ответа: 1xx..5xx
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+_INITIAL_CAPACITY = 1440
+# Верхняя граница предвыделения по --from/--to (дальше — рост по требованию)
+_MAX_PREALLOCATED = 1 << 16
+
+
+class TimeHistogram:
+    """
+    Гистограмма трафика по интервалам фиксированной длины.
+
+    Счётчики хранятся в заранее выделенных массивах NumPy, индекс интервала —
+    (epoch - start) // bucket, где start выровнен по границе интервала.
+    При выходе за границы массивы расширяются с запасом (в обе стороны),
+    поэтому обновление стоит O(1) амортизированно.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self._origin: Optional[int] = None  # epoch начала нулевого интервала
+        self._lo = 0  # первый непустой индекс
+        self._hi = -1  # последний непустой индекс
+        capacity = _INITIAL_CAPACITY
+        if start is not None:
+            self._origin = self._align(int(start.timestamp()))
+            if end is not None:
+                span = int(end.timestamp()) - self._origin
+                capacity = min(max(1, span // bucket_seconds + 1), _MAX_PREALLOCATED)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.requests = np.zeros(capacity, dtype=np.int64)
+        self.bytes = np.zeros(capacity, dtype=np.int64)
+        self.status = np.zeros((capacity, len(STATUS_CLASSES)), dtype=np.int64)
+
+    def _align(self, epoch: int) -> int:
+        return epoch - epoch % self.bucket_seconds
+
+    def _grow(self, idx: int) -> int:
+        """Расширяет массивы так, чтобы idx попал в диапазон; возвращает новый idx."""
+        capacity = len(self.requests)
+        if idx < 0:
+            shift = max(-idx, capacity)
+            pad = ((shift, 0),)
+            self._origin -= shift * self.bucket_seconds
+            self._lo += shift
+            self._hi += shift
+            idx += shift
+        else:
+            pad = ((0, max(idx + 1 - capacity, capacity)),)
+        self.requests = np.pad(self.requests, pad)
+        self.bytes = np.pad(self.bytes, pad)
+        self.status = np.pad(self.status, pad + ((0, 0),))
+        return idx
+
+    def add(self, epoch: int, size: int, status_code: int) -> None:
+        if self._origin is None:
+            self._origin = self._align(epoch)
+        idx = (epoch - self._origin) // self.bucket_seconds
+        if idx < 0 or idx >= len(self.requests):
+            idx = self._grow(idx)
+
+        self.requests[idx] += 1
+        self.bytes[idx] += size
+        cls = status_code // 100 - 1
+        if 0 <= cls < len(STATUS_CLASSES):
+            self.status[idx, cls] += 1
+
+        if self._hi < self._lo:
+            self._lo = self._hi = idx
+        elif idx < self._lo:
+            self._lo = idx
+        elif idx > self._hi:
+            self._hi = idx
+
+    def add_many(
+        self, epochs: np.ndarray, sizes: np.ndarray, status_codes: np.ndarray
+    ) -> None:
+        """Пакетный вариант add() для колонок NumPy."""
+        if not len(epochs):
+            return
+        if self._origin is None:
+            self._origin = self._align(int(epochs.min()))
+        idx = (epochs.astype(np.int64) - self._origin) // self.bucket_seconds
+        lo, hi = int(idx.min()), int(idx.max())
+        if lo < 0:
+            shifted = self._grow(lo)
+            idx += shifted - lo
+            hi += shifted - lo
+            lo = shifted
+        if hi >= len(self.requests):
+            self._grow(hi)
+
+        n = len(self.requests)
+        self.requests += np.bincount(idx, minlength=n)
+        self.bytes += np.bincount(idx, weights=sizes, minlength=n).astype(np.int64)
+        classes = status_codes.astype(np.int64) // 100 - 1
+        valid = (classes >= 0) & (classes < len(STATUS_CLASSES))
+        flat = idx[valid] * len(STATUS_CLASSES) + classes[valid]
+        self.status += np.bincount(flat, minlength=self.status.size).reshape(
+            self.status.shape
+        )
+
+        if self._hi < self._lo:
+            self._lo, self._hi = lo, hi
+        else:
+            self._lo = min(self._lo, lo)
+            self._hi = max(self._hi, hi)
+
+    def merge(self, other: TimeHistogram) -> None:
+        """Прибавляет счётчики другой гистограммы с тем же размером интервала."""
+        if other._origin is None or other._hi < other._lo:
+            return
+        first = other._origin + other._lo * self.bucket_seconds
+        if self._origin is None:
+            self._origin = first
+        lo = (first - self._origin) // self.bucket_seconds
+        if lo < 0:
+            lo = self._grow(lo)
+        hi = lo + other._hi - other._lo
+        if hi >= len(self.requests):
+            self._grow(hi)
+
+        src = slice(other._lo, other._hi + 1)
+        self.requests[lo : hi + 1] += other.requests[src]
+        self.bytes[lo : hi + 1] += other.bytes[src]
+        self.status[lo : hi + 1] += other.status[src]
+
+        if self._hi < self._lo:
+            self._lo, self._hi = lo, hi
+        else:
+            self._lo = min(self._lo, lo)
+            self._hi = max(self._hi, hi)
+
+    def export_state(self) -> Optional[dict]:
+        """Непустой диапазон интервалов для кэша (JSON); None — гистограмма пуста."""
+        if self._origin is None or self._hi < self._lo:
+            return None
+        src = slice(self._lo, self._hi + 1)
+        return {
+            "start": self._origin + self._lo * self.bucket_seconds,
+            "requests": self.requests[src].tolist(),
+            "bytes": self.bytes[src].tolist(),
+            "status": self.status[src].tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, bucket_seconds: int, state: Optional[dict]) -> TimeHistogram:
+        h = cls(bucket_seconds)
+        if state is None:
+            return h
+        n = len(state["requests"])
+        h._origin = state["start"]
+        h.requests = np.array(state["requests"], dtype=np.int64)
+        h.bytes = np.array(state["bytes"], dtype=np.int64)
+        h.status = np.array(state["status"], dtype=np.int64).reshape(
+            n, len(STATUS_CLASSES)
+        )
+        h._lo, h._hi = 0, n - 1
+        return h
+
+    def iter_buckets(self) -> Iterator[Tuple[dt.datetime, int, int, Tuple[int, ...]]]:
+        """Интервалы от первого до последнего непустого (включая пустые между ними)."""
+        if self._origin is None or self._hi < self._lo:
+            return
+        for idx in range(self._lo, self._hi + 1):
+            start = dt.datetime.fromtimestamp(
+                self._origin + idx * self.bucket_seconds, tz=dt.timezone.utc
+            )
+            yield (
+                start,
+                int(self.requests[idx]),
+                int(self.bytes[idx]),
+                tuple(int(c) for c in self.status[idx]),
+            )
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import gc
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextlib import nullcontext
+from typing import Any
+from typing import ContextManager
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import TextIO
+
+# Один общий «пустой» контекст: при выключенной трассировке span() ничего не создаёт
+_NULL_SPAN = nullcontext()
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000.0
+
+
+class Tracer:
+    """
+    Запись интервалов (spans) в формате Trace Event (Chrome trace / Perfetto).
+
+    Каждый span — событие "X" (complete) с pid/tid потока, началом и длительностью
+    в микросекундах. Паузы сборщика мусора записываются отдельными событиями "gc".
+    События из рабочих процессов добавляются через extend() (pid у них свой).
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._gc_started = 0.0
+        gc.callbacks.append(self._on_gc)
+
+    def _record(self, name: str, cat: str, start: float, args: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": start,
+            "dur": _now_us() - start,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads[(event["pid"], event["tid"])] = thread.name
+
+    @contextmanager
+    def span(self, name: str, cat: str = "pipeline", **args: Any) -> Iterator[None]:
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self._record(name, cat, start, args)
+
+    def _on_gc(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            self._gc_started = _now_us()
+        elif self._gc_started:
+            self._record(
+                "gc",
+                "gc",
+                self._gc_started,
+                {
+                    "generation": info.get("generation"),
+                    "collected": info.get("collected"),
+                },
+            )
+            self._gc_started = 0.0
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Забирает накопленные события (рабочий процесс отдаёт их основному)."""
+        with self._lock:
+            events, self._events = self._events, []
+            return events
+
+    def extend(self, events: List[Dict[str, Any]]) -> None:
+        """Добавляет события другого процесса (например, рабочего)."""
+        with self._lock:
+            self._events.extend(events)
+            for e in events:
+                self._threads.setdefault((e["pid"], e["tid"]), f"worker-{e['pid']}")
+
+    def close(self) -> None:
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def write(self, sink: TextIO) -> None:
+        """JSON Trace Event: {"traceEvents": [...]} — открывается в Perfetto/chrome://tracing."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        sink.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        first = True
+        for (pid, tid), name in threads.items():
+            meta = {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid}
+            meta["args"] = {"name": name}
+            sink.write(("" if first else ",\n") + json.dumps(meta, ensure_ascii=False))
+            first = False
+        for event in events:
+            sink.write(
+                ("" if first else ",\n")
+                + json.dumps(event, ensure_ascii=False, default=str)
+            )
+            first = False
+        sink.write("\n]}\n")
+
+
+class _NullTracer:
+    enabled = False
+
+    def span(self, name: str, cat: str = "pipeline", **args: Any) -> ContextManager:
+        return _NULL_SPAN
+
+    def events(self) -> List[Dict[str, Any]]:
+        return []
+
+    def drain(self) -> List[Dict[str, Any]]:
+        return []
+
+    def extend(self, events: List[Dict[str, Any]]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+_tracer: Tracer | _NullTracer = _NullTracer()
+
+
+def tracer() -> Tracer | _NullTracer:
+    return _tracer
+
+
+def enable_tracing() -> Tracer:
+    """Включает запись интервалов (--trace) для всего процесса."""
+    global _tracer
+    if not _tracer.enabled:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing() -> None:
+    global _tracer
+    _tracer.close()
+    _tracer = _NullTracer()
+
+
+def span(name: str, cat: str = "pipeline", **args: Any) -> ContextManager:
+    """Интервал текущей трассировки; без --trace — общий пустой контекст."""
+    return _tracer.span(name, cat, **args)
@@ -2,17 +2,30 @@ import datetime as dt
 import glob
 import re
 import os
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
-import requests
 from src.errors import BadUsageError
 from src.errors import RemoteResourceNotFoundError
 from src.errors import UnexpectedRuntimeError
+from src.formatters.registry import get_spec
+from src.sources import LOG_EXTENSIONS
+from src.sources import Source
+from src.sources import STDIN_SOURCE
+from src.sources import discover_sources
 
+if TYPE_CHECKING:
+    import ipaddress
 
-# Поддерживаемые форматы отчёта и ожидаемые расширения выходного файла
-SUPPORTED_FORMATS = {"json", "markdown", "adoc"}
-EXPECTED_EXTENSION = {"json": ".json", "markdown": ".md", "adoc": ".ad"}
+    from src.reader.http_cache import HttpCache
+
+# Допустимые значения --bucket и их длительность в секундах
+BUCKET_SIZES = {"1m": 60, "5m": 300, "1h": 3600}
+
+# Размеры вида 512K, 64M, 2GiB (двоичные множители)
+_SIZE_PATTERN = re.compile(r"^(\d+)\s*([KMGT]?)(?:I?B)?$")
+_SIZE_MULTIPLIERS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
 
 
 class Validator:
@@ -23,17 +36,22 @@ class Validator:
     def validate_output_format(self, fmt: str) -> str:
         if not fmt:
             raise BadUsageError("Не указан формат вывода")
-        key = fmt.strip().lower()
-        if key not in SUPPORTED_FORMATS:
-            raise BadUsageError(
-                f"Неподдерживаемый формат '{fmt}'. Допустимо: {', '.join(sorted(SUPPORTED_FORMATS))}"
-            )
-        return key
+        # форматы и их расширения — из реестра форматтеров
+        return get_spec(fmt).name
+
+    def validate_output_formats(self, raw: str) -> list[str]:
+        """Список форматов через запятую (-f json,markdown); повторы отбрасываются."""
+        if not raw:
+            raise BadUsageError("Не указан формат вывода")
+        formats: list[str] = []
+        for part in raw.split(","):
+            key = self.validate_output_format(part)
+            if key not in formats:
+                formats.append(key)
+        return formats
 
     def validate_output_path(self, out_path: str, out_fmt: str) -> None:
-        expected_ext = EXPECTED_EXTENSION.get(out_fmt)
-        if not expected_ext:
-            raise BadUsageError(f"Неизвестный формат '{out_fmt}'")
+        expected_ext = get_spec(out_fmt).extension
         if not out_path.endswith(expected_ext):
             raise BadUsageError(
                 f"Файл вывода должен иметь расширение '{expected_ext}' для формата '{out_fmt}'"
@@ -48,6 +66,18 @@ class Validator:
         if not os.access(parent, os.W_OK):
             raise BadUsageError(f"Нет прав на запись в директорию '{parent}'")
 
+    def validate_trace_path(
+        self, trace_path: str, report_paths: Iterable[str] = ()
+    ) -> None:
+        """Файл --trace: JSON с правилами файла вывода и не один из файлов отчёта."""
+        self.validate_output_path(trace_path, "json")
+        trace = os.path.realpath(trace_path)
+        for path in report_paths:
+            if os.path.realpath(path) == trace:
+                raise BadUsageError(
+                    f"Файл трассировки '{trace_path}' совпадает с файлом отчёта"
+                )
+
     # --------------------------- даты/диапазон ---------------------------
 
     def parse_from(self, raw: str | None) -> dt.datetime | None:
@@ -91,6 +121,15 @@ class Validator:
 
         return d
 
+    def split_window(self, raw: str) -> tuple[str | None, str | None]:
+        """Разбирает --window FROM..TO; любая из границ может быть пустой."""
+        raw_from, sep, raw_to = raw.partition("..")
+        if not sep:
+            raise BadUsageError(
+                f"Некорректное окно '{raw}'. Ожидается FROM..TO, например 2025-01-01..2025-01-31"
+            )
+        return raw_from.strip() or None, raw_to.strip() or None
+
     def validate_date_range(
         self, date_from: dt.datetime | None, date_to: dt.datetime | None
     ) -> None:
@@ -103,6 +142,189 @@ class Validator:
                 f"--from ({date_from.isoformat()}) должен быть меньше или равен --to ({date_to.isoformat()})"
             )
 
+    # --------------------------- интервалы ---------------------------
+
+    def parse_bucket(self, raw: str | None) -> int | None:
+        """Парсит --bucket (1m|5m|1h) в длительность интервала в секундах."""
+        if raw is None:
+            return None
+        key = raw.strip().lower()
+        if key not in BUCKET_SIZES:
+            raise BadUsageError(
+                f"Неподдерживаемый интервал '{raw}'. Допустимо: {', '.join(BUCKET_SIZES)}"
+            )
+        return BUCKET_SIZES[key]
+
+    # --------------------------- ресурсы ---------------------------
+
+    def compile_rewrite_rules(
+        self, raw: list[list[str]]
+    ) -> list[tuple[re.Pattern[str], str]]:
+        """Компилирует правила --rewrite PATTERN REPLACEMENT (порядок сохраняется)."""
+        rules: list[tuple[re.Pattern[str], str]] = []
+        for pattern, replacement in raw:
+            try:
+                compiled = re.compile(pattern)
+                compiled.sub(replacement, "")  # проверяем ссылки на группы
+            except (re.error, IndexError) as e:
+                raise BadUsageError(
+                    f"Некорректное правило --rewrite '{pattern}' -> '{replacement}': {e}"
+                )
+            rules.append((compiled, replacement))
+        return rules
+
+    # --------------------------- фильтры строк ---------------------------
+
+    def parse_status_filters(self, raw: list[str]) -> list[int]:
+        """--status: точный код (404) или класс (5xx); повторяемая опция."""
+        codes: list[int] = []
+        for value in raw:
+            v = value.strip().lower()
+            if re.fullmatch(r"[1-5]xx", v):
+                base = int(v[0]) * 100
+                codes.extend(range(base, base + 100))
+            elif re.fullmatch(r"\d{3}", v):
+                codes.append(int(v))
+            else:
+                raise BadUsageError(
+                    f"Некорректное значение --status '{value}'. Ожидается код (404) или класс (5xx)"
+                )
+        return codes
+
+    def parse_methods(self, raw: list[str]) -> list[str]:
+        """--method: HTTP-метод (регистр не важен)."""
+        methods: list[str] = []
+        for value in raw:
+            v = value.strip().upper()
+            if not re.fullmatch(r"[A-Z]+", v):
+                raise BadUsageError(f"Некорректное значение --method '{value}'")
+            methods.append(v)
+        return methods
+
+    def parse_networks(
+        self, raw: list[str]
+    ) -> "list[ipaddress.IPv4Network | ipaddress.IPv6Network]":
+        """--ip: адрес или подсеть CIDR (10.0.0.0/8, 2001:db8::/32)."""
+        import ipaddress
+
+        networks = []
+        for value in raw:
+            try:
+                networks.append(ipaddress.ip_network(value.strip(), strict=False))
+            except ValueError:
+                raise BadUsageError(
+                    f"Некорректное значение --ip '{value}'. Ожидается адрес или CIDR"
+                )
+        return networks
+
+    # --------------------------- выборка ---------------------------
+
+    def parse_sample_rate(self, raw: str | None) -> float | None:
+        """--sample: доля 0 < RATE <= 1 (0.01) или процент (1%); 1 — без выборки."""
+        if raw is None:
+            return None
+        value = raw.strip()
+        try:
+            rate = float(value[:-1]) / 100 if value.endswith("%") else float(value)
+        except ValueError:
+            rate = float("nan")
+        if not 0 < rate <= 1:
+            raise BadUsageError(
+                f"Некорректное значение --sample '{raw}'. Ожидается доля (0, 1] или процент"
+            )
+        return None if rate == 1 else rate
+
+    def parse_seed(self, raw: str) -> int:
+        value = raw.strip()
+        if not value.isdigit():
+            raise BadUsageError(f"Некорректное значение --sample-seed '{raw}'")
+        return int(value)
+
+    def parse_workers(self, raw: str) -> int:
+        """--workers: число процессов (>= 1) или auto — по числу CPU."""
+        value = raw.strip().lower()
+        if value == "auto":
+            return os.cpu_count() or 1
+        if not value.isdigit() or int(value) == 0:
+            raise BadUsageError(
+                f"Некорректное значение --workers '{raw}'. Ожидается число >= 1 или auto"
+            )
+        return int(value)
+
+    # --------------------------- ресурсы памяти ---------------------------
+
+    def parse_size(self, raw: str | None, option: str) -> int | None:
+        """Парсит размер в байтах: число с необязательным суффиксом K/M/G/T."""
+        if raw is None:
+            return None
+        m = _SIZE_PATTERN.match(raw.strip().upper())
+        if not m or int(m.group(1)) == 0:
+            raise BadUsageError(
+                f"Некорректное значение {option} '{raw}'. Ожидается, например, 512M или 2G"
+            )
+        return int(m.group(1)) * _SIZE_MULTIPLIERS[m.group(2)]
+
+    def parse_seconds(self, raw: str | None, option: str) -> int | None:
+        """Парсит неотрицательное целое число секунд."""
+        if raw is None:
+            return None
+        value = raw.strip()
+        if not value.isdigit():
+            raise BadUsageError(
+                f"Некорректное значение {option} '{raw}'. Ожидается число секунд"
+            )
+        return int(value)
+
+    def parse_port(self, raw: str) -> int:
+        """Порт HTTP API: 0..65535 (0 — выбрать свободный)."""
+        value = raw.strip()
+        if not value.isdigit() or int(value) > 65535:
+            raise BadUsageError(
+                f"Некорректное значение --port '{raw}'. Ожидается число 0..65535"
+            )
+        return int(value)
+
+    # --------------------------- кэш ---------------------------
+
+    def validate_cache_dir(self, path: str) -> str:
+        """Создаёт каталог кэша при необходимости и проверяет права на запись."""
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            raise BadUsageError(f"Не удалось создать каталог кэша '{path}': {e}")
+        if not os.access(path, os.W_OK):
+            raise BadUsageError(f"Нет прав на запись в каталог кэша '{path}'")
+        return path
+
+    # --------------------------- хранилище ---------------------------
+
+    def validate_store_dir(self, path: str, for_write: bool = False) -> str:
+        """
+        Каталог колоночного хранилища.
+        Для чтения (--store) должен содержать manifest.json; для ingest
+        создаётся при необходимости, но непустой чужой каталог не принимается.
+        """
+        manifest = os.path.join(path, "manifest.json")
+        if not for_write:
+            if not os.path.isfile(manifest):
+                raise BadUsageError(
+                    f"'{path}' не является хранилищем (нет manifest.json)"
+                )
+            return path
+        if os.path.exists(path) and not os.path.isdir(path):
+            raise BadUsageError(f"'{path}' не является директорией")
+        if os.path.isdir(path) and os.listdir(path) and not os.path.isfile(manifest):
+            raise BadUsageError(
+                f"Директория '{path}' не пуста и не является хранилищем"
+            )
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            raise BadUsageError(f"Не удалось создать хранилище '{path}': {e}")
+        if not os.access(path, os.W_OK):
+            raise BadUsageError(f"Нет прав на запись в хранилище '{path}'")
+        return path
+
     # --------------------------- источники ---------------------------
 
     @staticmethod
@@ -110,14 +332,64 @@ class Validator:
         parsed = urlparse(value)
         return parsed.scheme in ("http", "https")
 
-    def resolve_sources(self, path: str) -> list[str]:
-        """Возвращает список источников: локальные файлы по шаблону или один URL."""
+    def resolve_sources(
+        self,
+        path: str,
+        excludes: Iterable[str] = (),
+        http_cache: "HttpCache | None" = None,
+    ) -> list[Source]:
+        """
+        Возвращает список источников: локальные файлы по шаблону, один URL
+        или стандартный ввод (-p -).
+        """
+        if path == STDIN_SOURCE:
+            return [Source(STDIN_SOURCE)]
         if self.is_url(path):
-            return self._validate_remote_url(path)
-        return self._resolve_local_paths(path)
+            return self._validate_remote_url(path, http_cache)
+        return self._resolve_local_paths(path, excludes)
+
+    def resolve_many(
+        self,
+        paths: list[str],
+        excludes: Iterable[str] = (),
+        http_cache: "HttpCache | None" = None,
+    ) -> list[Source]:
+        """
+        Источники нескольких -p в порядке аргументов. URL проверяются параллельно
+        в пуле потоков; при ошибке поднимается первая по порядку аргументов.
+        """
+        urls = list(dict.fromkeys(p for p in paths if self.is_url(p)))
+        remote: dict[str, list[Source]] = {}
+        if urls:
+            from src.reader import http_session
+
+            workers = min(http_session.REMOTE_WORKERS, len(urls))
+            from concurrent.futures import ThreadPoolExecutor
 
-    def _resolve_local_paths(self, pattern: str) -> list[str]:
-        """Проверка/развёртывание локального пути/шаблона. Допустимы .log и .txt."""
+            with ThreadPoolExecutor(workers, thread_name_prefix="validate") as pool:
+                futures = {
+                    url: pool.submit(self._validate_remote_url, url, http_cache)
+                    for url in urls
+                }
+            for url, future in futures.items():
+                remote[url] = future.result()
+
+        sources: list[Source] = []
+        for path in paths:
+            if path in remote:
+                sources.extend(remote[path])
+            else:
+                sources.extend(self.resolve_sources(path, excludes))
+        return sources
+
+    def _resolve_local_paths(
+        self, pattern: str, excludes: Iterable[str]
+    ) -> list[Source]:
+        """
+        Проверка/развёртывание локального пути/шаблона. Допустимы .log и .txt.
+        Шаблон обходится через os.scandir: файлы с другими расширениями
+        и попавшие под --exclude отбрасываются во время обхода.
+        """
 
         # --- 1. Нормализуем странные паттерны вроде logs**.txt ---
         def _normalize_recursive_pattern(p: str) -> str:
@@ -132,24 +404,7 @@ class Validator:
         # --- 2. Проверка шаблона ---
         if glob.has_magic(pattern):
             normalized = _normalize_recursive_pattern(pattern)
-            recursive = "**" in normalized
-            matched = glob.glob(normalized, recursive=recursive)
-
-            if not matched:
-                raise BadUsageError(
-                    f"По шаблону '{pattern}' не найдено ни одного файла"
-                )
-
-            files: list[str] = []
-            for f in matched:
-                if not os.path.isfile(f):
-                    continue  # пропускаем директории
-                if not (f.endswith(".log") or f.endswith(".txt")):
-                    raise BadUsageError(
-                        f"Файл '{f}' имеет неподдерживаемое расширение (ожидается .log или .txt)"
-                    )
-                files.append(f)
-
+            files = discover_sources(normalized, excludes=excludes)
             if not files:
                 raise BadUsageError(
                     f"По шаблону '{pattern}' не найдено ни одного файла"
@@ -161,26 +416,42 @@ class Validator:
             raise BadUsageError(f"Файл '{pattern}' не найден")
         if not os.path.isfile(pattern):
             raise BadUsageError(f"'{pattern}' не является обычным файлом")
-        if not (pattern.endswith(".log") or pattern.endswith(".txt")):
+        if not pattern.endswith(LOG_EXTENSIONS):
             raise BadUsageError(
                 f"Файл '{pattern}' имеет неподдерживаемое расширение (ожидается .log или .txt)"
             )
-        return [pattern]
+        return [Source(pattern, os.path.getsize(pattern))]
 
-    def _validate_remote_url(self, url: str) -> list[str]:
-        """HEAD-проверка удалённого ресурса. 404 -> BadUsage; 2xx/3xx -> OK; иначе Unexpected."""
+    def _validate_remote_url(
+        self, url: str, http_cache: "HttpCache | None" = None
+    ) -> list[Source]:
+        """
+        Проверка удалённого ресурса HEAD-запросом через общую сессию: тело
+        не открывается, а соединение остаётся в пуле для GET при чтении.
+        404 -> BadUsage; 2xx/3xx -> OK; иначе Unexpected.
+        Свежая запись --cache-dir отвечает без запроса.
+        """
+        # тяжёлый импорт — только когда источник действительно URL
+        import requests
+
+        from src.reader import http_session
+
+        if http_cache is not None:
+            entry = http_cache.lookup(url)
+            if entry is not None and http_cache.is_fresh(entry):
+                return [Source(url)]
         try:
-            resp = requests.head(url, allow_redirects=True, timeout=5)
+            resp = http_session.head(url)
         except requests.RequestException as e:
             raise UnexpectedRuntimeError(
                 f"Не удалось проверить удалённый ресурс '{url}': {e}"
             )
+        if 200 <= resp.status_code < 400:
+            return [Source(url)]
         if resp.status_code == 404:
             raise RemoteResourceNotFoundError(
                 f"Удалённый ресурс '{url}' не найден (404)"
             )
-        if 200 <= resp.status_code < 400:
-            return [url]
         raise UnexpectedRuntimeError(
             f"Неожиданный статус при проверке удалённого ресурса '{url}': {resp.status_code}"
         )
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from scripts.bench.loggen import generate_lines
+from scripts.bench.loggen import write_log
+from scripts.bench.throughput import compare
+from scripts.bench.throughput import run_suite
+from src.parser import parse_line
+
+
+# 37 - Генератор детерминирован по seed и выдерживает долю битых строк
+def test_loggen_is_deterministic(tmp_path: Path):
+    a, b = tmp_path / "a.log", tmp_path / "b.log"
+    write_log(str(a), lines=2000, seed=7, malformed_rate=0.05)
+    write_log(str(b), lines=2000, seed=7, malformed_rate=0.05)
+    assert a.read_bytes() == b.read_bytes()
+
+    lines = list(generate_lines(2000, seed=7, malformed_rate=0.05))
+    malformed = sum(1 for line in lines if parse_line(line) is None)
+    assert 50 <= malformed <= 150
+    assert lines != list(generate_lines(2000, seed=8, malformed_rate=0.05))
+
+
+# 38 - Бенчмарк проходит все этапы и ловит регрессию относительно baseline
+def test_throughput_suite_smoke(tmp_path: Path):
+    results = run_suite(lines=500, seed=1, workdir=str(tmp_path))
+    names = [r.name for r in results]
+    assert names[0] == "reader_file" and names[-1] == "execute_pipeline"
+    assert {"format_json", "format_markdown", "format_csv", "format_binary"} <= set(
+        names
+    )
+    assert all(getattr(r, r.metric) > 0 and r.peak_rss_mb > 0 for r in results)
+    # форматтеры сравниваются по объёму вывода, а не по входным строкам
+    assert {r.metric for r in results if r.name.startswith("format_")} == {"mb_per_sec"}
+
+    fast = {r.name: {r.metric: getattr(r, r.metric) * 10} for r in results}
+    assert len(compare(results, fast, tolerance=0.25)) == len(results)
+    assert compare(results, {}, tolerance=0.25) == []
+
+
+# 61 - Адаптивный план не хуже наивного и близок к идеалу на неоднородных наборах
+def test_scheduler_suite_smoke(tmp_path: Path):
+    from scripts.bench.scheduler import run_suite as run_scheduler_suite
+
+    results = run_scheduler_suite(
+        workers=4, scale=1 << 20, seed=1, workdir=str(tmp_path)
+    )
+    assert [r.distribution for r in results] == ["uniform", "one_huge", "zipf"]
+    for r in results:
+        assert r.adaptive_efficiency >= r.naive_efficiency - 0.05
+        assert r.adaptive_efficiency >= 0.85
+    assert results[1].naive_efficiency < 0.5
@@ -33,8 +33,12 @@ def test_missing_remote_file(monkeypatch, tmp_path: Path):
     class FakeResp:
         status_code = 404
 
+        def close(self):
+            pass
+
     import requests
-    monkeypatch.setattr(requests, "head", lambda *a, **kw: FakeResp())
+
+    monkeypatch.setattr(requests.Session, "head", lambda *a, **kw: FakeResp())
     out = tmp_path / "report.json"
     code = run(["-p", "http://example.com/missing.log", "-f", "json", "-o", str(out)])
     assert code == ExitCode.BAD_USAGE
@@ -140,3 +144,215 @@ def test_from_greater_than_to(tmp_path: Path):
         ]
     )
     assert code == ExitCode.BAD_USAGE
+
+
+# 20 - Неподдерживаемое значение --bucket
+def test_invalid_bucket(tmp_path: Path):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out), "--bucket", "2m"])
+    assert code == ExitCode.BAD_USAGE
+
+
+# 23 - Некорректное регулярное выражение в --rewrite
+def test_invalid_rewrite_rule(tmp_path: Path):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    argv = ["-p", str(logf), "-f", "json", "-o", str(out), "--rewrite", "(", "x"]
+    code = run(argv)
+    assert code == ExitCode.BAD_USAGE
+
+
+# 25 - Некорректное значение --memory-limit
+@pytest.mark.parametrize("limit", ["lots", "0", "-5M"])
+def test_invalid_memory_limit(tmp_path: Path, limit):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    argv = ["-p", str(logf), "-f", "json", "-o", str(out), "--memory-limit", limit]
+    assert run(argv) == ExitCode.BAD_USAGE
+
+
+# 26 - Сбой при формировании отчёта не оставляет частичный файл
+def test_partial_report_not_visible(monkeypatch, tmp_path: Path):
+    from src.formatters.json_formatter import JsonFormatter
+
+    def broken_write(self, result, sink):
+        sink.write('{\n  "files": [')
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(JsonFormatter, "write", broken_write)
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)])
+    assert code == ExitCode.UNEXPECTED_ERROR
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.log"]
+
+
+# 29 - Некорректные --window
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ["--window", "2015-05-01"],  # нет разделителя ".."
+        ["--window", "2015-05-02..2015-05-01"],  # from > to
+        ["--window", "2015-05-01..", "--from", "2015-05-01"],  # вместе с --from
+        ["--window", "..", "--window", ".."],  # одинаковые имена отчётов
+    ],
+)
+def test_invalid_windows(tmp_path: Path, extra):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)] + extra)
+    assert code == ExitCode.BAD_USAGE
+
+
+# 47 - Некорректные фильтры строк
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ["--status", "6xx"],
+        ["--status", "40"],
+        ["--method", "GET POST"],
+        ["--ip", "10.0.0.0/33"],
+        ["--ip", "localhost"],
+    ],
+)
+def test_invalid_row_filters(tmp_path: Path, extra):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)] + extra)
+    assert code == ExitCode.BAD_USAGE
+
+
+# 49 - Некорректная доля выборки и --sample вместе с --store
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ["--sample", "0"],
+        ["--sample", "1.5"],
+        ["--sample", "abc"],
+        ["--sample", "0%"],
+        ["--sample", "0.5", "--sample-seed", "x"],
+    ],
+)
+def test_invalid_sampling(tmp_path: Path, extra):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)] + extra)
+    assert code == ExitCode.BAD_USAGE
+
+
+def test_sampling_with_store(tmp_path: Path):
+    store = tmp_path / "store"
+    store.mkdir()
+    out = tmp_path / "report.json"
+    code = run(["--store", str(store), "-f", "json", "-o", str(out), "--sample", "0.5"])
+    assert code == ExitCode.BAD_USAGE
+
+
+# 51 - --partial-cache не сочетается с --sample, --store и --memory-limit
+def test_partial_cache_conflicts(tmp_path: Path):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    store = tmp_path / "store"
+    store.mkdir()
+    out = tmp_path / "report.json"
+    common = ["-f", "json", "-o", str(out), "--partial-cache", str(tmp_path / "c")]
+    sampled = ["-p", str(logf), "--sample", "0.5"] + common
+    assert run(sampled) == ExitCode.BAD_USAGE
+    assert run(["--store", str(store)] + common) == ExitCode.BAD_USAGE
+    limited = ["-p", str(logf), "--memory-limit", "1M"] + common
+    assert run(limited) == ExitCode.BAD_USAGE
+
+
+# 55 - Файл трассировки: только .json, без перезаписи и не поверх отчёта
+@pytest.mark.parametrize("name", ["trace.txt", "exists.json", "report.json"])
+def test_invalid_trace_path(tmp_path: Path, name):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    (tmp_path / "exists.json").write_text("{}", encoding="utf-8")
+    out = tmp_path / "report.json"
+    args = ["-p", str(logf), "-f", "json", "-o", str(out)]
+    assert run(args + ["--trace", str(tmp_path / name)]) == ExitCode.BAD_USAGE
+
+
+# 57 - Формат из реестра: неизвестное имя и чужое расширение — ошибка использования
+@pytest.mark.parametrize(
+    "fmt, name", [("parquet", "report.parquet"), ("csv", "r.json"), ("binary", "r.csv")]
+)
+def test_registry_format_and_extension(tmp_path: Path, fmt, name):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    code = run(["-p", str(logf), "-f", fmt, "-o", str(tmp_path / name)])
+    assert code == ExitCode.BAD_USAGE
+
+
+# 59 - Несколько URL: 404 — ошибка использования, 5xx — ошибка исполнения,
+# тела ответов при проверке не открываются
+@pytest.mark.parametrize(
+    "status, expected",
+    [(404, ExitCode.BAD_USAGE), (503, ExitCode.UNEXPECTED_ERROR)],
+)
+def test_many_remote_sources_errors(monkeypatch, tmp_path: Path, status, expected):
+    import requests
+
+    heads, gets = [], []
+
+    class FakeResp:
+        def __init__(self, url):
+            self.status_code = status if url.endswith("bad.log") else 200
+
+    def fake_head(session, url, **kw):
+        heads.append(url)
+        return FakeResp(url)
+
+    monkeypatch.setattr(requests.Session, "head", fake_head)
+    monkeypatch.setattr(requests.Session, "get", lambda s, url, **kw: gets.append(url))
+    out = tmp_path / "report.json"
+    argv = ["-p", "http://example.com/ok.log", "-p", "http://example.com/bad.log"]
+    assert run(argv + ["-f", "json", "-o", str(out)]) == expected
+    assert len(heads) == 2 and gets == []
+
+
+# 62 - Некорректное число процессов и --workers вместе с --sample/--store/
+# --partial-cache/--memory-limit
+@pytest.mark.parametrize("workers", ["0", "-2", "abc", "1.5"])
+def test_invalid_workers(tmp_path: Path, workers):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out), "--workers", workers])
+    assert code == ExitCode.BAD_USAGE
+
+
+def test_workers_conflicts(tmp_path: Path):
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    store = tmp_path / "store"
+    store.mkdir()
+    out = tmp_path / "report.json"
+    common = ["-f", "json", "-o", str(out), "--workers", "2"]
+    source = ["-p", str(logf)]
+    assert run(source + common + ["--sample", "0.5"]) == ExitCode.BAD_USAGE
+    assert run(["--store", str(store)] + common) == ExitCode.BAD_USAGE
+    partial = ["--partial-cache", str(tmp_path / "c")]
+    assert run(source + common + partial) == ExitCode.BAD_USAGE
+    limited = ["--memory-limit", "1M"]
+    assert run(source + common + limited) == ExitCode.BAD_USAGE
+
+
+# 67 - Сломанный сторонний формат пропускается: опечатка в -f — ошибка использования
+def test_broken_formatter_plugin(monkeypatch, tmp_path: Path):
+    import importlib.metadata
+
+    from src.formatters import registry
+
+    class BrokenEntryPoint:
+        name = "broken"
+        value = "missing_package.module:Formatter"
+
+        def load(self):
+            raise ImportError("No module named 'missing_package'")
+
+    monkeypatch.setattr(
+        importlib.metadata, "entry_points", lambda group: [BrokenEntryPoint()]
+    )
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+    logf = make_log(tmp_path / "a.log", [VALID_LINE])
+    code = run(["-p", str(logf), "-f", "jsn", "-o", str(tmp_path / "r.json")])
+    assert code == ExitCode.BAD_USAGE
+    assert "broken" not in registry.available_formats()
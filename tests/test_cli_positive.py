@@ -35,30 +35,49 @@ def test_local_log_smoke_ok(tmp_path: Path):
     assert out.exists()
 
 
-# 12 - Валидный удаленный log-файл (моки сети)
+# 12 - Валидный удаленный log-файл (моки сети): проверка HEAD, чтение — один GET
 def test_remote_log_smoke_ok(monkeypatch, tmp_path: Path):
     import requests
-    class HeadResp:
-        status_code = 200
-    monkeypatch.setattr(requests, "head", lambda *a, **kw: HeadResp())
 
-    # GET 200 + строки
-    from src.reader import reader_url
     lines = [VALID_1, VALID_2]
+    calls = []
+
     class GetResp:
         status_code = 200
-        def __enter__(self): return self
-        def __exit__(self, *exc): return False
-        def iter_lines(self, decode_unicode=True):
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def close(self):
+            pass
+
+        def iter_content(self, chunk_size=1):
             for s in lines:
-                yield s
+                yield (s + "\n").encode("utf-8")
+
+    class HeadResp:
+        status_code = 200
+
+    def fake_head(session, url, **kw):
+        calls.append(("HEAD", url))
+        return HeadResp()
 
-    monkeypatch.setattr(reader_url.requests, "get", lambda *a, **kw: GetResp())
+    def fake_get(session, url, **kw):
+        calls.append(("GET", url, kw.get("stream")))
+        return GetResp()
+
+    monkeypatch.setattr(requests.Session, "head", fake_head)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
 
     out = tmp_path / "report.json"
     code = run(["-p", "http://example.com/nginx.log", "-f", "json", "-o", str(out)])
     assert code == ExitCode.OK
     assert out.exists()
+    url = "http://example.com/nginx.log"
+    assert calls == [("HEAD", url), ("GET", url, True)]
 
 
 # 13 - Фильтрация по --from/--to
@@ -150,3 +169,556 @@ def test_output_adoc(tmp_path: Path):
     assert code == ExitCode.OK
     text = out.read_text(encoding="utf-8")
     assert "= Отчёт по логам NGINX" in text
+
+
+# 19 - Гистограмма по интервалам (--bucket)
+def test_requests_per_bucket(tmp_path: Path):
+    logf = make_log(tmp_path / "b.log", [VALID_1, VALID_2, VALID_OLD_DAY])
+    out = tmp_path / "report.json"
+    code = run(
+        [
+            "-p",
+            str(logf),
+            "-f",
+            "json",
+            "-o",
+            str(out),
+            "--bucket",
+            "1m",
+            "--from",
+            "2015-05-17",
+        ]
+    )
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["requestsPerBucket"] == [
+        {
+            "start": "2015-05-17T08:05:00+00:00",
+            "totalRequestsCount": 2,
+            "totalBytes": 100,
+            "statusClasses": {"1xx": 0, "2xx": 1, "3xx": 1, "4xx": 0, "5xx": 0},
+        }
+    ]
+
+
+# 21 - Перцентили и распределение размеров ответа
+def test_size_percentiles_and_distribution(tmp_path: Path):
+    # sizes: 0, 100, 50 — значения < 256 хранятся в гистограмме точно
+    logf = make_log(tmp_path / "sizes.log", [VALID_1, VALID_2, VALID_OLD_DAY])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)])
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["responseSizePercentiles"] == {
+        "p50": 50.0,
+        "p90": 100.0,
+        "p99": 100.0,
+        "p99.9": 100.0,
+    }
+    assert [
+        (b["fromBytes"], b["toBytes"], b["totalResponsesCount"])
+        for b in data["responseSizeDistribution"]
+    ] == [(0, 0, 1), (32, 63, 1), (64, 127, 1)]
+
+
+def line_for(resource: str) -> str:
+    return (
+        "93.180.71.3 - - [17/May/2015:08:05:23 +0000] "
+        f'"GET {resource} HTTP/1.1" 200 10 "-" "UA"'
+    )
+
+
+# 22 - Нормализация ресурсов: порядок правил влияет на агрегированные счётчики
+@pytest.mark.parametrize(
+    "extra,expected",
+    [
+        # без нормализации каждый URI — отдельный ресурс
+        ([], {"/item?id=1": 1, "/item?id=2": 1, "/user/1/x": 1, "/user/2/x": 1}),
+        # query отбрасывается
+        (["--strip-query"], {"/item": 2, "/user/1/x": 1, "/user/2/x": 1}),
+        # числовые сегменты сворачиваются
+        (
+            ["--strip-query", "--collapse-ids"],
+            {"/item": 2, "/user/{id}/x": 2},
+        ),
+        # пользовательское правило применяется ДО свёртки id
+        (
+            ["--collapse-ids", "--rewrite", "^/user/1/", "/admin/"],
+            {"/item?id=1": 1, "/item?id=2": 1, "/admin/x": 1, "/user/{id}/x": 1},
+        ),
+        # ...поэтому правило по плейсхолдеру не срабатывает
+        (
+            ["--collapse-ids", "--rewrite", "{id}", "N"],
+            {"/item?id=1": 1, "/item?id=2": 1, "/user/{id}/x": 2},
+        ),
+        # правила применяются ПОСЛЕ отбрасывания query и по порядку
+        (
+            [
+                "--strip-query",
+                "--rewrite",
+                r"\?id=\d+",
+                "",
+                "--rewrite",
+                "^/item$",
+                "/product",
+                "--rewrite",
+                "^/product$",
+                "/catalog",
+            ],
+            {"/catalog": 2, "/user/1/x": 1, "/user/2/x": 1},
+        ),
+    ],
+)
+def test_resource_normalization_precedence(tmp_path: Path, extra, expected):
+    resources = ["/item?id=1", "/item?id=2", "/user/1/x", "/user/2/x"]
+    logf = make_log(tmp_path / "res.log", [line_for(r) for r in resources])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)] + extra)
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    got = {r["resource"]: r["totalRequestsCount"] for r in data["resources"]}
+    assert got == expected
+
+
+# 24 - --memory-limit: выгрузка счётчиков на диск даёт тот же отчёт
+def test_memory_limit_spill_matches_in_memory(tmp_path: Path):
+    resources = [f"/r/{i % 37}/{i % 11}" for i in range(500)]
+    logf = make_log(tmp_path / "many.log", [line_for(r) for r in resources])
+    in_memory = tmp_path / "mem.json"
+    spilled = tmp_path / "spill.json"
+    assert run(["-p", str(logf), "-f", "json", "-o", str(in_memory)]) == ExitCode.OK
+    argv = ["-p", str(logf), "-f", "json", "-o", str(spilled)]
+    assert run(argv + ["--memory-limit", "1K"]) == ExitCode.OK
+    assert spilled.read_text(encoding="utf-8") == in_memory.read_text(encoding="utf-8")
+
+
+# 27 - Несколько форматов за один проход: по файлу на формат
+def test_multiple_formats(tmp_path: Path):
+    logf = make_log(tmp_path / "a.log", [VALID_1, VALID_2])
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json,markdown,adoc", "-o", str(out)])
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["totalRequestsCount"] == 2
+    assert "#### Общая информация" in (tmp_path / "report.md").read_text("utf-8")
+    assert "= Отчёт по логам NGINX" in (tmp_path / "report.ad").read_text("utf-8")
+
+
+# 28 - Несколько окон дат за один проход
+def test_multiple_windows(tmp_path: Path):
+    logf = make_log(tmp_path / "w.log", [VALID_OLD_DAY, VALID_1, VALID_2])
+    out = tmp_path / "report.json"
+    code = run(
+        [
+            "-p",
+            str(logf),
+            "-f",
+            "json",
+            "-o",
+            str(out),
+            "--window",
+            "2015-05-01..2015-05-01",
+            "--window",
+            "2015-05-17..",
+            "--window",
+            "..",
+        ]
+    )
+    assert code == ExitCode.OK
+    totals = {
+        name: json.loads((tmp_path / name).read_text("utf-8"))["totalRequestsCount"]
+        for name in (
+            "report.2015-05-01..2015-05-01.json",
+            "report.2015-05-17..end.json",
+            "report.start..end.json",
+        )
+    }
+    assert totals == {
+        "report.2015-05-01..2015-05-01.json": 1,
+        "report.2015-05-17..end.json": 2,
+        "report.start..end.json": 3,
+    }
+
+
+# 32 - Обход дерева по шаблону: фильтры расширений и --exclude во время обхода
+def test_pattern_discovery_with_excludes(tmp_path: Path):
+    root = tmp_path / "logs"
+    (root / "sub" / "deep").mkdir(parents=True)
+    (root / "archive").mkdir()
+    make_log(root / "a.log", [VALID_1])
+    make_log(root / "sub" / "b.txt", [VALID_2])
+    make_log(root / "sub" / "deep" / "c.log", [VALID_1])
+    make_log(root / "sub" / "notes.csv", [VALID_1])  # другое расширение
+    make_log(root / "archive" / "old.log", [VALID_1])  # исключается
+    make_log(root / "sub" / "skip.log", [VALID_1])  # исключается по имени
+    out = tmp_path / "report.json"
+    code = run(
+        [
+            "-p",
+            str(root / "**" / "*"),
+            "-f",
+            "json",
+            "-o",
+            str(out),
+            "--exclude",
+            "archive/**",
+            "--exclude",
+            "skip.*",
+        ]
+    )
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["files"] == ["a.log", "b.txt", "c.log"]
+    assert data["totalRequestsCount"] == 3
+
+
+# 46 - Фильтры строк: значения одной опции по ИЛИ, разные опции по И
+@pytest.mark.parametrize(
+    "extra, expected",
+    [
+        (["--status", "5xx"], 2),
+        (["--status", "404", "--status", "2xx"], 3),
+        (["--method", "post"], 2),
+        (["--ip", "10.0.0.0/8"], 3),
+        (["--ip", "10.1.2.3", "--ip", "2001:db8::/32"], 2),
+        (["--resource-prefix", "/api"], 3),
+        (["--ip", "10.0.0.0/8", "--method", "GET", "--status", "5xx"], 1),
+    ],
+)
+def test_row_filters(tmp_path: Path, extra, expected):
+    def entry(ip, method, resource, status):
+        return (
+            f"{ip} - - [17/May/2015:08:05:23 +0000] "
+            f'"{method} {resource} HTTP/1.1" {status} 10 "-" "UA"'
+        )
+
+    logf = make_log(
+        tmp_path / "a.log",
+        [
+            entry("10.1.2.3", "GET", "/api/users", 500),
+            entry("10.9.9.9", "POST", "/api/orders", 200),
+            entry("192.168.0.1", "POST", "/static/app.js", 503),
+            entry("2001:db8::1", "GET", "/api/health", 404),
+            entry("10.0.0.7", "GETX", "/static/x", 200),
+            INVALID_LINE,
+        ],
+    )
+    out = tmp_path / "report.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out)] + extra)
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["totalRequestsCount"] == expected
+
+
+# 48 - Выборочный режим (--sample): доля 1 даёт точный отчёт, оценки с интервалами
+def test_sampling(tmp_path: Path, monkeypatch):
+    # генератор выборки зависит от пути источника: относительный путь — одна выборка
+    monkeypatch.chdir(tmp_path)
+    lines = [
+        f"10.0.{i % 250}.{i % 7} - - [17/May/2015:08:{i % 60:02d}:23 +0000] "
+        f'"GET /downloads/product_{i % 13} HTTP/1.1" {(200, 304, 404)[i % 3]} '
+        f'{(i * 37) % 5000} "-" "Debian APT-HTTP/1.3 (0.8.10.3)"'
+        for i in range(20000)
+    ]
+    make_log(tmp_path / "big.log", lines)
+    logf = "big.log"
+
+    def report(name, extra):
+        out = tmp_path / name
+        code = run(["-p", logf, "-f", "json", "-o", str(out)] + extra)
+        assert code == ExitCode.OK
+        return json.loads(out.read_text(encoding="utf-8"))
+
+    exact = report("exact.json", [])
+    assert report("full.json", ["--sample", "1"]) == exact
+    assert "sampling" not in exact
+
+    sampled = report("s1.json", ["--sample", "50%", "--sample-seed", "7"])
+    assert report("s2.json", ["--sample", "0.5", "--sample-seed", "7"]) == sampled
+    smp = sampled["sampling"]
+    assert smp["rate"] == 0.5
+    assert 0 < smp["sampledRequestsCount"] < len(lines)
+    assert smp["sampledBlocks"] > 1
+    total = smp["totalRequestsCount"]
+    assert total["low"] <= len(lines) <= total["high"]
+    p95 = smp["responseSizeP95"]
+    assert p95["low"] <= exact["responseSizeInBytes"]["p95"] <= p95["high"]
+    assert {c["code"] for c in smp["responseCodes"]} == {200, 304, 404}
+
+
+# 50 - Кэш частичных результатов: неизменённые файлы не разбираются повторно
+def test_partial_cache(tmp_path: Path, monkeypatch):
+    from src.pipeline import executor
+
+    parsed = []
+    parse_line = executor.parse_line
+
+    def counting_parse(line):
+        parsed.append(line)
+        return parse_line(line)
+
+    monkeypatch.setattr(executor, "parse_line", counting_parse)
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    make_log(logs / "a.log", [VALID_1, VALID_2])
+    rotated = make_log(logs / "b.log", [VALID_OLD_DAY, INVALID_LINE])
+    cache = tmp_path / "cache"
+
+    def report(name):
+        out = tmp_path / name
+        args = ["-p", str(logs / "*.log"), "-f", "json", "-o", str(out)]
+        code = run(args + ["--bucket", "1h", "--partial-cache", str(cache)])
+        assert code == ExitCode.OK
+        return json.loads(out.read_text(encoding="utf-8"))
+
+    first = report("first.json")
+    assert len(parsed) == 4
+    parsed.clear()
+    assert report("second.json") == first
+    assert parsed == []
+
+    make_log(rotated, [VALID_OLD_DAY, VALID_OLD_DAY])
+    third = report("third.json")
+    assert parsed == [VALID_OLD_DAY, VALID_OLD_DAY]
+    assert third["totalRequestsCount"] == 4
+    assert third["files"] == ["a.log", "b.log"]
+
+
+# 52 - Стандартный ввод (-p -): строки режутся по байтам на границах блоков
+def test_stdin_source(tmp_path: Path, monkeypatch):
+    import io
+    import sys
+
+    from src.reader.reader_stdin import ReaderStdin
+
+    data = f"{VALID_1}\r\n{INVALID_LINE}\n{VALID_2}".encode("utf-8")
+    stream = io.BytesIO(data)
+    assert list(ReaderStdin(stream, chunk_size=7).iter_lines()) == [
+        VALID_1,
+        INVALID_LINE,
+        VALID_2,
+    ]
+
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+    out = tmp_path / "report.json"
+    code = run(["-p", "-", "-f", "json", "-o", str(out)])
+    assert code == ExitCode.OK
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["totalRequestsCount"] == 2
+    assert report["files"] == ["-"]
+
+
+# 53 - Повторы источников: симлинки и хардлинки всегда, копии — при --dedup-content
+def test_duplicate_sources(tmp_path: Path):
+    import os
+
+    logs = tmp_path / "logs"
+    (logs / "backup").mkdir(parents=True)
+    make_log(logs / "a.log", [VALID_1, VALID_2])
+    make_log(logs / "b.log", [VALID_OLD_DAY])
+    os.symlink(logs / "a.log", logs / "backup" / "link.log")
+    os.link(logs / "b.log", logs / "backup" / "hard.log")
+    make_log(logs / "backup" / "copy.log", [VALID_1, VALID_2])
+
+    def report(name, extra):
+        out = tmp_path / name
+        args = ["-p", str(logs / "**" / "*.log"), "-f", "json", "-o", str(out)]
+        assert run(args + extra) == ExitCode.OK
+        return json.loads(out.read_text(encoding="utf-8"))
+
+    plain = report("plain.json", [])
+    assert plain["totalRequestsCount"] == 5
+    assert plain["files"] == ["a.log", "b.log", "copy.log"]
+    assert {(d["file"], d["reason"]) for d in plain["skippedDuplicates"]} == {
+        (str(logs / "backup" / "link.log"), "inode"),
+        (str(logs / "backup" / "hard.log"), "inode"),
+    }
+
+    by_content = report("content.json", ["--dedup-content"])
+    assert by_content["totalRequestsCount"] == 3
+    assert by_content["skippedDuplicates"][-1] == {
+        "file": str(logs / "backup" / "copy.log"),
+        "duplicateOf": str(logs / "a.log"),
+        "reason": "content",
+    }
+
+
+# 54 - Трассировка (--trace): интервалы в формате Trace Event
+def test_trace_events(tmp_path: Path):
+    from src.tracing import tracer
+
+    logf = make_log(tmp_path / "a.log", [VALID_1, VALID_2, INVALID_LINE])
+    out = tmp_path / "report.json"
+    trace = tmp_path / "trace.json"
+    code = run(["-p", str(logf), "-f", "json", "-o", str(out), "--trace", str(trace)])
+    assert code == ExitCode.OK
+    assert not tracer().enabled
+
+    events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    names = {e["name"] for e in spans}
+    assert {"source", "read", "parse", "build_result", "report", "resources"} <= names
+    parse = next(e for e in spans if e["name"] == "parse")
+    assert parse["args"] == {"rows": 3}
+    assert all(e["dur"] >= 0 and e["pid"] and e["tid"] for e in spans)
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
+
+
+# 56 - Двоичный отчёт и CSV: .bin читается обратно без потерь, CSV — все ресурсы
+def test_binary_and_csv_outputs(tmp_path: Path):
+    import csv
+
+    from src.formatters.binary_formatter import read_result
+    from src.formatters.json_formatter import JsonFormatter
+
+    lines = [
+        f"10.0.0.{i} - - [17/May/2015:{8 + i % 3:02d}:05:23 +0000] "
+        f'"GET /downloads/product_{i} HTTP/1.1" {200 + (i % 2) * 204} {i * 10} "-" "UA"'
+        for i in range(15)
+    ]
+    logf = make_log(tmp_path / "a.log", lines + [VALID_OLD_DAY, VALID_OLD_DAY])
+    prefix = tmp_path / "report"
+    argv = ["-p", str(logf), "-f", "json,binary,csv", "-o", str(prefix)]
+    code = run(argv + ["--bucket", "1h", "--memory-limit", "1K"])
+    assert code == ExitCode.OK
+
+    decoded = read_result((tmp_path / "report.bin").read_bytes())
+    report = (tmp_path / "report.json").read_text(encoding="utf-8")
+    assert JsonFormatter().format(decoded) == report
+    assert len(decoded.resources) == 10
+
+    with open(tmp_path / "report.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    resources = {r["key"]: int(r["value"]) for r in rows if r["table"] == "resources"}
+    assert len(resources) == 15
+    assert resources["/downloads/product_2"] == 3
+    assert sum(resources.values()) == 17
+    buckets = [r for r in rows if r["table"] == "requestsPerBucket"]
+    assert {r["metric"] for r in buckets} == {
+        "totalRequestsCount",
+        "totalBytes",
+        "1xx",
+        "2xx",
+        "3xx",
+        "4xx",
+        "5xx",
+    }
+
+
+# 58 - Несколько -p: URL проверяются параллельно, каждый читается одним GET
+def test_many_remote_sources(monkeypatch, tmp_path: Path):
+    import threading
+
+    import requests
+
+    urls = [f"http://example.com/{i}.log" for i in range(3)]
+    # три проверки должны одновременно дойти до барьера — иначе он не откроется
+    barrier = threading.Barrier(len(urls), timeout=5)
+    heads, gets = [], []
+
+    class GetResp:
+        status_code = 200
+
+        def __init__(self, url):
+            self.url = url
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def close(self):
+            pass
+
+        def iter_content(self, chunk_size=1):
+            name = self.url.rsplit("/", 1)[-1]
+            yield VALID_1.replace("product_1", name).encode("utf-8")
+
+    class HeadResp:
+        status_code = 200
+
+    def fake_head(session, url, **kw):
+        heads.append(url)
+        barrier.wait()
+        return HeadResp()
+
+    def fake_get(session, url, **kw):
+        gets.append(url)
+        return GetResp(url)
+
+    monkeypatch.setattr(requests.Session, "head", fake_head)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    logf = make_log(tmp_path / "local.log", [VALID_2])
+    out = tmp_path / "report.json"
+    argv = ["-p", urls[0], "-p", str(logf), "-p", urls[1], "-p", urls[2]]
+    assert run(argv + ["-f", "json", "-o", str(out)]) == ExitCode.OK
+    assert sorted(heads) == urls and sorted(gets) == urls
+
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["totalRequestsCount"] == 4
+    assert data["files"] == ["0.log", "1.log", "2.log", "local.log"]
+
+
+# 60 - --workers: файлы режутся по границам строк, отчёт совпадает с однопроцессным
+def test_workers_match_single_process(tmp_path: Path, monkeypatch):
+    from functools import partial
+
+    from src.pipeline import scheduler
+    from src.sources import Source
+
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    big = make_log(logs / "big.log", [VALID_1, VALID_2, INVALID_LINE] * 40)
+    make_log(logs / "a.log", [VALID_OLD_DAY])
+    make_log(logs / "b.log", [VALID_2])
+
+    size = big.stat().st_size
+    tasks, in_main = scheduler.plan_tasks(
+        [Source(str(big), size), Source("-", None)], workers=2, min_cost=512
+    )
+    assert [s.location for s in in_main] == ["-"]
+    ranges = sorted((r for t in tasks for r in t.ranges), key=lambda r: r.start)
+    assert len(ranges) > 1 and ranges[0].start == 0 and ranges[-1].end == size
+    data = big.read_bytes()
+    for prev, cur in zip(ranges, ranges[1:]):
+        assert prev.end == cur.start and data[cur.start - 1 : cur.start] == b"\n"
+
+    # мелкие задачи, чтобы диапазоны одного файла ушли разным процессам
+    monkeypatch.setattr(
+        scheduler, "plan_tasks", partial(scheduler.plan_tasks, min_cost=512)
+    )
+
+    def report(workers):
+        out = tmp_path / f"report-{workers}.json"
+        args = ["-p", str(logs / "*.log"), "-f", "json", "-o", str(out)]
+        args += ["--bucket", "1h", "--workers", workers]
+        assert run(args) == ExitCode.OK
+        return json.loads(out.read_text(encoding="utf-8"))
+
+    single = report("1")
+    assert single["totalRequestsCount"] == 82
+    assert report("2") == single
+    assert report("auto") == single
+
+
+# 66 - Обход по шаблону заходит в симлинки на каталоги, циклы не зацикливают обход
+def test_pattern_discovery_follows_dir_symlinks(tmp_path: Path):
+    import os
+
+    real = tmp_path / "var" / "log"
+    real.mkdir(parents=True)
+    make_log(real / "current.log", [VALID_1, VALID_2])
+    os.symlink(tmp_path / "var", real / "loop")  # цикл: log/loop -> var
+    root = tmp_path / "logs"
+    root.mkdir()
+    make_log(root / "old.log", [VALID_OLD_DAY])
+    os.symlink(real, root / "current")
+
+    out = tmp_path / "report.json"
+    code = run(["-p", str(root / "**" / "*.log"), "-f", "json", "-o", str(out)])
+    assert code == ExitCode.OK
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["files"] == ["current.log", "old.log"]
+    assert data["totalRequestsCount"] == 3
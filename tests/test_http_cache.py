@@ -0,0 +1,138 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from src.exit_codes import ExitCode
+from src.main import run
+
+LINES = [
+    "93.180.71.3 - - [17/May/2015:08:05:23 +0000] "
+    '"GET /downloads/product_1 HTTP/1.1" 304 0 "-" "UA"',
+    "93.180.71.3 - - [17/May/2015:08:05:32 +0000] "
+    '"GET /downloads/product_2 HTTP/1.0" 200 100 "-" "UA"',
+]
+BODY = ("\n".join(LINES) + "\n").encode("utf-8")
+ETAG = '"v1"'
+
+
+class LogServer(ThreadingHTTPServer):
+    """Локальная замена удалённого сервера логов: ETag + условный GET."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), LogHandler)
+        self.requests: list[tuple[str, int]] = []  # (метод, статус)
+        self.peers: list[tuple[str, int]] = []  # (метод, порт клиента)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def gets(self) -> list[int]:
+        return [status for method, status in self.requests if method == "GET"]
+
+
+class LogHandler(BaseHTTPRequestHandler):
+    # keep-alive: соединение проверки переиспользуется для чтения
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, with_body: bool):
+        if self.path.startswith("/missing"):
+            status = 404
+        elif self.headers.get("If-None-Match") == ETAG:
+            status = 304
+        else:
+            status = 200
+        self.server.requests.append((self.command, status))
+        self.server.peers.append((self.command, self.client_address[1]))
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", "Sun, 17 May 2015 10:00:00 GMT")
+        if status == 200:
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(BODY)
+        else:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def do_HEAD(self):
+        self._respond(with_body=False)
+
+    def do_GET(self):
+        self._respond(with_body=True)
+
+
+@pytest.fixture
+def server():
+    srv = LogServer()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def report(tmp_path: Path, url: str, name: str, *extra: str) -> dict:
+    out = tmp_path / name
+    code = run(["-p", url, "-f", "json", "-o", str(out)] + list(extra))
+    assert code == ExitCode.OK
+    return json.loads(out.read_text(encoding="utf-8"))
+
+
+# 33 - Повторный запуск: условный GET, на 304 тело читается из кэша
+def test_revalidation_uses_cache(server, tmp_path: Path):
+    cache = str(tmp_path / "cache")
+    url = server.base_url + "/access.log"
+    first = report(tmp_path, url, "r1.json", "--cache-dir", cache)
+    second = report(tmp_path, url, "r2.json", "--cache-dir", cache)
+    assert server.gets() == [200, 304]
+    assert first == second
+    assert second["totalRequestsCount"] == 2
+
+
+# 34 - Свежая по --cache-max-age запись не запрашивается повторно
+def test_max_age_skips_network(server, tmp_path: Path):
+    cache = str(tmp_path / "cache")
+    url = server.base_url + "/access.log"
+    extra = ("--cache-dir", cache, "--cache-max-age", "3600")
+    report(tmp_path, url, "r1.json", *extra)
+    data = report(tmp_path, url, "r2.json", *extra)
+    assert server.gets() == [200]
+    assert data["totalRequestsCount"] == 2
+
+
+# 35 - Кэш ограничен по размеру: давно не использованные записи вытесняются
+def test_lru_eviction(server, tmp_path: Path):
+    cache = tmp_path / "cache"
+    extra = ("--cache-dir", str(cache), "--cache-max-size", str(len(BODY) * 2))
+    for i, name in enumerate(("a", "b", "c")):
+        report(tmp_path, f"{server.base_url}/{name}.log", f"r{i}.json", *extra)
+    assert len(list(cache.glob("*.body"))) == 2
+    # a вытеснена — полный GET; c осталась — 304
+    report(tmp_path, f"{server.base_url}/a.log", "r3.json", *extra)
+    report(tmp_path, f"{server.base_url}/c.log", "r4.json", *extra)
+    assert server.gets() == [200, 200, 200, 200, 304]
+
+
+# 36 - 404 от сервера по-прежнему означает некорректное использование
+def test_missing_remote_with_cache(server, tmp_path: Path):
+    out = tmp_path / "report.json"
+    argv = ["-p", server.base_url + "/missing.log", "-f", "json", "-o", str(out)]
+    code = run(argv + ["--cache-dir", str(tmp_path / "cache")])
+    assert code == ExitCode.BAD_USAGE
+
+
+# 64 - Проверка (HEAD) и чтение (GET) идут по одному соединению из пула
+def test_validation_reuses_connection(server, tmp_path: Path):
+    data = report(tmp_path, server.base_url + "/pooled.log", "r.json")
+    assert data["totalRequestsCount"] == 2
+    assert [method for method, _ in server.peers] == ["HEAD", "GET"]
+    assert len({port for _, port in server.peers}) == 1
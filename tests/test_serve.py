@@ -0,0 +1,140 @@
+import datetime as dt
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from src.cli.args import parse_serve_args
+from src.config import build_serve_config
+from src.exit_codes import ExitCode
+from src.main import run
+from src.serve.daemon import Daemon
+from src.validator import Validator
+
+
+def line(day: int, resource: str, status: int = 200, size: int = 100) -> str:
+    return (
+        f"93.180.71.3 - - [{day}/May/2015:08:05:32 +0000] "
+        f'"GET {resource} HTTP/1.1" {status} {size} "-" "UA"'
+    )
+
+
+@pytest.fixture
+def daemon(tmp_path: Path):
+    logf = tmp_path / "access.log"
+    logf.write_text(
+        "\n".join([line(17, "/a"), line(17, "/b"), line(18, "/a")]) + "\n",
+        encoding="utf-8",
+    )
+    validator = Validator()
+    args = parse_serve_args(["-p", str(logf), "--port", "0"])
+    d = Daemon(build_serve_config(args, validator), validator)
+    d.load()
+    thread = threading.Thread(target=d.server.serve_forever, daemon=True)
+    thread.start()
+    d.log_path = logf
+    yield d
+    d.server.shutdown()
+    d.close()
+
+
+def get(d: Daemon, path: str) -> tuple[int, str]:
+    try:
+        with urllib.request.urlopen(d.address + path) as resp:
+            return resp.status, resp.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+# 39 - serve: отчёт за диапазон дат из тёплого состояния, рендер форматтерами
+def test_serve_report_by_date(daemon):
+    status, body = get(daemon, "/report")
+    assert status == 200
+    assert json.loads(body)["totalRequestsCount"] == 3
+
+    status, body = get(daemon, "/report?from=2015-05-18&to=2015-05-18")
+    data = json.loads(body)
+    assert data["totalRequestsCount"] == 1
+    assert [d["date"] for d in data["requestsPerDate"]] == ["2015-05-18"]
+
+    status, body = get(daemon, "/report?to=2015-05-17&format=markdown")
+    assert status == 200 and body.startswith("#### Общая информация")
+
+    status, body = get(daemon, "/report?format=csv")
+    assert status == 200 and "resources,/a,totalRequestsCount,2" in body
+
+
+# 40 - serve: дописанные строки и усечение файла учитываются при опросе
+def test_serve_follows_appends_and_truncation(daemon):
+    with open(daemon.log_path, "a", encoding="utf-8") as f:
+        f.write(line(18, "/c") + "\n" + line(18, "/d"))  # хвост без перевода строки
+    daemon.poll_once()
+    assert json.loads(get(daemon, "/health")[1])["totalRequestsCount"] == 4
+
+    with open(daemon.log_path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    daemon.poll_once()
+    assert (
+        json.loads(get(daemon, "/report?from=2015-05-18")[1])["totalRequestsCount"] == 3
+    )
+
+    daemon.log_path.write_text(line(19, "/e") + "\n", encoding="utf-8")
+    daemon.poll_once()
+    assert json.loads(get(daemon, "/health")[1])["lastDate"] == "2015-05-19"
+
+
+# 41 - serve: границы не по дням, неизвестный формат и путь
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        ("/report?from=2015-05-17T10:00:00", 400),
+        ("/report?from=2015-05-18&to=2015-05-17", 400),
+        ("/report?format=xml", 400),
+        ("/unknown", 404),
+    ],
+)
+def test_serve_bad_queries(daemon, path, status):
+    code, body = get(daemon, path)
+    assert code == status
+    assert "error" in json.loads(body)
+
+
+# 42 - serve: некорректные параметры запуска
+@pytest.mark.parametrize(
+    "extra", [["--port", "http"], ["--port", "70000"], ["--poll-interval", "0"]]
+)
+def test_serve_bad_usage(tmp_path: Path, extra):
+    logf = tmp_path / "a.log"
+    logf.write_text(line(17, "/a") + "\n", encoding="utf-8")
+    assert run(["serve", "-p", str(logf)] + extra) == ExitCode.BAD_USAGE
+
+
+# 65 - serve: дни — по дате лога (не UTC), части дня сливаются, размеры не копятся
+def test_serve_days_and_compaction():
+    from src.serve import state as state_module
+    from src.serve.state import DayPartitionedStats
+
+    local = (
+        '93.180.71.3 - - [18/May/2015:01:00:00 +0300] "GET /tz HTTP/1.1" 200 7 "-" "UA"'
+    )
+    stats = DayPartitionedStats()
+    stats.ingest("tz.log", [local])
+    data = stats.query(dt.date(2015, 5, 18), dt.date(2015, 5, 18))
+    assert data.totalRequestsCount == 1
+    assert [d.date for d in data.requestsPerDate] == ["2015-05-18"]
+    assert (
+        stats.query(dt.date(2015, 5, 17), dt.date(2015, 5, 17)).totalRequestsCount == 0
+    )
+
+    for size in range(1, 101):
+        stats.ingest("a.log", [line(17, "/a", size=size)])
+    parts = stats._days[dt.date(2015, 5, 17)]
+    assert len(parts) <= state_module._MAX_PARTS_PER_DAY
+    assert all(part.sizes == [] for part in parts)
+    data = stats.query(date_to=dt.date(2015, 5, 17))
+    assert data.totalRequestsCount == 100
+    assert data.responseSizeInBytes.p95 == 95
+    assert stats.query().files == ["a.log", "tz.log"]
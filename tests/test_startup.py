@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+import warnings
+from pathlib import Path
+
+from scripts.bench.startup import LAZY_MODULES
+from scripts.bench.startup import ROOT
+from scripts.bench.startup import STARTUP_BUDGET_MS
+from scripts.bench.startup import measure
+
+VALID_LINE = (
+    "93.180.71.3 - - [17/May/2015:08:05:32 +0000] "
+    '"GET /downloads/product_1 HTTP/1.1" 304 0 "-" "UA"'
+)
+
+
+# 30 - Импорт src.main не тянет тяжёлые модули; превышение бюджета — предупреждение
+def test_startup_import_budget():
+    median_ms, profile = measure(runs=3)
+    assert [m for m in LAZY_MODULES if m in profile] == []
+    # время зависит от машины и её загрузки: жёсткий бюджет — в scripts.bench.startup
+    if median_ms >= STARTUP_BUDGET_MS:
+        warnings.warn(
+            f"Импорт src.main: {median_ms:.1f} мс при бюджете {STARTUP_BUDGET_MS} мс"
+        )
+
+
+# 31 - Локальный JSON-прогон не загружает requests, numpy и чужие форматтеры
+def test_local_json_run_stays_lazy(tmp_path: Path):
+    logf = tmp_path / "a.log"
+    logf.write_text(VALID_LINE + "\n", encoding="utf-8")
+    out = tmp_path / "report.json"
+    code = (
+        "import json, sys\n"
+        "from src.main import run\n"
+        f"rc = run(['-p', {str(logf)!r}, '-f', 'json', '-o', {str(out)!r}])\n"
+        "print(json.dumps([rc, sorted(sys.modules)]))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    rc, modules = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert rc == 0
+    loaded = set(modules)
+    assert "src.formatters.json_formatter" in loaded
+    for name in (
+        "requests",
+        "numpy",
+        "src.formatters.markdown_formatter",
+        "src.formatters.adoc_formatter",
+    ):
+        assert name not in loaded
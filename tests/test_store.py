@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.exit_codes import ExitCode
+from src.main import run
+
+INPUT = Path(__file__).resolve().parents[1] / "scripts" / "data" / "input" / "logs"
+
+
+def line(day: int, hour: int, resource: str, status: int = 200) -> str:
+    return (
+        f"93.180.71.3 - - [{day}/May/2015:{hour:02d}:05:32 +0000] "
+        f'"GET {resource} HTTP/1.1" {status} {day * hour} "-" "UA"'
+    )
+
+
+def report(tmp_path: Path, name: str, *argv: str) -> dict:
+    out = tmp_path / name
+    assert run(list(argv) + ["-f", "json", "-o", str(out)]) == ExitCode.OK
+    return json.loads(out.read_text(encoding="utf-8"))
+
+
+def ingest(store: Path, path: str, *extra: str) -> None:
+    assert run(["ingest", "-p", path, "--store", str(store)] + list(extra)) == 0
+
+
+# 43 - Отчёт по хранилищу совпадает с отчётом по исходным логам
+@pytest.mark.parametrize(
+    "extra",
+    [
+        [],
+        ["--from", "2015-05-17T08:30:00", "--to", "2015-05-17T09:10:00"],
+        ["--bucket", "1h", "--collapse-ids"],
+        ["--status", "4xx", "--ip", "80.91.0.0/16", "--resource-prefix", "/downloads"],
+    ],
+)
+def test_store_report_matches_raw(tmp_path: Path, extra):
+    store = tmp_path / "store"
+    pattern = str(INPUT / "*.txt")
+    ingest(store, pattern, "--segment-rows", "64")
+    raw = report(tmp_path, "raw.json", "-p", pattern, *extra)
+    stored = report(tmp_path, "store.json", "--store", str(store), *extra)
+    assert stored == raw
+    assert raw["totalRequestsCount"] > 0
+
+
+# 44 - Повторный ingest дочитывает только новые строки
+def test_ingest_is_incremental(tmp_path: Path):
+    logf = tmp_path / "access.log"
+    store = tmp_path / "store"
+    logf.write_text(line(17, 1, "/a") + "\n" + line(18, 2, "/b"), encoding="utf-8")
+    ingest(store, str(logf))
+    ingest(store, str(logf))
+    # строка без перевода строки ещё дописывается — её загрузит следующий ingest
+    assert report(tmp_path, "r1.json", "--store", str(store))["totalRequestsCount"] == 1
+
+    with open(logf, "a", encoding="utf-8") as f:
+        f.write("\n" + line(19, 3, "/c", 500) + "\n")
+    ingest(store, str(logf))
+    data = report(tmp_path, "r2.json", "--store", str(store), "--from", "2015-05-19")
+    assert data["totalRequestsCount"] == 1
+    assert data["responseCodes"] == [{"code": 500, "totalResponsesCount": 1}]
+    manifest = json.loads((store / "manifest.json").read_text(encoding="utf-8"))
+    assert len(manifest["segments"]) == 2
+    assert manifest["sources"][0]["rows"] == 3
+
+
+# 63 - Ротация: новый файл крупнее сохранённого смещения читается с начала
+def test_ingest_after_rotation(tmp_path: Path):
+    import os
+
+    logf = tmp_path / "access.log"
+    store = tmp_path / "store"
+    logf.write_text(line(17, 1, "/a") + "\n", encoding="utf-8")
+    ingest(store, str(logf))
+
+    os.rename(logf, tmp_path / "access.log.1")
+    lines = [line(18, hour, f"/r{hour}") for hour in range(1, 6)]
+    logf.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    ingest(store, str(logf))
+
+    data = report(tmp_path, "r.json", "--store", str(store))
+    assert data["totalRequestsCount"] == 6
+    manifest = json.loads((store / "manifest.json").read_text(encoding="utf-8"))
+    source = manifest["sources"][0]
+    assert source["offset"] == logf.stat().st_size
+    assert source["inode"] == logf.stat().st_ino
+
+
+# 45 - Некорректное хранилище и конфликт --store с -p
+def test_invalid_store(tmp_path: Path):
+    logf = tmp_path / "a.log"
+    logf.write_text(line(17, 1, "/a") + "\n", encoding="utf-8")
+    out = str(tmp_path / "report.json")
+    not_store = tmp_path / "dir"
+    not_store.mkdir()
+    (not_store / "x.txt").write_text("x", encoding="utf-8")
+
+    assert run(["--store", str(not_store), "-f", "json", "-o", out]) == 2
+    assert (
+        run(["-p", str(logf), "--store", str(not_store), "-f", "json", "-o", out]) == 2
+    )
+    assert run(["ingest", "-p", str(logf), "--store", str(not_store)]) == 2
+    assert (
+        run(
+            [
+                "ingest",
+                "-p",
+                str(logf),
+                "--store",
+                str(tmp_path / "s"),
+                "--segment-rows",
+                "0",
+            ]
+        )
+        == 2
+    )